@@ -0,0 +1,121 @@
+# Las dependencias son `async` aunque no esperen nada: así se resuelven en el
+# bucle de eventos y no ocupan un hilo del pool por cada una
+import secrets
+import time
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, Query, Request, status
+from starlette.concurrency import run_in_threadpool
+
+from bin.red import GestorRed, RedSnapshot
+from bin.red.cache_rutas import CacheRutas
+from bin.red.ejecutor import EjecutorBusquedas
+from bin.red.publicacion import PublicacionRed
+from bin.red.registro import RedRegistrada, RegistroRedes
+from api.metricas import RegistroMetricas
+from config.config import Config
+
+
+async def get_registro_redes(request: Request) -> RegistroRedes:
+    return request.app.state.redes
+
+
+async def get_red_registrada(
+        nombre: Optional[str] = Query(
+            default=None, alias="red",
+            description="Red a consultar (ruta relativa al directorio de datos, sin extensión); "
+                        "por defecto la red principal"),
+        registro: RegistroRedes = Depends(get_registro_redes)
+    ) -> RedRegistrada:
+    """Red elegida con el parámetro `red`.
+
+    Raises:
+        HTTPException: 404 si no hay ninguna red con ese nombre
+    """
+    try:
+        return registro.entrada(nombre)
+    except KeyError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Red '{nombre}' no encontrada")
+
+
+async def get_red(request: Request, entrada: RedRegistrada = Depends(get_red_registrada),
+                  registro: RegistroRedes = Depends(get_registro_redes)) -> RedSnapshot:
+    """Instantánea vigente de la red; se toma una sola vez por petición.
+
+    Si la red no está cargada se carga en un hilo, sin bloquear el bucle de
+    eventos; las peticiones que llegan mientras tanto esperan la misma carga.
+
+    Raises:
+        HTTPException: 503 si el archivo de la red no se puede cargar
+    """
+    metricas = request.app.state.metricas
+    if entrada.cargada:
+        with metricas.etapa("instantanea"):
+            return registro.obtener(entrada.nombre)
+    inicio = time.perf_counter()
+    try:
+        red = await run_in_threadpool(registro.obtener, entrada.nombre)
+    except (ValueError, OSError) as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail=f"No se pudo cargar la red '{entrada.nombre}': {e}")
+    metricas.observar_etapa("carga_red", time.perf_counter() - inicio)
+    return red
+
+
+def resolver_estacion(red: RedSnapshot, nombre: str) -> str:
+    """Nombre interno de la estación a la que se refiere `nombre`.
+
+    Con `Config.RESOLVER_NOMBRES_APROXIMADOS` un nombre que no existe se
+    sustituye por la estación a la que se refiere sin ambigüedad (nombre
+    original, prefijo único o error de escritura); si no, o si no hay una
+    estación clara, se deja igual y el endpoint reporta que no existe.
+    """
+    if Config.RESOLVER_NOMBRES_APROXIMADOS:
+        return red.indice_nombres.resolver(nombre) or nombre
+    return nombre
+
+
+async def get_estacion_origen(estacion_origen: str, red: RedSnapshot = Depends(get_red)) -> str:
+    return resolver_estacion(red, estacion_origen)
+
+
+async def get_estacion_destino(estacion_destino: str, red: RedSnapshot = Depends(get_red)) -> str:
+    return resolver_estacion(red, estacion_destino)
+
+
+async def get_gestor_red(entrada: RedRegistrada = Depends(get_red_registrada),
+                         _: RedSnapshot = Depends(get_red)) -> GestorRed:
+    """Gestor de la red elegida, ya cargada (los cierres parten de la instantánea vigente)."""
+    return entrada.gestor
+
+
+async def get_cache_rutas(entrada: RedRegistrada = Depends(get_red_registrada)) -> CacheRutas:
+    return entrada.cache
+
+
+async def get_metricas(request: Request) -> RegistroMetricas:
+    return request.app.state.metricas
+
+
+async def get_ejecutor(request: Request) -> EjecutorBusquedas:
+    return request.app.state.ejecutor
+
+
+async def get_publicacion_red(entrada: RedRegistrada = Depends(get_red_registrada)) -> PublicacionRed:
+    return entrada.publicacion
+
+
+async def verificar_admin(
+        token: Optional[str] = Header(default=None, alias="X-Admin-Token")
+    ) -> None:
+    """Exige el token de administración (`Config.ADMIN_TOKEN`).
+
+    Raises:
+        HTTPException: 403 si no hay token configurado, 401 si falta o no coincide
+    """
+    esperado = Config.ADMIN_TOKEN
+    if not esperado:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Administración deshabilitada: configure METRO_ADMIN_TOKEN")
+    if token is None or not secrets.compare_digest(token.encode(), esperado.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de administración inválido")
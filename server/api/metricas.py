@@ -0,0 +1,188 @@
+"""Métricas de la API en formato de texto de Prometheus, sin dependencias externas.
+
+`MiddlewareMetricas` cuenta las peticiones y mide su latencia por ruta; los
+endpoints registran además el tiempo de sus etapas internas (acceso a la
+instantánea, búsqueda, reconstrucción, serialización) con
+`RegistroMetricas.etapa`. `GET /metrics` expone todo para que lo recoja
+Prometheus.
+
+Las rutas se etiquetan con su plantilla (`/api/v1/admin/estaciones/{estacion}/cerrar`),
+no con la URL, para que el número de series no crezca con las peticiones.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Límites superiores de los buckets de latencia, en segundos
+BUCKETS_SEGUNDOS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+Etiquetas = Tuple[Tuple[str, str], ...]
+
+
+def _formatear_etiquetas(etiquetas: Etiquetas, extra: str = "") -> str:
+    partes = [f'{nombre}="{_escapar(valor)}"' for nombre, valor in etiquetas]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Contador:
+    """Contador monótono con etiquetas."""
+
+    def __init__(self, nombre: str, ayuda: str):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self._valores: Dict[Etiquetas, float] = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, valor: float = 1.0, **etiquetas: str) -> None:
+        clave = tuple(sorted(etiquetas.items()))
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0.0) + valor
+
+    def exponer(self) -> List[str]:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        with self._lock:
+            valores = sorted(self._valores.items())
+        for etiquetas, valor in valores:
+            lineas.append(f"{self.nombre}{_formatear_etiquetas(etiquetas)} {valor:g}")
+        return lineas
+
+
+class Histograma:
+    """Histograma de latencias con etiquetas y buckets fijos."""
+
+    def __init__(self, nombre: str, ayuda: str, buckets: Sequence[float] = BUCKETS_SEGUNDOS):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.buckets = tuple(buckets)
+        # Por etiquetas: [conteo por bucket (el último es +Inf), suma]
+        self._series: Dict[Etiquetas, list] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, **etiquetas: str) -> None:
+        clave = tuple(sorted(etiquetas.items()))
+        posicion = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][posicion] += 1
+            serie[1] += valor
+
+    def exponer(self) -> List[str]:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        with self._lock:
+            series = sorted((clave, list(conteos), suma) for clave, (conteos, suma) in self._series.items())
+        for etiquetas, conteos, suma in series:
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + (float("inf"),), conteos):
+                acumulado += conteo
+                le = "+Inf" if limite == float("inf") else f"{limite:g}"
+                etiquetas_bucket = _formatear_etiquetas(etiquetas, 'le="' + le + '"')
+                lineas.append(f"{self.nombre}_bucket{etiquetas_bucket} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_formatear_etiquetas(etiquetas)} {suma:.9g}")
+            lineas.append(f"{self.nombre}_count{_formatear_etiquetas(etiquetas)} {acumulado}")
+        return lineas
+
+
+class RegistroMetricas:
+    """Métricas de la aplicación.
+
+    Attributes:
+        peticiones: Peticiones HTTP por método, ruta y estado
+        latencia: Latencia de las peticiones HTTP por método y ruta
+        codigos: Respuestas `ServerResponse` por ruta y `code` (0 = éxito)
+        etapas: Tiempo de cada etapa interna de los endpoints
+        busquedas: Consultas de ruta por desenlace en el ejecutor (calculada,
+            compartida con otra idéntica en curso, rechazada por saturación
+            o fallida porque se rompió el pool de procesos)
+    """
+
+    def __init__(self):
+        self.peticiones = Contador("metro_peticiones_total", "Peticiones HTTP atendidas")
+        self.latencia = Histograma("metro_peticion_segundos", "Latencia de las peticiones HTTP")
+        self.codigos = Contador("metro_respuestas_codigo_total", "Respuestas por ServerResponse.code")
+        self.etapas = Histograma("metro_etapa_segundos", "Tiempo de las etapas internas de las consultas")
+        self.busquedas = Contador("metro_busquedas_total", "Consultas de ruta por desenlace en el ejecutor")
+
+    def observar_etapa(self, etapa: str, segundos: float) -> None:
+        self.etapas.observar(segundos, etapa=etapa)
+
+    @contextmanager
+    def etapa(self, nombre: str) -> Iterator[None]:
+        """Mide el bloque como la etapa `nombre`."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas.observar(time.perf_counter() - inicio, etapa=nombre)
+
+    def exponer(self) -> str:
+        """Todas las métricas en formato de texto de Prometheus."""
+        lineas: List[str] = []
+        for metrica in (self.peticiones, self.latencia, self.codigos, self.etapas, self.busquedas):
+            lineas.extend(metrica.exponer())
+        return "\n".join(lineas) + "\n"
+
+
+def _codigo_respuesta(cuerpo: bytes) -> Optional[str]:
+    """`code` de un `ServerResponse` serializado, o None si el cuerpo no es uno.
+
+    `code` es el primer campo del modelo, así que basta mirar el prefijo.
+    """
+    prefijo = b'{"code":'
+    if not cuerpo.startswith(prefijo):
+        return None
+    fin = len(prefijo)
+    while fin < len(cuerpo) and cuerpo[fin:fin + 1] in b"-0123456789":
+        fin += 1
+    return cuerpo[len(prefijo):fin].decode() or None
+
+
+class MiddlewareMetricas:
+    """Middleware ASGI que cuenta y mide las peticiones HTTP.
+
+    Es un middleware ASGI puro (no `BaseHTTPMiddleware`): no envuelve el
+    cuerpo de la respuesta, solo observa los mensajes que pasan.
+    """
+
+    def __init__(self, app, registro: RegistroMetricas):
+        self.app = app
+        self.registro = registro
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        respuesta = {"estado": 500, "codigo": None, "primer_cuerpo": True}
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                respuesta["estado"] = mensaje["status"]
+            elif mensaje["type"] == "http.response.body" and respuesta["primer_cuerpo"]:
+                respuesta["primer_cuerpo"] = False
+                respuesta["codigo"] = _codigo_respuesta(mensaje.get("body", b""))
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            ruta = scope.get("route")
+            plantilla = getattr(ruta, "path_format", None) or getattr(ruta, "path", None) or "sin_ruta"
+            metodo = scope.get("method", "")
+            self.registro.latencia.observar(time.perf_counter() - inicio, metodo=metodo, ruta=plantilla)
+            self.registro.peticiones.incrementar(metodo=metodo, ruta=plantilla, estado=str(respuesta["estado"]))
+            if respuesta["codigo"] is not None:
+                self.registro.codigos.incrementar(ruta=plantilla, code=respuesta["codigo"])
@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Depends
+from models.schemas import ServerResponse, TramoLinea, EstadoCierres
+from bin.red import GestorRed, RedSnapshot, Tramo
+from bin.red.registro import RegistroRedes
+from api.deps import get_gestor_red, get_red, get_registro_redes, verificar_admin
+
+router = APIRouter()
+
+
+def _estado_cierres(red: RedSnapshot) -> dict:
+    return EstadoCierres(
+        version=red.version,
+        estaciones_cerradas=sorted(red.cerradas),
+        tramos_cerrados=[
+            TramoLinea(estacion_a=t.estacion_a, estacion_b=t.estacion_b, linea=t.linea)
+            for t in sorted(red.tramos_cerrados)
+        ]
+    ).model_dump(mode="json")
+
+
+def _actualizar(gestor: GestorRed, **cambios) -> ServerResponse:
+    try:
+        red = gestor.actualizar_cierres(**cambios)
+    except ValueError as e:
+        return ServerResponse(code=1, error=str(e))
+    return ServerResponse(code=0, data=_estado_cierres(red))
+
+
+@router.get("/cierres", response_model=ServerResponse)
+def cierres(red: RedSnapshot = Depends(get_red)) -> ServerResponse:
+    """Estaciones y tramos cerrados actualmente."""
+    return ServerResponse(code=0, data=_estado_cierres(red))
+
+
+@router.post("/estaciones/{estacion}/cerrar", response_model=ServerResponse,
+             dependencies=[Depends(verificar_admin)])
+def cerrar_estacion(estacion: str, gestor: GestorRed = Depends(get_gestor_red)) -> ServerResponse:
+    """Cierra una estación: las búsquedas dejan de entrar a ella."""
+    return _actualizar(gestor, cerrar=[estacion])
+
+
+@router.post("/estaciones/{estacion}/abrir", response_model=ServerResponse,
+             dependencies=[Depends(verificar_admin)])
+def abrir_estacion(estacion: str, gestor: GestorRed = Depends(get_gestor_red)) -> ServerResponse:
+    return _actualizar(gestor, abrir=[estacion])
+
+
+@router.post("/tramos/cerrar", response_model=ServerResponse,
+             dependencies=[Depends(verificar_admin)])
+def cerrar_tramo(tramo: TramoLinea, gestor: GestorRed = Depends(get_gestor_red)) -> ServerResponse:
+    """Cierra un tramo de línea entre dos estaciones contiguas, en ambos sentidos."""
+    return _actualizar(gestor, cerrar_tramos=[Tramo.de(tramo.estacion_a, tramo.estacion_b, tramo.linea)])
+
+
+@router.post("/tramos/abrir", response_model=ServerResponse,
+             dependencies=[Depends(verificar_admin)])
+def abrir_tramo(tramo: TramoLinea, gestor: GestorRed = Depends(get_gestor_red)) -> ServerResponse:
+    return _actualizar(gestor, abrir_tramos=[Tramo.de(tramo.estacion_a, tramo.estacion_b, tramo.linea)])
+
+
+@router.post("/redes/descubrir", response_model=ServerResponse,
+             dependencies=[Depends(verificar_admin)])
+def descubrir_redes(registro: RegistroRedes = Depends(get_registro_redes)) -> ServerResponse:
+    """Registra las redes agregadas al directorio de datos sin reiniciar el servidor."""
+    nuevas = registro.descubrir()
+    return ServerResponse(code=0, data={"nuevas": nuevas, "redes": registro.nombres})
@@ -1,6 +1,10 @@
 from fastapi import APIRouter
-from api.v1 import find_path
+from api.v1 import find_path, isocrona, estaciones, red, admin
 
 api_router = APIRouter()
 
-api_router.include_router(find_path.router, prefix="/find-path", tags=["algorithm A*", "aestrella", "A*"])
\ No newline at end of file
+api_router.include_router(find_path.router, prefix="/find-path", tags=["algorithm A*", "aestrella", "A*"])
+api_router.include_router(isocrona.router, prefix="/isocrona", tags=["isocrona", "dijkstra"])
+api_router.include_router(estaciones.router, prefix="/stations", tags=["estaciones"])
+api_router.include_router(red.router, prefix="/network", tags=["red"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
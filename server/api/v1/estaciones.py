@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Query
+from models.schemas import ServerResponse, CoincidenciaEstacion, ResultadoBusquedaEstaciones
+from bin.red import RedSnapshot
+from api.deps import get_red
+from config.config import Config
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=ServerResponse)
+async def buscar_estaciones(
+        q: str = Query(min_length=1, max_length=100),
+        limite: int = Query(default=10, ge=1, le=Config.MAX_SUGERENCIAS_ESTACIONES),
+        red: RedSnapshot = Depends(get_red)
+    ) -> ServerResponse:
+    """Autocompletado de estaciones por nombre.
+
+    Ignora acentos, mayúsculas y separadores; devuelve primero las estaciones
+    cuyo nombre (o una de sus palabras) empieza por `q` y completa con las que
+    se le parecen. La búsqueda usa el índice de la instantánea y no sale del
+    bucle de eventos.
+    """
+    abierta = red.grafo.abierta
+    resultado = ResultadoBusquedaEstaciones(
+        consulta=q,
+        coincidencias=[
+            CoincidenciaEstacion(
+                estacion=c.nombre,
+                nombre=c.nombre_original,
+                tipo=c.tipo,
+                similitud=c.similitud,
+                abierta=bool(abierta[c.estacion])
+            )
+            for c in red.indice_nombres.buscar(q, limite)
+        ]
+    )
+    return ServerResponse(code=0, data=resultado.model_dump(mode="json"))
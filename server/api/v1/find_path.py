@@ -1,55 +1,208 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from models.schemas import ServerResponse, ResultadoRutaParsed
-from bin.helpers.load_locations import load_estaciones_completas
-from bin.algoritmo.a_estrella import a_estrella
-from bin.algoritmo.constantes import VELOCIDAD_NORMAL_PROMEDIO, VELOCIDAD_POR_LLUVIA
-from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import ORJSONResponse
+from models.schemas import (
+    ServerResponse, ModoBusqueda, TipoHeuristica, SolicitudLote, ResultadoAlternativas,
+    ResultadoPareto
+)
+from bin.algoritmo.tablas_costo import regimen_de
+from bin.algoritmo.rutas_alternativas import rutas_alternativas
+from bin.algoritmo.rutas_pareto import rutas_pareto
+from bin.red import RedSnapshot
+from bin.red.cache_rutas import CacheRutas, ClaveRuta
+from bin.red.ejecutor import ConsultaRuta, EjecutorBusquedas, EjecutorNoDisponible, EjecutorSaturado
+from bin.red.rutas import MODOS_SIN_HEURISTICA, calcular_rutas_lote, payload_ruta, modelo_ruta
+from api.deps import (
+    get_red, get_cache_rutas, get_metricas, get_ejecutor, get_estacion_origen, get_estacion_destino,
+    resolver_estacion
+)
+from api.metricas import RegistroMetricas
 from config.config import Config
+from datetime import datetime
 
 router = APIRouter() 
 
+
+def _respuesta(code: int, data: Optional[Dict[str, Any]] = None, error: Optional[str] = None,
+               **kwargs: Any) -> ORJSONResponse:
+    """`ServerResponse` codificado directamente con orjson.
+
+    Los payloads de ruta ya tienen la forma del esquema (ver `payload_ruta`),
+    así que se omite la validación de `response_model`, que sigue documentando
+    la respuesta en OpenAPI.
+    """
+    return ORJSONResponse({"code": code, "data": data, "error": error}, **kwargs)
+
+
 @router.get("/", response_model=ServerResponse)
-def find_path(
-        estacion_origen: str,
-        estacion_destino: str,
+async def find_path(
         dia_viaje: datetime,
-        lluvia: bool = False
+        lluvia: bool = False,
+        modo: ModoBusqueda = ModoBusqueda.A_ESTRELLA,
+        heuristica: TipoHeuristica = TipoHeuristica(Config.HEURISTICA),
+        traza: bool = False,
+        red: RedSnapshot = Depends(get_red),
+        estacion_origen: str = Depends(get_estacion_origen),
+        estacion_destino: str = Depends(get_estacion_destino),
+        cache: CacheRutas = Depends(get_cache_rutas),
+        metricas: RegistroMetricas = Depends(get_metricas),
+        ejecutor: EjecutorBusquedas = Depends(get_ejecutor)
+    ) -> ORJSONResponse:
+    """Ruta óptima entre dos estaciones.
+
+    La búsqueda se ejecuta en el pool de `EjecutorBusquedas`; las peticiones
+    idénticas simultáneas comparten un solo cálculo y, si hay demasiadas
+    búsquedas pendientes o un proceso del pool muere durante la búsqueda, se
+    responde 503 con `Retry-After`.
+
+    Con `traza=true` la búsqueda se ejecuta aunque la ruta esté en caché y sus
+    contadores y tiempos se devuelven en `data.traza` y en la cabecera
+    `Server-Timing`.
+
+    Los nombres de estación se resuelven con `resolver_estacion`, como en los
+    demás endpoints; `data.estaciones` lleva siempre los nombres internos.
+    """
+    if modo in MODOS_SIN_HEURISTICA:
+        # La heurística no cambia la ruta: una sola entrada de caché por consulta
+        heuristica = TipoHeuristica(Config.HEURISTICA)
+
+    regimen = regimen_de(dia_viaje, lluvia)
+    salida = dia_viaje if modo == ModoBusqueda.TIEMPO_DEPENDIENTE else None
+    clave = ClaveRuta(red.version_datos, estacion_origen, estacion_destino,
+                      regimen, modo.value, heuristica.value, salida)
+
+    if not traza:
+        with metricas.etapa("cache"):
+            payload = cache.obtener(clave)
+        if payload is not None:
+            return _respuesta(0, payload)
+
+    consulta = ConsultaRuta(estacion_origen, estacion_destino, regimen, modo, heuristica, salida, traza)
+    try:
+        resultado, compartido = await ejecutor.resolver(red, consulta)
+    except EjecutorSaturado as e:
+        metricas.busquedas.incrementar(desenlace="rechazada")
+        return _respuesta(1, error=f"Servidor saturado: {e}",
+                          status_code=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": "1"})
+    except EjecutorNoDisponible as e:
+        metricas.busquedas.incrementar(desenlace="fallida")
+        return _respuesta(1, error=f"Búsqueda interrumpida: {e}",
+                          status_code=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": "1"})
+
+    metricas.busquedas.incrementar(desenlace="compartida" if compartido else "calculada")
+    if not compartido:
+        metricas.observar_etapa("busqueda", resultado.segundos_busqueda)
+        if resultado.segundos_reconstruccion > 0.0:
+            metricas.observar_etapa("reconstruccion", resultado.segundos_reconstruccion)
+        if resultado.payload is not None:
+            metricas.observar_etapa("serializacion", resultado.segundos_serializacion)
+            cache.guardar(clave, resultado.payload, resultado.dependencias)
+
+    if resultado.payload is None:
+        return _respuesta(1, error=resultado.error)
+
+    if traza:
+        return _respuesta(0, {**resultado.payload, "traza": resultado.traza},
+                          headers={"Server-Timing": resultado.server_timing})
+    return _respuesta(0, resultado.payload)
+
+
+@router.post("/batch", response_model=ServerResponse)
+def find_path_batch(
+        solicitud: SolicitudLote,
+        red: RedSnapshot = Depends(get_red)
+    ) -> ORJSONResponse:
+
+    if len(solicitud.pares) > Config.MAX_PARES_LOTE:
+        return _respuesta(
+            1, error=f"El lote tiene {len(solicitud.pares)} pares; el máximo es {Config.MAX_PARES_LOTE}"
+        )
+
+    pares = [(resolver_estacion(red, p.estacion_origen), resolver_estacion(red, p.estacion_destino))
+             for p in solicitud.pares]
+    resultados = calcular_rutas_lote(red, pares, regimen_de(solicitud.dia_viaje, solicitud.lluvia))
+
+    # Cada elemento tiene la forma de `ResultadoPar`
+    respuestas = []
+    for (origen, destino), resultado in zip(pares, resultados):
+        par = {"estacion_origen": origen, "estacion_destino": destino, "code": 0, "data": None, "error": None}
+        if resultado.exito:
+            par["data"] = payload_ruta(resultado)
+        else:
+            par["code"] = 1
+            par["error"] = resultado.mensaje
+        respuestas.append(par)
+
+    return _respuesta(0, {"resultados": respuestas})
+
+
+@router.get("/alternativas", response_model=ServerResponse)
+def find_path_alternativas(
+        dia_viaje: datetime,
+        lluvia: bool = False,
+        k: int = Query(default=3, ge=1, le=Config.MAX_RUTAS_ALTERNATIVAS),
+        red: RedSnapshot = Depends(get_red),
+        estacion_origen: str = Depends(get_estacion_origen),
+        estacion_destino: str = Depends(get_estacion_destino)
     ) -> ServerResponse:
-    
-    estaciones = load_estaciones_completas(Config.DATOS_COMPLETOS)
-    estaciones_dict = {e.name: e for e in estaciones}
-
-    afluencia_max = max(
-        afluencia.promedio
-        for estacion in estaciones
-        for afluencia in estacion.afluencia_promedio
+    """Hasta `k` rutas sin estaciones repetidas, en orden de costo.
+
+    Si se agota `Config.PRESUPUESTO_ALTERNATIVAS_MS` se devuelven las rutas
+    encontradas hasta ese momento con `completa` en falso.
+    """
+    alternativas = rutas_alternativas(
+        red.grafo, red.tablas, estacion_origen, estacion_destino,
+        regimen_de(dia_viaje, lluvia), k,
+        limite_segundos=Config.PRESUPUESTO_ALTERNATIVAS_MS / 1000.0
+    )
+    primera = alternativas.rutas[0]
+    if not primera.exito:
+        return ServerResponse(code=1, error=primera.mensaje)
+
+    resultado = ResultadoAlternativas(
+        estacion_origen=estacion_origen,
+        estacion_destino=estacion_destino,
+        rutas=[modelo_ruta(ruta) for ruta in alternativas.rutas],
+        completa=alternativas.completa
     )
+    return ServerResponse(code=0, data=resultado.model_dump(mode="json"))
 
 
-    resultado = a_estrella(
+@router.get("/pareto", response_model=ServerResponse)
+def find_path_pareto(
+        dia_viaje: datetime,
+        lluvia: bool = False,
+        red: RedSnapshot = Depends(get_red),
+        estacion_origen: str = Depends(get_estacion_origen),
+        estacion_destino: str = Depends(get_estacion_destino)
+    ) -> ServerResponse:
+    """Rutas Pareto-óptimas por tiempo, transbordos y exposición a la afluencia.
+
+    Cada ruta lleva sus propias métricas; `completa` es falso si la búsqueda
+    se recortó por `Config.MAX_ETIQUETAS_PARETO` o `Config.PRESUPUESTO_PARETO_MS`
+    (si se recortó antes de llegar al destino, solo trae la ruta más rápida).
+    """
+    pareto = rutas_pareto(
+        red.grafo, red.tablas, estacion_origen, estacion_destino,
+        regimen_de(dia_viaje, lluvia),
+        max_etiquetas=Config.MAX_ETIQUETAS_PARETO,
+        limite_segundos=Config.PRESUPUESTO_PARETO_MS / 1000.0
+    )
+    primera = pareto.rutas[0]
+    if not primera.exito:
+        return ServerResponse(code=1, error=primera.mensaje)
+
+    resultado = ResultadoPareto(
         estacion_origen=estacion_origen,
         estacion_destino=estacion_destino,
-        estaciones_dict=estaciones_dict,
-        dia_viaje=dia_viaje,
-        afluencia_max=afluencia_max,
-        velocidad_metro_kmh=VELOCIDAD_NORMAL_PROMEDIO if not lluvia else VELOCIDAD_POR_LLUVIA,
-        # debug=True
+        rutas=[modelo_ruta(ruta) for ruta in pareto.rutas],
+        completa=pareto.completa
     )
+    return ServerResponse(code=0, data=resultado.model_dump(mode="json"))
 
-    response = ServerResponse(code=0)
-
-    if resultado.exito: 
-        response.code = 0
-        response.data = ResultadoRutaParsed(
-            estaciones=resultado.estaciones,
-            pasos=resultado.pasos,
-            costo_total_minutos=resultado.costo_total_minutos,
-            distancia_total_km=resultado.distancia_total_km,
-            lineas_utilizadas=resultado.lineas_utilizadas,
-            numero_transbordos=resultado.numero_transbordos
-        )
-    else:
-        response.code = 1
-        response.error = resultado.mensaje
 
-    return response
+@router.get("/cache", response_model=ServerResponse)
+def cache_stats(cache: CacheRutas = Depends(get_cache_rutas),
+                ejecutor: EjecutorBusquedas = Depends(get_ejecutor)) -> ServerResponse:
+    return ServerResponse(code=0, data={**cache.estadisticas(), "ejecutor": ejecutor.estadisticas()})
@@ -0,0 +1,53 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from models.schemas import ServerResponse, ResultadoIsocrona, TiempoEstacion
+from bin.algoritmo.tablas_costo import regimen_de
+from bin.algoritmo.dijkstra import arbol_dijkstra, distancias_y_transbordos
+from bin.red import RedSnapshot
+from api.deps import get_red, get_estacion_origen
+from datetime import datetime
+
+router = APIRouter()
+
+@router.get("/", response_model=ServerResponse)
+def isocrona(
+        dia_viaje: datetime,
+        lluvia: bool = False,
+        max_minutos: Optional[float] = Query(default=None, gt=0),
+        red: RedSnapshot = Depends(get_red),
+        estacion_origen: str = Depends(get_estacion_origen)
+    ) -> ServerResponse:
+    """Tiempo, distancia y transbordos mínimos desde una estación a todas las demás.
+
+    Se resuelve con una sola búsqueda de Dijkstra; con `max_minutos` la
+    búsqueda se detiene al superar ese tiempo.
+    """
+    grafo = red.grafo
+    if estacion_origen not in grafo.indice:
+        return ServerResponse(code=1, error=f"Estación de origen '{estacion_origen}' no encontrada")
+    if not grafo.abierta[grafo.indice[estacion_origen]]:
+        return ServerResponse(code=1, error=f"Estación de origen '{estacion_origen}' está cerrada")
+
+    arbol = arbol_dijkstra(
+        grafo,
+        red.tablas.de(regimen_de(dia_viaje, lluvia)),
+        grafo.indice[estacion_origen],
+        limite_segundos=max_minutos * 60.0 if max_minutos is not None else None
+    )
+    distancias, transbordos = distancias_y_transbordos(grafo, arbol)
+
+    resultado = ResultadoIsocrona(estacion_origen=estacion_origen, max_minutos=max_minutos)
+    for estado in arbol.orden:
+        estacion = int(grafo.estado_estacion[estado])
+        if arbol.mejor_estado[estacion] != estado:
+            continue
+        resultado.estaciones.append(TiempoEstacion(
+            estacion=grafo.nombres[estacion],
+            nombre=grafo.nombres_originales[estacion],
+            linea=grafo.linea_de(estado),
+            tiempo_minutos=arbol.g[estado] / 60.0,
+            distancia_km=distancias[estado],
+            numero_transbordos=transbordos[estado]
+        ))
+
+    return ServerResponse(code=0, data=resultado.model_dump(mode="json"))
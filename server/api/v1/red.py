@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import ORJSONResponse
+from typing import Optional
+from models.schemas import ServerResponse
+from bin.red import RedSnapshot
+from bin.red.publicacion import MapaRed, PublicacionRed
+from bin.red.registro import RegistroRedes
+from api.deps import get_red, get_publicacion_red, get_registro_redes
+
+router = APIRouter()
+
+
+def _coincide_etag(if_none_match: Optional[str], mapa: MapaRed) -> bool:
+    """Si `If-None-Match` incluye alguna representación del mapa (comparación débil)."""
+    if not if_none_match:
+        return False
+    for etiqueta in if_none_match.split(","):
+        etiqueta = etiqueta.strip()
+        if etiqueta == "*":
+            return True
+        if etiqueta.startswith("W/"):
+            etiqueta = etiqueta[2:]
+        if etiqueta in (mapa.etag, mapa.etag_gzip):
+            return True
+    return False
+
+
+def _acepta_gzip(accept_encoding: Optional[str]) -> bool:
+    for codificacion in (accept_encoding or "").split(","):
+        nombre, _, parametros = codificacion.partition(";")
+        if nombre.strip().lower() not in ("gzip", "*"):
+            continue
+        calidad = parametros.strip().lower()
+        if not calidad.startswith("q="):
+            return True
+        try:
+            return float(calidad[2:]) > 0
+        except ValueError:
+            return False
+    return False
+
+
+@router.get("/", response_model=ServerResponse, responses={304: {"description": "El mapa no cambió"}})
+async def red_completa(
+        if_none_match: Optional[str] = Header(default=None),
+        accept_encoding: Optional[str] = Header(default=None),
+        red: RedSnapshot = Depends(get_red),
+        publicacion: PublicacionRed = Depends(get_publicacion_red)
+    ) -> Response:
+    """Estaciones, coordenadas por línea, conexiones y estado de operación (`MapaRedParsed`).
+
+    El cuerpo se serializa y comprime una vez por instantánea. Con
+    `If-None-Match` igual al ETag vigente se responde 304 sin cuerpo; para
+    ponerse al día después de un cierre basta `/network/cambios`.
+    """
+    mapa = publicacion.mapa(red)
+    gzip = _acepta_gzip(accept_encoding)
+    cabeceras = {
+        "ETag": mapa.etag_gzip if gzip else mapa.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if _coincide_etag(if_none_match, mapa):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabeceras)
+    if gzip:
+        cabeceras["Content-Encoding"] = "gzip"
+        return Response(mapa.cuerpo_gzip, media_type="application/json", headers=cabeceras)
+    return Response(mapa.cuerpo, media_type="application/json", headers=cabeceras)
+
+
+@router.get("/cambios", response_model=ServerResponse)
+async def cambios_red(
+        desde: int = Query(ge=0),
+        red: RedSnapshot = Depends(get_red),
+        publicacion: PublicacionRed = Depends(get_publicacion_red)
+    ) -> ORJSONResponse:
+    """Estaciones y tramos que se abrieron o cerraron después de la versión `desde` (`CambiosRed`).
+
+    Si `desde` es anterior al historial o de una red con otras estaciones o
+    conexiones se responde con error y hay que descargar `/network` completo.
+    """
+    publicacion.mapa(red)
+    try:
+        mapa, cambios = publicacion.cambios_desde(desde)
+    except ValueError as e:
+        return ORJSONResponse({"code": 1, "data": None, "error": str(e)})
+
+    estaciones, tramos = [], []
+    for cambio in cambios:
+        for estacion, abierta in sorted(cambio.estaciones.items()):
+            estaciones.append({"version": cambio.version, "estacion": estacion, "abierta": abierta})
+        for tramo, abierta in sorted(cambio.tramos.items()):
+            tramos.append({"version": cambio.version, "estacion_a": tramo.estacion_a,
+                           "estacion_b": tramo.estacion_b, "linea": tramo.linea.value, "abierta": abierta})
+    data = {"desde": desde, "version": mapa.version, "etag": mapa.etag,
+            "estaciones": estaciones, "tramos": tramos}
+    return ORJSONResponse({"code": 0, "data": data, "error": None})
+
+
+@router.get("/redes", response_model=ServerResponse)
+async def redes_disponibles(registro: RegistroRedes = Depends(get_registro_redes)) -> ServerResponse:
+    """Redes que se pueden consultar con el parámetro `red`, si están cargadas y su memoria.
+
+    Solo lista las registradas: las agregadas al directorio de datos después
+    de arrancar aparecen tras `POST /admin/redes/descubrir`.
+    """
+    return ServerResponse(code=0, data=registro.estadisticas())
@@ -0,0 +1,18 @@
+"""Suite de benchmarks del motor de rutas y de la API.
+
+Tres niveles, cada uno en su módulo:
+
+* `micro`: `a_estrella` (y su versión compilada) sobre todos los pares
+  origen/destino en cada régimen representativo.
+* `componentes`: carga de datos, compilación de la red, `reconstruir_ruta` y
+  serialización de la respuesta.
+* `e2e`: la aplicación FastAPI completa, en proceso, sin red de por medio.
+
+Cada medición reporta latencias p50/p95/p99 y, donde aplica, nodos expandidos
+e inserciones/extracciones del heap. Los resultados se comparan contra una
+base guardada en JSON y la ejecución falla si alguna métrica empeora más que
+el umbral. Se ejecuta desde `server/`:
+
+    python -m benchmarks [--niveles micro componentes e2e] [--pares N]
+                         [--base RUTA] [--umbral 0.10] [--guardar-base]
+"""
@@ -0,0 +1,131 @@
+"""Ejecuta la suite y compara contra la base guardada.
+
+    python -m benchmarks [--niveles micro componentes e2e] [--pares N]
+                         [--peticiones N] [--base RUTA] [--umbral 0.10]
+                         [--guardar-base] [--salida RUTA]
+
+Sale con código 1 si alguna métrica empeora más que `--umbral` respecto a la
+base, o si la base se midió con otros parámetros.
+"""
+
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from config.config import Config
+from bin.red import cargar_snapshot
+from benchmarks.medicion import METRICAS_LATENCIA, METRICAS_TRABAJO
+from benchmarks.micro import medir_micro, pares_od
+
+NIVELES = ("micro", "componentes", "e2e")
+BASE_POR_DEFECTO = Path(__file__).parent / "base.json"
+
+
+def comparar(actual: Dict[str, dict], base: Dict[str, dict], umbral: float) -> List[str]:
+    """Métricas que empeoraron más que `umbral` (fracción) respecto a `base`."""
+    regresiones = []
+    for nombre, metricas in actual.items():
+        referencia = base.get(nombre)
+        if referencia is None:
+            continue
+        for metrica in METRICAS_LATENCIA + METRICAS_TRABAJO:
+            if metrica not in metricas or metrica not in referencia:
+                continue
+            antes, ahora = referencia[metrica], metricas[metrica]
+            if ahora > antes * (1.0 + umbral):
+                cambio = (ahora / antes - 1.0) * 100.0 if antes else float("inf")
+                regresiones.append(f"{nombre} {metrica}: {antes:.4g} -> {ahora:.4g} (+{cambio:.1f}%)")
+    return regresiones
+
+
+def _imprimir(resultados: Dict[str, dict]) -> None:
+    for nombre, metricas in resultados.items():
+        linea = (f"  {nombre:<40} n={metricas['n']:<6} p50 {metricas['p50_ms']:8.3f} ms  "
+                 f"p95 {metricas['p95_ms']:8.3f} ms  p99 {metricas['p99_ms']:8.3f} ms")
+        if "nodos_expandidos" in metricas:
+            linea += (f"  expandidos {metricas['nodos_expandidos']}"
+                      f"  heap +{metricas['inserciones_heap']}/-{metricas['extracciones_heap']}")
+        print(linea)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks del motor de rutas y de la API")
+    parser.add_argument("--niveles", nargs="+", choices=NIVELES, default=list(NIVELES))
+    parser.add_argument("--datos", type=Path, default=Config.DATOS_COMPLETOS,
+                        help="Archivo de datos de la red")
+    parser.add_argument("--pares", type=int, default=0,
+                        help="Muestra fija de pares origen/destino para el nivel micro (0 = todos)")
+    parser.add_argument("--peticiones", type=int, default=500,
+                        help="Pares para los niveles de componentes y e2e")
+    parser.add_argument("--base", type=Path, default=BASE_POR_DEFECTO,
+                        help="Archivo JSON con la base de comparación")
+    parser.add_argument("--umbral", type=float, default=0.10,
+                        help="Empeoramiento tolerado por métrica (0.10 = 10%%)")
+    parser.add_argument("--guardar-base", action="store_true",
+                        help="Guarda los resultados como nueva base en lugar de comparar")
+    parser.add_argument("--salida", type=Path, help="Guarda también los resultados en este archivo")
+    args = parser.parse_args()
+
+    red = cargar_snapshot(args.datos)
+    parametros = {
+        "datos": args.datos.name,
+        "pares": args.pares,
+        "peticiones": args.peticiones,
+    }
+    resultados: Dict[str, dict] = {}
+
+    if "micro" in args.niveles:
+        pares = pares_od(red, args.pares or None)
+        print(f"Micro: {len(pares)} pares por régimen")
+        resultados.update(medir_micro(red, pares))
+    muestra = pares_od(red, args.peticiones, semilla=1)
+    if "componentes" in args.niveles:
+        from benchmarks.componentes import medir_componentes
+        print("Componentes")
+        resultados.update(medir_componentes(red, args.datos, muestra))
+    if "e2e" in args.niveles:
+        from benchmarks.e2e import medir_e2e
+        print(f"E2E: {len(muestra)} peticiones por pasada")
+        resultados.update(medir_e2e(muestra))
+    _imprimir(resultados)
+
+    reporte = {
+        "parametros": parametros,
+        "entorno": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+        },
+        "resultados": resultados,
+    }
+    if args.salida is not None:
+        args.salida.write_text(json.dumps(reporte, indent=2), encoding="utf-8")
+
+    if args.guardar_base:
+        args.base.write_text(json.dumps(reporte, indent=2), encoding="utf-8")
+        print(f"Base guardada en {args.base}")
+        return 0
+
+    if not args.base.exists():
+        print(f"Sin base en {args.base}; usa --guardar-base para crearla")
+        return 0
+    base = json.loads(args.base.read_text(encoding="utf-8"))
+    if base.get("parametros") != parametros:
+        print(f"La base se midió con otros parámetros: {base.get('parametros')}")
+        return 1
+    regresiones = comparar(resultados, base["resultados"], args.umbral)
+    if regresiones:
+        print(f"Regresiones (umbral {args.umbral:.0%}):")
+        for regresion in regresiones:
+            print(f"  {regresion}")
+        return 1
+    print(f"Sin regresiones respecto a {args.base} (umbral {args.umbral:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Nivel de componentes: carga de datos, reconstrucción de rutas y serialización.
+
+La serialización se mide por el camino de la API (`payload_ruta` + orjson) y,
+como referencia, construyendo y validando los modelos pydantic.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from fastapi.responses import ORJSONResponse
+
+import bin.algoritmo.a_estrella as modulo_a_estrella
+from bin.algoritmo.a_estrella import RegistrosBusqueda, a_estrella, reconstruir_ruta
+from bin.algoritmo.tablas_costo import regimen_de
+from bin.helpers.load_locations import load_estaciones_completas
+from bin.red import RedSnapshot, construir_snapshot
+from bin.red.rutas import modelo_ruta, payload_ruta
+from models.schemas import ServerResponse
+from benchmarks.medicion import cronometrar, resumen
+from benchmarks.micro import REGIMENES_BENCH
+
+
+def _finales(red: RedSnapshot, pares: List[Tuple[str, str]]) -> List[Tuple[RegistrosBusqueda, int]]:
+    """Registros y registro final de la búsqueda de cada par, tal como los recibe `reconstruir_ruta`."""
+    dia_viaje, lluvia = REGIMENES_BENCH["semana_pico"]
+    velocidad = regimen_de(dia_viaje, lluvia).velocidad_kmh
+    finales = []
+
+    def capturar(registros, indice_final):
+        finales.append((registros, indice_final))
+        return reconstruir_ruta(registros, indice_final)
+
+    modulo_a_estrella.reconstruir_ruta = capturar
+    try:
+        for o, d in pares:
+            a_estrella(o, d, red.estaciones_dict, dia_viaje, red.afluencia_max, velocidad)
+    finally:
+        modulo_a_estrella.reconstruir_ruta = reconstruir_ruta
+    return finales
+
+
+def medir_componentes(red: RedSnapshot, ruta_datos: Path, pares: List[Tuple[str, str]],
+                      repeticiones: int = 20) -> Dict[str, dict]:
+    """Mide las etapas fuera de la búsqueda.
+
+    Args:
+        red: Instantánea de la red ya cargada
+        ruta_datos: Archivo de datos de la red
+        pares: Pares cuyas rutas se reconstruyen y serializan
+        repeticiones: Veces que se miden la carga y la compilación
+
+    Returns:
+        Métricas por benchmark
+    """
+    resultados = {}
+
+    tiempos = cronometrar(load_estaciones_completas, [(ruta_datos,)] * repeticiones, calentamiento=1)
+    resultados["carga_datos"] = resumen(tiempos)
+
+    estaciones = load_estaciones_completas(ruta_datos)
+
+    def compilar(estaciones_red):
+        snapshot = construir_snapshot(estaciones_red)
+        return snapshot.grafo, snapshot.tablas
+
+    tiempos = cronometrar(compilar, [(estaciones,)] * repeticiones, calentamiento=1)
+    resultados["compilacion_red"] = resumen(tiempos)
+
+    finales = _finales(red, pares)
+    tiempos = cronometrar(reconstruir_ruta, finales, calentamiento=min(50, len(finales)))
+    resultados["reconstruir_ruta"] = resumen(tiempos)
+
+    rutas = [reconstruir_ruta(*final) for final in finales]
+
+    # Lo que hace /find-path/: payload armado directamente y codificado con orjson
+    def serializar(resultado):
+        return ORJSONResponse({"code": 0, "data": payload_ruta(resultado), "error": None}).body
+
+    # Referencia: validar el modelo y serializar con pydantic
+    def serializar_pydantic(resultado):
+        return ServerResponse(code=0, data=modelo_ruta(resultado).model_dump(mode="json")).model_dump_json()
+
+    for nombre, funcion in (("serializacion_respuesta", serializar),
+                            ("serializacion_pydantic", serializar_pydantic)):
+        tiempos = cronometrar(funcion, [(ruta,) for ruta in rutas], calentamiento=min(50, len(rutas)))
+        resultados[nombre] = resumen(tiempos)
+    return resultados
@@ -0,0 +1,51 @@
+"""Nivel extremo a extremo: la aplicación FastAPI completa, en proceso.
+
+Las peticiones pasan por todo el stack ASGI (ruteo, validación, dependencias,
+caché, serialización) mediante `httpx.ASGITransport`, sin sockets, y el
+`lifespan` de la aplicación se ejecuta como al arrancar el servidor.
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+from benchmarks.medicion import resumen, sin_recolector
+
+
+async def _medir(pares: List[Tuple[str, str]]) -> Dict[str, dict]:
+    from main import app
+
+    async def pasada(cliente: httpx.AsyncClient) -> List[float]:
+        tiempos = []
+        with sin_recolector():
+            for origen, destino in pares:
+                inicio = time.perf_counter_ns()
+                respuesta = await cliente.get("/api/v1/find-path/", params={
+                    "estacion_origen": origen,
+                    "estacion_destino": destino,
+                    "dia_viaje": "2024-01-02T08:00:00",
+                })
+                tiempos.append((time.perf_counter_ns() - inicio) / 1e6)
+                respuesta.raise_for_status()
+        return tiempos
+
+    async with app.router.lifespan_context(app):
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://benchmark") as cliente:
+            await cliente.get("/")
+            # Primera pasada con el caché vacío; la segunda repite los mismos pares
+            app.state.redes.entrada().cache.invalidar()
+            frio = await pasada(cliente)
+            caliente = await pasada(cliente)
+
+    return {
+        "find_path/cache_frio": resumen(frio),
+        "find_path/cache_caliente": resumen(caliente),
+    }
+
+
+def medir_e2e(pares: List[Tuple[str, str]]) -> Dict[str, dict]:
+    """Mide `GET /api/v1/find-path/` para cada par, con el caché frío y caliente."""
+    return asyncio.run(_medir(pares))
@@ -0,0 +1,276 @@
+"""Escalamiento con el tamaño de la red, sobre redes sintéticas.
+
+    python -m benchmarks.escalamiento [--tamanos 1000 10000 100000] [--consultas 20]
+        [--lineas 12] [--densidad-transbordos 0.1] [--disposicion aleatoria]
+        [--afluencia lognormal] [--fraccion-cerradas 0.0] [--semilla 0]
+        [--directorio DIR] [--salida RUTA] [--base RUTA] [--umbral 0.25]
+
+Para cada tamaño genera una red con `benchmarks.red_sintetica` y mide:
+
+* carga: lectura y validación del JSON (`load_estaciones_completas`),
+  compilación del grafo, tablas de costo, landmarks y el formato binario
+  (escritura y carga con `mmap`);
+* memoria: lo que retienen las estaciones pydantic y el grafo con sus tablas
+  (con `tracemalloc`, en una pasada aparte) y el tamaño de los archivos;
+* consultas: latencia y nodos expandidos de `a_estrella` (estaciones pydantic
+  y `costo_real`) y de `a_estrella_compilado` con haversine y con ALT, sobre
+  pares al azar de estaciones abiertas.
+
+Al final se imprime el exponente de crecimiento entre tamaños consecutivos
+(1 = lineal). Con `--base` se comparan las métricas contra un reporte
+anterior guardado con `--salida` y se sale con código 1 si alguna empeora más
+que `--umbral`.
+"""
+
+import argparse
+import gc
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import bin.algoritmo.a_estrella as modulo_a_estrella
+from bin.algoritmo.a_estrella import a_estrella
+from bin.algoritmo.a_estrella_compilado import a_estrella_compilado
+from bin.algoritmo.tablas_costo import construir_tablas, regimen_de
+from bin.helpers.load_locations import load_estaciones_completas
+from bin.red.formato_binario import cargar_red_binaria, guardar_red_binaria, huella_archivo, ruta_binaria
+from bin.red.snapshot import RedSnapshot, construir_snapshot, snapshot_de_binaria
+from benchmarks.medicion import contar_heap, cronometrar, resumen
+from benchmarks.red_sintetica import ParametrosRed, agregar_argumentos, escribir_red, parametros_de
+
+# Régimen de las consultas: día entre semana, hora valle, sin lluvia
+_DIA_VIAJE = datetime(2024, 1, 2, 12, 0)
+_MB = 1024 * 1024
+
+
+def _segundos(funcion: Callable[[], object]) -> Tuple[object, float]:
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+def _pares(red: RedSnapshot, consultas: int, semilla: int) -> List[Tuple[str, str]]:
+    grafo = red.grafo
+    abiertas = [nombre for nombre, abierta in zip(grafo.nombres, grafo.abierta) if abierta]
+    rng = random.Random(semilla)
+    return [tuple(rng.sample(abiertas, 2)) for _ in range(consultas)]
+
+
+def _medir_carga(datos: Path) -> Tuple[RedSnapshot, Dict[str, float]]:
+    """Tiempos de carga y preparación; devuelve la red lista para consultas."""
+    gc.collect()
+    estaciones, carga_json = _segundos(lambda: load_estaciones_completas(datos))
+    red, snapshot = _segundos(lambda: construir_snapshot(estaciones, origen=datos))
+    _, compilacion = _segundos(lambda: red.grafo)
+    _, tablas = _segundos(lambda: red.tablas)
+    _, landmarks = _segundos(lambda: red.landmarks)
+
+    binario = ruta_binaria(datos)
+    huella = huella_archivo(datos)
+    _, escritura_binaria = _segundos(lambda: guardar_red_binaria(red.grafo, red.afluencia_max, huella, binario))
+    _, carga_binaria = _segundos(lambda: snapshot_de_binaria(cargar_red_binaria(binario, huella), origen=datos))
+
+    return red, {
+        "carga_json_s": carga_json,
+        "snapshot_s": snapshot,
+        "compilacion_s": compilacion,
+        "tablas_s": tablas,
+        "landmarks_s": landmarks,
+        "escritura_binaria_s": escritura_binaria,
+        "carga_binaria_s": carga_binaria,
+    }
+
+
+def _medir_memoria(datos: Path) -> Dict[str, float]:
+    """Memoria retenida por cada representación de la red, en MB."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        estaciones = load_estaciones_completas(datos)
+        gc.collect()
+        tras_estaciones, _ = tracemalloc.get_traced_memory()
+        red = construir_snapshot(estaciones, origen=datos)
+        grafo = red.grafo
+        tablas = construir_tablas(grafo)
+        gc.collect()
+        _, pico = tracemalloc.get_traced_memory()
+        # Sin las estaciones pydantic queda lo que retiene una red cargada del binario
+        del estaciones, red
+        gc.collect()
+        solo_grafo, _ = tracemalloc.get_traced_memory()
+        del tablas
+    finally:
+        tracemalloc.stop()
+    return {
+        "memoria_estaciones_mb": tras_estaciones / _MB,
+        "memoria_grafo_mb": solo_grafo / _MB,
+        "memoria_arreglos_grafo_mb": grafo.nbytes / _MB,
+        "memoria_pico_carga_mb": pico / _MB,
+        "archivo_json_mb": datos.stat().st_size / _MB,
+        "archivo_binario_mb": ruta_binaria(datos).stat().st_size / _MB,
+    }
+
+
+def _medir_consultas(red: RedSnapshot, pares: List[Tuple[str, str]],
+                     clasico: bool) -> Dict[str, dict]:
+    regimen = regimen_de(_DIA_VIAJE, False)
+    grafo, tablas, landmarks = red.grafo, red.tablas, red.landmarks
+    motores: Dict[str, Callable[[str, str], object]] = {
+        "compilado_haversine": lambda o, d: a_estrella_compilado(grafo, tablas, o, d, regimen),
+        "compilado_alt": lambda o, d: a_estrella_compilado(grafo, tablas, o, d, regimen, landmarks=landmarks),
+    }
+    if clasico:
+        estaciones_dict = red.estaciones_dict
+        motores["a_estrella"] = lambda o, d: a_estrella(
+            o, d, estaciones_dict, _DIA_VIAJE, red.afluencia_max, regimen.velocidad_kmh)
+
+    resultados = {}
+    for motor, funcion in motores.items():
+        tiempos = cronometrar(funcion, pares, calentamiento=min(3, len(pares)))
+        expandidos = [funcion(o, d).nodos_expandidos for o, d in pares]
+        metricas = {**resumen(tiempos), "expandidos_media": sum(expandidos) / len(expandidos)}
+        if motor == "a_estrella":
+            with contar_heap(modulo_a_estrella) as conteo:
+                for o, d in pares:
+                    funcion(o, d)
+            metricas["inserciones_heap_media"] = conteo["inserciones_heap"] / len(pares)
+        resultados[motor] = metricas
+    return resultados
+
+
+def medir_tamano(parametros: ParametrosRed, directorio: Path, consultas: int,
+                 clasico: bool = True) -> Dict[str, object]:
+    """Genera la red de `parametros` en `directorio` y mide carga, memoria y consultas."""
+    datos = directorio / f"sintetica-{parametros.estaciones}.json"
+    _, generacion = _segundos(lambda: escribir_red(parametros, datos))
+    red, carga = _medir_carga(datos)
+    memoria = _medir_memoria(datos)
+    grafo = red.grafo
+    return {
+        "estaciones": grafo.numero_estaciones,
+        "estados": grafo.numero_estados,
+        "aristas": grafo.numero_aristas,
+        "generacion_s": generacion,
+        **carga,
+        **memoria,
+        "consultas": _medir_consultas(red, _pares(red, consultas, parametros.semilla), clasico),
+    }
+
+
+def _metricas_planas(reporte: Dict[str, object]) -> Dict[str, float]:
+    """Métricas comparables de un tamaño: tiempos, memoria y latencias."""
+    planas = {k: v for k, v in reporte.items() if k.endswith(("_s", "_mb")) and k != "generacion_s"}
+    for motor, metricas in reporte["consultas"].items():
+        for metrica in ("p50_ms", "p95_ms", "expandidos_media"):
+            planas[f"{motor}.{metrica}"] = metricas[metrica]
+    return planas
+
+
+def exponentes(tamanos: List[Dict[str, object]]) -> Dict[str, Dict[str, float]]:
+    """Exponente k de `métrica ~ estaciones^k` entre cada par de tamaños consecutivos."""
+    resultado = {}
+    for menor, mayor in zip(tamanos, tamanos[1:]):
+        escala = math.log(mayor["estaciones"] / menor["estaciones"])
+        a, b = _metricas_planas(menor), _metricas_planas(mayor)
+        resultado[f"{menor['estaciones']}->{mayor['estaciones']}"] = {
+            nombre: math.log(b[nombre] / a[nombre]) / escala
+            for nombre in a if nombre in b and a[nombre] > 0 and b[nombre] > 0
+        }
+    return resultado
+
+
+def comparar(actual: List[Dict[str, object]], base: List[Dict[str, object]], umbral: float) -> List[str]:
+    """Métricas que empeoraron más que `umbral` respecto al mismo tamaño de `base`."""
+    por_tamano = {r["estaciones"]: _metricas_planas(r) for r in base}
+    regresiones = []
+    for reporte in actual:
+        referencia = por_tamano.get(reporte["estaciones"])
+        if referencia is None:
+            continue
+        for nombre, ahora in _metricas_planas(reporte).items():
+            antes = referencia.get(nombre)
+            if antes and ahora > antes * (1.0 + umbral):
+                regresiones.append(f"n={reporte['estaciones']} {nombre}: {antes:.4g} -> {ahora:.4g} "
+                                   f"(+{(ahora / antes - 1.0) * 100.0:.1f}%)")
+    return regresiones
+
+
+def _imprimir(reporte: Dict[str, object]) -> None:
+    print(f"  {reporte['estaciones']} estaciones, {reporte['estados']} estados, {reporte['aristas']} aristas")
+    print(f"    carga: json {reporte['carga_json_s']:.3f} s  compilación {reporte['compilacion_s']:.3f} s  "
+          f"tablas {reporte['tablas_s']:.3f} s  landmarks {reporte['landmarks_s']:.3f} s  "
+          f"binario {reporte['carga_binaria_s'] * 1000:.2f} ms")
+    print(f"    memoria: estaciones {reporte['memoria_estaciones_mb']:.1f} MB  "
+          f"grafo+tablas {reporte['memoria_grafo_mb']:.1f} MB  pico {reporte['memoria_pico_carga_mb']:.1f} MB  "
+          f"json {reporte['archivo_json_mb']:.1f} MB  binario {reporte['archivo_binario_mb']:.1f} MB")
+    for motor, metricas in reporte["consultas"].items():
+        print(f"    {motor:<22} p50 {metricas['p50_ms']:9.3f} ms  p95 {metricas['p95_ms']:9.3f} ms  "
+              f"expandidos {metricas['expandidos_media']:.0f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Escalamiento de carga, memoria y consultas con el tamaño de la red")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Estaciones de cada red generada")
+    parser.add_argument("--consultas", type=int, default=20, help="Pares origen/destino por tamaño")
+    parser.add_argument("--sin-clasico", action="store_true",
+                        help="No mide `a_estrella` sobre estaciones pydantic (lento en redes grandes)")
+    parser.add_argument("--directorio", type=Path,
+                        help="Dónde escribir las redes generadas (por defecto, un directorio temporal)")
+    parser.add_argument("--salida", type=Path, help="Guarda el reporte en este archivo JSON")
+    parser.add_argument("--base", type=Path, help="Reporte anterior contra el que comparar")
+    parser.add_argument("--umbral", type=float, default=0.25,
+                        help="Empeoramiento tolerado por métrica (0.25 = 25%%)")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporal:
+        directorio = args.directorio or Path(temporal)
+        directorio.mkdir(parents=True, exist_ok=True)
+        tamanos = []
+        for estaciones in sorted(args.tamanos):
+            parametros = parametros_de(args, estaciones)
+            print(f"Red de {estaciones} estaciones")
+            reporte = medir_tamano(parametros, directorio, args.consultas, clasico=not args.sin_clasico)
+            _imprimir(reporte)
+            tamanos.append(reporte)
+
+    crecimiento = exponentes(tamanos)
+    for intervalo, valores in crecimiento.items():
+        print(f"Exponente {intervalo}: " + "  ".join(
+            f"{nombre} {valores[nombre]:.2f}" for nombre in
+            ("carga_json_s", "compilacion_s", "memoria_grafo_mb", "compilado_haversine.p50_ms",
+             "a_estrella.p50_ms") if nombre in valores))
+
+    parametros = {**asdict(parametros_de(args, 0)), "consultas": args.consultas}
+    parametros.pop("estaciones")
+    reporte = {"parametros": parametros, "tamanos": tamanos, "exponentes": crecimiento}
+    if args.salida is not None:
+        args.salida.write_text(json.dumps(reporte, indent=2), encoding="utf-8")
+
+    if args.base is None:
+        return 0
+    base = json.loads(args.base.read_text(encoding="utf-8"))
+    if base.get("parametros") != parametros:
+        print(f"La base se midió con otros parámetros: {base.get('parametros')}")
+        return 1
+    regresiones = comparar(tamanos, base["tamanos"], args.umbral)
+    if regresiones:
+        print(f"Regresiones (umbral {args.umbral:.0%}):")
+        for regresion in regresiones:
+            print(f"  {regresion}")
+        return 1
+    print(f"Sin regresiones respecto a {args.base} (umbral {args.umbral:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Utilidades comunes de medición: cronómetro, percentiles y contadores del heap."""
+
+import gc
+import heapq
+import statistics
+import time
+from contextlib import contextmanager
+from types import ModuleType, SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+# Métricas de latencia que se comparan contra la base (en milisegundos)
+METRICAS_LATENCIA = ("p50_ms", "p95_ms", "p99_ms")
+# Métricas de trabajo: deterministas para unos mismos datos y pares
+METRICAS_TRABAJO = ("nodos_expandidos", "inserciones_heap", "extracciones_heap")
+
+
+def resumen(tiempos_ms: List[float]) -> Dict[str, float]:
+    """Percentiles y media de una serie de latencias en milisegundos."""
+    if len(tiempos_ms) < 2:
+        valor = tiempos_ms[0] if tiempos_ms else 0.0
+        return {"n": len(tiempos_ms), "p50_ms": valor, "p95_ms": valor, "p99_ms": valor, "media_ms": valor}
+    percentiles = statistics.quantiles(tiempos_ms, n=100, method="inclusive")
+    return {
+        "n": len(tiempos_ms),
+        "p50_ms": percentiles[49],
+        "p95_ms": percentiles[94],
+        "p99_ms": percentiles[98],
+        "media_ms": statistics.fmean(tiempos_ms),
+    }
+
+
+@contextmanager
+def sin_recolector() -> Iterator[None]:
+    """Desactiva el recolector de basura mientras se cronometra.
+
+    Una pausa de recolección cae en una consulta al azar y ensucia los
+    percentiles altos; se recolecta antes de empezar y al terminar.
+    """
+    gc.collect()
+    activo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if activo:
+            gc.enable()
+        gc.collect()
+
+
+def cronometrar(funcion: Callable[..., Any], argumentos: Iterable[tuple],
+                calentamiento: int = 0) -> List[float]:
+    """Latencia en milisegundos de `funcion(*args)` para cada tupla de `argumentos`.
+
+    Args:
+        funcion: Función a medir
+        argumentos: Argumentos de cada llamada
+        calentamiento: Llamadas iniciales que se ejecutan sin medir
+    """
+    argumentos = list(argumentos)
+    for args in argumentos[:calentamiento]:
+        funcion(*args)
+    tiempos = []
+    reloj = time.perf_counter_ns
+    with sin_recolector():
+        for args in argumentos:
+            inicio = reloj()
+            funcion(*args)
+            tiempos.append((reloj() - inicio) / 1e6)
+    return tiempos
+
+
+@contextmanager
+def contar_heap(modulo: ModuleType) -> Iterator[Dict[str, int]]:
+    """Cuenta las inserciones y extracciones del heap que hace `modulo`.
+
+    Sustituye temporalmente el `heapq` que importó el módulo por uno que
+    cuenta; se usa en una pasada aparte para no alterar las latencias.
+    """
+    conteo = {"inserciones_heap": 0, "extracciones_heap": 0}
+
+    def heappush(heap: list, item: Any) -> None:
+        conteo["inserciones_heap"] += 1
+        heapq.heappush(heap, item)
+
+    def heappop(heap: list) -> Any:
+        conteo["extracciones_heap"] += 1
+        return heapq.heappop(heap)
+
+    original = modulo.heapq
+    modulo.heapq = SimpleNamespace(heappush=heappush, heappop=heappop, heapify=heapq.heapify)
+    try:
+        yield conteo
+    finally:
+        modulo.heapq = original
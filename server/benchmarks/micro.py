@@ -0,0 +1,59 @@
+"""Nivel micro: una búsqueda por par origen/destino en cada régimen."""
+
+import random
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import bin.algoritmo.a_estrella as modulo_a_estrella
+import bin.algoritmo.a_estrella_compilado as modulo_compilado
+from bin.algoritmo.a_estrella import a_estrella
+from bin.algoritmo.a_estrella_compilado import a_estrella_compilado
+from bin.algoritmo.tablas_costo import regimen_de
+from bin.red import RedSnapshot
+from benchmarks.medicion import contar_heap, cronometrar, resumen
+
+# Momentos representativos de cada régimen: (día de viaje, lluvia)
+REGIMENES_BENCH: Dict[str, Tuple[datetime, bool]] = {
+    "semana_pico": (datetime(2024, 1, 2, 8, 0), False),
+    "semana_valle": (datetime(2024, 1, 2, 12, 0), False),
+    "fin_de_semana": (datetime(2024, 1, 6, 12, 0), False),
+    "lluvia": (datetime(2024, 1, 2, 12, 0), True),
+}
+
+
+def pares_od(red: RedSnapshot, maximo: Optional[int] = None, semilla: int = 0) -> List[Tuple[str, str]]:
+    """Todos los pares origen/destino distintos, o una muestra fija de `maximo`."""
+    nombres = sorted(red.estaciones_dict)
+    pares = [(o, d) for o in nombres for d in nombres if o != d]
+    if maximo is not None and maximo < len(pares):
+        pares = random.Random(semilla).sample(pares, maximo)
+    return pares
+
+
+def medir_micro(red: RedSnapshot, pares: List[Tuple[str, str]]) -> Dict[str, dict]:
+    """Mide `a_estrella` y `a_estrella_compilado` sobre `pares` en cada régimen.
+
+    Returns:
+        Métricas por benchmark ("<motor>/<régimen>")
+    """
+    resultados = {}
+    for nombre, (dia_viaje, lluvia) in REGIMENES_BENCH.items():
+        regimen = regimen_de(dia_viaje, lluvia)
+
+        def original(o: str, d: str):
+            return a_estrella(o, d, red.estaciones_dict, dia_viaje, red.afluencia_max,
+                              regimen.velocidad_kmh)
+
+        def compilado(o: str, d: str):
+            return a_estrella_compilado(red.grafo, red.tablas, o, d, regimen)
+
+        for motor, funcion, modulo in (("a_estrella", original, modulo_a_estrella),
+                                       ("a_estrella_compilado", compilado, modulo_compilado)):
+            tiempos = cronometrar(funcion, pares, calentamiento=min(50, len(pares)))
+            # Segunda pasada, sin cronometrar, para contar el trabajo
+            with contar_heap(modulo) as conteo:
+                expandidos = sum(funcion(o, d).nodos_expandidos for o, d in pares)
+            resultados[f"{motor}/{nombre}"] = {
+                **resumen(tiempos), "nodos_expandidos": expandidos, **conteo
+            }
+    return resultados
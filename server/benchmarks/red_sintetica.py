@@ -0,0 +1,418 @@
+"""Generador de redes sintéticas con el formato de datos-completos.json.
+
+    python -m benchmarks.red_sintetica --estaciones 10000 --salida red-10k.json
+        [--lineas 40] [--densidad-transbordos 0.1] [--disposicion aleatoria]
+        [--afluencia lognormal] [--fraccion-cerradas 0.0] [--semilla 0]
+
+Cada línea es una secuencia de paradas separadas en promedio `separacion_km`
+y trazada según la disposición:
+
+* `aleatoria`: caminata con giros suaves; cada línea después de la primera
+  empieza junto a una parada de otra, como los ramales de una red que crece.
+* `malla`: líneas rectas alternando horizontales y verticales.
+* `radial`: líneas rectas que cruzan cerca del centro con distintos ángulos.
+
+Las paradas cercanas de líneas distintas se unen en estaciones de transbordo,
+primero las necesarias para que la red sea conexa y luego las más cercanas
+hasta llegar a `densidad_transbordos`. Cada línea conserva sus coordenadas en
+la estación y el transbordo cuesta la distancia entre ellas, como en los datos
+reales.
+
+`LineaEnum` solo tiene 12 líneas: con más, las líneas reutilizan los códigos
+en orden y dos líneas con el mismo código nunca comparten estación, así que
+el par (estación, línea) sigue identificando un único estado del grafo.
+"""
+
+import argparse
+import json
+import math
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from models.estacion_completa import LineaEnum
+from bin.algoritmo.heuristica import calcular_distancia_haversine
+
+DISPOSICIONES = ("aleatoria", "malla", "radial")
+DISTRIBUCIONES_AFLUENCIA = ("lognormal", "uniforme", "pareto")
+
+# Centro de la red generada (Zócalo) y conversión de km a grados
+_CENTRO = (19.432607, -99.133208)
+_KM_POR_GRADO_LAT = 111.32
+_KM_POR_GRADO_LON = _KM_POR_GRADO_LAT * math.cos(math.radians(_CENTRO[0]))
+# Caminata de transbordo mínima cuando las coordenadas de las líneas coinciden
+_TRANSBORDO_MIN_KM = 0.03
+
+LINEAS: Tuple[LineaEnum, ...] = tuple(LineaEnum)
+
+
+@dataclass(frozen=True)
+class ParametrosRed:
+    """Parámetros de una red sintética.
+
+    Attributes:
+        estaciones: Estaciones aproximadas de la red generada
+        lineas: Líneas de la red; más de 12 reutilizan los códigos de `LineaEnum`
+        densidad_transbordos: Fracción de estaciones que son de transbordo
+        disposicion: Trazado de las líneas (ver `DISPOSICIONES`)
+        afluencia: Distribución de la afluencia por estación y línea (ver
+            `DISTRIBUCIONES_AFLUENCIA`)
+        fraccion_cerradas: Fracción de estaciones con `abierta` en falso
+        separacion_km: Distancia media entre paradas contiguas
+        semilla: Semilla del generador; los mismos parámetros generan la
+            misma red
+    """
+    estaciones: int = 1000
+    lineas: int = 12
+    densidad_transbordos: float = 0.1
+    disposicion: str = "aleatoria"
+    afluencia: str = "lognormal"
+    fraccion_cerradas: float = 0.0
+    separacion_km: float = 1.1
+    semilla: int = 0
+
+    def validar(self) -> None:
+        """Raises:
+            ValueError: Si algún parámetro está fuera de rango
+        """
+        if self.lineas < 1:
+            raise ValueError("La red necesita al menos una línea")
+        if self.estaciones < 2 * self.lineas:
+            raise ValueError("Cada línea necesita al menos dos estaciones")
+        if not 0.0 <= self.densidad_transbordos < 0.5:
+            raise ValueError("La densidad de transbordos debe estar en [0, 0.5)")
+        if not 0.0 <= self.fraccion_cerradas < 1.0:
+            raise ValueError("La fracción de estaciones cerradas debe estar en [0, 1)")
+        if self.separacion_km <= 0:
+            raise ValueError("La separación entre estaciones debe ser positiva")
+        if self.disposicion not in DISPOSICIONES:
+            raise ValueError(f"Disposición desconocida: {self.disposicion}")
+        if self.afluencia not in DISTRIBUCIONES_AFLUENCIA:
+            raise ValueError(f"Distribución de afluencia desconocida: {self.afluencia}")
+
+
+class _Conjuntos:
+    """Unión-búsqueda de paradas con los códigos de línea de cada grupo."""
+
+    def __init__(self, codigos: List[int]):
+        self.padre = list(range(len(codigos)))
+        self.codigos: List[Set[int]] = [{c} for c in codigos]
+
+    def raiz(self, x: int) -> int:
+        while self.padre[x] != x:
+            self.padre[x] = self.padre[self.padre[x]]
+            x = self.padre[x]
+        return x
+
+    def unir(self, a: int, b: int) -> bool:
+        """Une los grupos de `a` y `b` si no comparten ningún código de línea."""
+        a, b = self.raiz(a), self.raiz(b)
+        if a == b or self.codigos[a] & self.codigos[b]:
+            return False
+        if len(self.codigos[a]) < len(self.codigos[b]):
+            a, b = b, a
+        self.padre[b] = a
+        self.codigos[a] |= self.codigos[b]
+        self.codigos[b] = set()
+        return True
+
+
+class _Rejilla:
+    """Índice espacial de paradas en celdas cuadradas de `lado` km."""
+
+    def __init__(self, lado: float):
+        self.lado = lado
+        self.celdas: Dict[Tuple[int, int], List[int]] = {}
+
+    def celda(self, x: float, y: float) -> Tuple[int, int]:
+        return int(math.floor(x / self.lado)), int(math.floor(y / self.lado))
+
+    def agregar(self, parada: int, x: float, y: float) -> None:
+        self.celdas.setdefault(self.celda(x, y), []).append(parada)
+
+    def anillo(self, x: float, y: float, radio: int) -> Iterable[int]:
+        """Paradas de las celdas a distancia de Chebyshev exactamente `radio`."""
+        cx, cy = self.celda(x, y)
+        for dx in range(-radio, radio + 1):
+            for dy in range(-radio, radio + 1):
+                if max(abs(dx), abs(dy)) == radio:
+                    yield from self.celdas.get((cx + dx, cy + dy), ())
+
+
+def _trazar(parametros: ParametrosRed, paradas_por_linea: List[int],
+            rng: random.Random) -> List[List[Tuple[float, float]]]:
+    """Coordenadas en km de las paradas de cada línea."""
+    d = parametros.separacion_km
+    total = sum(paradas_por_linea)
+    lado = 1.5 * math.sqrt(total) * d
+    trazos: List[List[Tuple[float, float]]] = []
+
+    for i, n in enumerate(paradas_por_linea):
+        if parametros.disposicion == "aleatoria":
+            if trazos:
+                anterior = rng.choice(trazos)
+                x, y = rng.choice(anterior)
+                x, y = x + rng.uniform(-0.1, 0.1) * d, y + rng.uniform(-0.1, 0.1) * d
+            else:
+                x, y = rng.uniform(0.25, 0.75) * lado, rng.uniform(0.25, 0.75) * lado
+            rumbo = rng.uniform(0, 2 * math.pi)
+            puntos = [(x, y)]
+            for _ in range(n - 1):
+                rumbo += rng.gauss(0.0, 0.25)
+                paso = d * rng.uniform(0.6, 1.4)
+                x, y = x + paso * math.cos(rumbo), y + paso * math.sin(rumbo)
+                # Rebota en los bordes del área
+                if not 0.0 <= x <= lado:
+                    rumbo = math.pi - rumbo
+                    x = min(max(x, 0.0), lado)
+                if not 0.0 <= y <= lado:
+                    rumbo = -rumbo
+                    y = min(max(y, 0.0), lado)
+                puntos.append((x, y))
+        else:
+            if parametros.disposicion == "malla":
+                grupo = (parametros.lineas + 1 - i % 2) // 2
+                angulo = 0.0 if i % 2 == 0 else math.pi / 2
+                desplazamiento = ((i // 2) + 0.5) / max(grupo, 1) * lado - lado / 2
+            else:
+                angulo = math.pi * i / parametros.lineas + rng.uniform(-0.05, 0.05)
+                desplazamiento = rng.uniform(-0.1, 0.1) * lado
+            ux, uy = math.cos(angulo), math.sin(angulo)
+            # Perpendicular a la línea, para desplazarla del centro
+            px, py = -uy, ux
+            inicio = -(n - 1) * d / 2
+            puntos = [
+                (lado / 2 + (inicio + k * d) * ux + desplazamiento * px,
+                 lado / 2 + (inicio + k * d) * uy + desplazamiento * py)
+                for k in range(n)
+            ]
+        trazos.append(puntos)
+    return trazos
+
+
+def _unir_transbordos(parametros: ParametrosRed, trazos: List[List[Tuple[float, float]]],
+                      linea_de: List[int], codigos: List[int], objetivo: int) -> _Conjuntos:
+    """Une paradas cercanas de líneas distintas en estaciones de transbordo."""
+    puntos = [p for trazo in trazos for p in trazo]
+    conjuntos = _Conjuntos(codigos)
+    rejilla = _Rejilla(parametros.separacion_km)
+    for parada, (x, y) in enumerate(puntos):
+        rejilla.agregar(parada, x, y)
+
+    # Candidatos: paradas de líneas con distinto código a menos de una separación
+    radio = parametros.separacion_km
+    candidatos: List[Tuple[float, int, int]] = []
+    for a, (x, y) in enumerate(puntos):
+        for b in (p for r in (0, 1) for p in rejilla.anillo(x, y, r)):
+            if b <= a or linea_de[a] == linea_de[b] or codigos[a] == codigos[b]:
+                continue
+            distancia = math.hypot(puntos[b][0] - x, puntos[b][1] - y)
+            if distancia <= radio:
+                candidatos.append((distancia, a, b))
+    candidatos.sort()
+
+    # Primero las uniones que conectan líneas aún separadas (Kruskal)
+    componente = list(range(len(trazos)))
+
+    def raiz_linea(linea: int) -> int:
+        while componente[linea] != linea:
+            componente[linea] = componente[componente[linea]]
+            linea = componente[linea]
+        return linea
+
+    uniones = 0
+    usados: Set[int] = set()
+    for indice, (_, a, b) in enumerate(candidatos):
+        ra, rb = raiz_linea(linea_de[a]), raiz_linea(linea_de[b])
+        if ra != rb and conjuntos.unir(a, b):
+            componente[rb] = ra
+            uniones += 1
+            usados.add(indice)
+
+    # Líneas que siguen aisladas: la unión válida más cercana con el resto
+    for linea in range(len(trazos)):
+        if raiz_linea(linea) == raiz_linea(0):
+            continue
+        mejor = _union_mas_cercana(
+            rejilla, puntos, conjuntos, [p for p, l in enumerate(linea_de) if raiz_linea(l) == raiz_linea(linea)],
+            lambda p: raiz_linea(linea_de[p]) == raiz_linea(0))
+        if mejor is None:
+            raise ValueError("No se pudo conectar la red; prueba con menos líneas por código")
+        a, b = mejor
+        conjuntos.unir(a, b)
+        uniones += 1
+        componente[raiz_linea(linea)] = raiz_linea(0)
+
+    # Después, los transbordos más cercanos hasta la densidad pedida
+    for indice, (_, a, b) in enumerate(candidatos):
+        if uniones >= objetivo:
+            break
+        if indice not in usados and conjuntos.unir(a, b):
+            uniones += 1
+    return conjuntos
+
+
+def _union_mas_cercana(rejilla: _Rejilla, puntos: List[Tuple[float, float]], conjuntos: _Conjuntos,
+                       propias: List[int], es_destino) -> Optional[Tuple[int, int]]:
+    """Par (propia, ajena) más cercano que `conjuntos.unir` aceptaría."""
+    mejor: Optional[Tuple[float, int, int]] = None
+    columnas = [cx for cx, _ in rejilla.celdas]
+    filas = [cy for _, cy in rejilla.celdas]
+    max_radio = max(max(columnas) - min(columnas), max(filas) - min(filas)) + 1
+    for a in propias:
+        x, y = puntos[a]
+        for radio in range(max_radio + 1):
+            # Las celdas del anillo están al menos a (radio - 1) celdas
+            if mejor is not None and (radio - 1) * rejilla.lado > mejor[0]:
+                break
+            for b in rejilla.anillo(x, y, radio):
+                if not es_destino(b):
+                    continue
+                ra, rb = conjuntos.raiz(a), conjuntos.raiz(b)
+                if ra == rb or conjuntos.codigos[ra] & conjuntos.codigos[rb]:
+                    continue
+                distancia = math.hypot(puntos[b][0] - x, puntos[b][1] - y)
+                if mejor is None or distancia < mejor[0]:
+                    mejor = (distancia, a, b)
+    return None if mejor is None else (mejor[1], mejor[2])
+
+
+def _afluencia(parametros: ParametrosRed, rng: random.Random) -> int:
+    if parametros.afluencia == "uniforme":
+        return rng.randint(2_000, 80_000)
+    if parametros.afluencia == "pareto":
+        return min(int(3_000 * rng.paretovariate(1.5)), 250_000)
+    # Mediana y dispersión parecidas a las de la red real
+    return max(500, int(rng.lognormvariate(math.log(20_000), 0.8)))
+
+
+def _a_coordenadas(x: float, y: float, lado: float) -> Tuple[float, float]:
+    """(latitud, longitud) de un punto en km del área generada."""
+    return (_CENTRO[0] + (y - lado / 2) / _KM_POR_GRADO_LAT,
+            _CENTRO[1] + (x - lado / 2) / _KM_POR_GRADO_LON)
+
+
+def generar_red(parametros: ParametrosRed) -> Dict[str, dict]:
+    """Genera una red con el formato de datos-completos.json.
+
+    Args:
+        parametros: Tamaño, trazado y distribuciones de la red
+
+    Returns:
+        Diccionario nombre -> datos de la estación, listo para `json.dump`
+
+    Raises:
+        ValueError: Si los parámetros están fuera de rango
+    """
+    parametros.validar()
+    rng = random.Random(parametros.semilla)
+
+    # Cada transbordo une dos paradas en una estación; se generan paradas de
+    # más para que la red termine con el número de estaciones pedido
+    objetivo = max(round(parametros.estaciones * parametros.densidad_transbordos), parametros.lineas - 1)
+    total = parametros.estaciones + objetivo
+    base, resto = divmod(total, parametros.lineas)
+    paradas_por_linea = [base + (1 if i < resto else 0) for i in range(parametros.lineas)]
+
+    trazos = _trazar(parametros, paradas_por_linea, rng)
+    linea_de = [i for i, n in enumerate(paradas_por_linea) for _ in range(n)]
+    codigos = [i % len(LINEAS) for i in linea_de]
+    conjuntos = _unir_transbordos(parametros, trazos, linea_de, codigos, objetivo)
+
+    lado = 1.5 * math.sqrt(total) * parametros.separacion_km
+    coordenadas = [_a_coordenadas(x, y, lado) for trazo in trazos for x, y in trazo]
+
+    # Nombre de cada grupo de paradas, en orden de primera aparición
+    nombres: Dict[int, str] = {}
+    for parada in range(total):
+        raiz = conjuntos.raiz(parada)
+        if raiz not in nombres:
+            nombres[raiz] = f"e{len(nombres):06d}"
+    cerradas = set(rng.sample(sorted(nombres.values()),
+                              min(int(len(nombres) * parametros.fraccion_cerradas), len(nombres) - 1)))
+
+    red: Dict[str, dict] = {}
+    for raiz, nombre in nombres.items():
+        red[nombre] = {
+            "lineas": [], "transbordos": [], "ubicacion": {}, "conexiones": [],
+            "afluencia_promedio": {}, "abierta": nombre not in cerradas,
+            "nombre_original": f"Estación {int(nombre[1:]) + 1}",
+        }
+
+    inicio = 0
+    for n in paradas_por_linea:
+        for k in range(inicio, inicio + n):
+            estacion = red[nombres[conjuntos.raiz(k)]]
+            linea = LINEAS[codigos[k]].value
+            latitud, longitud = coordenadas[k]
+            estacion["lineas"].append(linea)
+            estacion["ubicacion"][linea] = {"longitud": longitud, "latitud": latitud}
+            estacion["afluencia_promedio"][linea] = _afluencia(parametros, rng)
+            for vecina in (k - 1, k + 1):
+                if inicio <= vecina < inicio + n:
+                    distancia = calcular_distancia_haversine(latitud, longitud, *coordenadas[vecina])
+                    estacion["conexiones"].append({
+                        "estacion": nombres[conjuntos.raiz(vecina)],
+                        "distancia": round(max(distancia, 0.1), 3),
+                        "linea": linea,
+                    })
+        inicio += n
+
+    for estacion in red.values():
+        lineas = estacion["lineas"]
+        for i, linea_a in enumerate(lineas):
+            for linea_b in lineas[i + 1:]:
+                a, b = estacion["ubicacion"][linea_a], estacion["ubicacion"][linea_b]
+                distancia = calcular_distancia_haversine(a["latitud"], a["longitud"], b["latitud"], b["longitud"])
+                estacion["transbordos"].append({
+                    "lineas": [linea_a, linea_b],
+                    "distancia": round(max(distancia, _TRANSBORDO_MIN_KM), 3),
+                })
+    return red
+
+
+def escribir_red(parametros: ParametrosRed, destino: Union[str, Path]) -> Path:
+    """Genera una red y la guarda en `destino` como JSON."""
+    destino = Path(destino)
+    with destino.open("w", encoding="utf-8") as archivo:
+        json.dump(generar_red(parametros), archivo, ensure_ascii=False)
+    return destino
+
+
+def agregar_argumentos(parser: argparse.ArgumentParser) -> None:
+    """Argumentos de línea de comandos de `ParametrosRed` (salvo `estaciones`)."""
+    defecto = ParametrosRed()
+    parser.add_argument("--lineas", type=int, default=defecto.lineas,
+                        help="Líneas de la red; más de 12 reutilizan los códigos de línea")
+    parser.add_argument("--densidad-transbordos", type=float, default=defecto.densidad_transbordos,
+                        help="Fracción de estaciones de transbordo")
+    parser.add_argument("--disposicion", choices=DISPOSICIONES, default=defecto.disposicion)
+    parser.add_argument("--afluencia", choices=DISTRIBUCIONES_AFLUENCIA, default=defecto.afluencia)
+    parser.add_argument("--fraccion-cerradas", type=float, default=defecto.fraccion_cerradas)
+    parser.add_argument("--separacion-km", type=float, default=defecto.separacion_km)
+    parser.add_argument("--semilla", type=int, default=defecto.semilla)
+
+
+def parametros_de(args: argparse.Namespace, estaciones: int) -> ParametrosRed:
+    return ParametrosRed(
+        estaciones=estaciones, lineas=args.lineas, densidad_transbordos=args.densidad_transbordos,
+        disposicion=args.disposicion, afluencia=args.afluencia,
+        fraccion_cerradas=args.fraccion_cerradas, separacion_km=args.separacion_km,
+        semilla=args.semilla,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Genera una red sintética con el formato de datos-completos.json")
+    parser.add_argument("--estaciones", type=int, default=ParametrosRed.estaciones)
+    parser.add_argument("--salida", type=Path, required=True)
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+    parametros = parametros_de(args, args.estaciones)
+    escribir_red(parametros, args.salida)
+    print(f"Red escrita en {args.salida}: {json.dumps(asdict(parametros))}")
+
+
+if __name__ == "__main__":
+    main()
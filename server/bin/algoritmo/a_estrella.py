@@ -7,70 +7,78 @@ transbordos y afluencia de pasajeros.
 
 from typing import Dict, List, Optional, Tuple, Set
 import heapq
+import math
 from models.estacion_completa import EstacionCompleta, LineaEnum
 from models.resultado_ruta import ResultadoRuta, PasoRuta, LineasUsadas
 from bin.algoritmo.heuristica import heuristica
 from bin.algoritmo.costo_real import costo_real
 from bin.algoritmo.costo_total import costo_total
+from bin.algoritmo.traza import Traza
 from datetime import datetime
 
 
-class NodoAEstrella:
-    """Nodo para el algoritmo A* que representa un estado en la búsqueda.
-    
+class RegistrosBusqueda:
+    """Estados generados por la búsqueda, guardados en listas paralelas.
+
+    Cada inserción en la frontera añade un registro y la cola de prioridad solo
+    guarda tuplas `(f, indice)`; el padre de un registro es el índice de otro,
+    así que la ruta se reconstruye siguiendo índices sin crear un objeto por
+    nodo.
+
     Attributes:
-        estacion: Nombre de la estación
-        linea_actual: Línea en la que se encuentra
+        estaciones: Nombre de la estación de cada registro
+        nombres: Nombre original de la estación
+        lineas: Línea en la que se encuentra
         g: Costo acumulado desde el inicio (g(n))
-        h: Heurística estimada hasta el objetivo (h(n))
-        f: Costo total f(n) = g(n) + h(n)
-        padre: Nodo padre en el camino
-        distancia_acumulada: Distancia total acumulada en km
+        distancias: Distancia total acumulada en km
+        distancias_paso: Distancia de la conexión que llegó al registro
+        padres: Índice del registro padre (-1 en los iniciales)
     """
-    def __init__(self, estacion: str, nombre_real: str, linea_actual: LineaEnum, g: float, h: float, 
-                 padre: Optional['NodoAEstrella'] = None, distancia_acumulada: float = 0.0):
-        self.estacion = estacion
-        self.nombre_real = nombre_real
-        self.linea_actual = linea_actual
-        self.g = g
-        self.h = h
-        self.f = costo_total(g, h)
-        self.padre = padre
-        self.distancia_acumulada = distancia_acumulada
-    
-    def __lt__(self, otro: 'NodoAEstrella') -> bool:
-        """Comparación para el heap (menor f tiene prioridad)."""
-        return self.f < otro.f
-    
-    def __eq__(self, otro: object) -> bool:
-        """Igualdad basada en estación y línea."""
-        if not isinstance(otro, NodoAEstrella):
-            return False
-        return self.estacion == otro.estacion and self.linea_actual == otro.linea_actual
-    
-    def __hash__(self) -> int:
-        """Hash para usar en sets y dicts."""
-        return hash((self.estacion, self.linea_actual))
 
+    __slots__ = ("estaciones", "nombres", "lineas", "g", "distancias", "distancias_paso", "padres")
+
+    def __init__(self):
+        self.estaciones: List[str] = []
+        self.nombres: List[str] = []
+        self.lineas: List[LineaEnum] = []
+        self.g: List[float] = []
+        self.distancias: List[float] = []
+        self.distancias_paso: List[float] = []
+        self.padres: List[int] = []
 
-def reconstruir_ruta(nodo_final: NodoAEstrella, 
-                     estaciones_dict: Dict[str, EstacionCompleta]) -> ResultadoRuta:
-    """Reconstruye la ruta desde el nodo final siguiendo los padres.
+    def agregar(self, estacion: str, nombre: str, linea: LineaEnum, g: float,
+                distancia: float, distancia_paso: float, padre: int) -> int:
+        """Añade un registro y devuelve su índice."""
+        self.estaciones.append(estacion)
+        self.nombres.append(nombre)
+        self.lineas.append(linea)
+        self.g.append(g)
+        self.distancias.append(distancia)
+        self.distancias_paso.append(distancia_paso)
+        self.padres.append(padre)
+        return len(self.padres) - 1
+
+
+def reconstruir_ruta(registros: RegistrosBusqueda, indice_final: int) -> ResultadoRuta:
+    """Reconstruye la ruta desde el registro final siguiendo los índices padre.
     
     Args:
-        nodo_final: Nodo objetivo alcanzado
-        estaciones_dict: Diccionario de todas las estaciones
+        registros: Registros de la búsqueda
+        indice_final: Índice del registro objetivo alcanzado
     
     Returns:
         ResultadoRuta con toda la información de la ruta
     """
+    estaciones, nombres, lineas, g = registros.estaciones, registros.nombres, registros.lineas, registros.g
+    padres = registros.padres
+
     # Reconstruir camino hacia atrás
-    camino: List[NodoAEstrella] = []
-    nodo_actual = nodo_final
+    camino: List[int] = []
+    indice = indice_final
     
-    while nodo_actual is not None:
-        camino.append(nodo_actual)
-        nodo_actual = nodo_actual.padre
+    while indice >= 0:
+        camino.append(indice)
+        indice = padres[indice]
     
     camino.reverse()
     
@@ -78,60 +86,43 @@ def reconstruir_ruta(nodo_final: NodoAEstrella,
     resultado = ResultadoRuta()
     resultado.exito = True
     resultado.mensaje = "Ruta encontrada exitosamente"
-    resultado.estaciones = [nodo.estacion for nodo in camino]
-    resultado.nombres_originales = [nodo.nombre_real for nodo in camino]
-    resultado.costo_total_segundos = nodo_final.g
-    resultado.distancia_total_km = nodo_final.distancia_acumulada
+    resultado.estaciones = [estaciones[i] for i in camino]
+    resultado.nombres_originales = [nombres[i] for i in camino]
+    resultado.costo_total_segundos = g[indice_final]
+    resultado.distancia_total_km = registros.distancias[indice_final]
     
     # Construir pasos detallados
-    lineas_usadas: Set[LineasUsadas] = set()
-    l_u: int = 0
+    lineas_usadas: Dict[LineaEnum, LineasUsadas] = {}
     transbordos = 0
     
     for i in range(len(camino) - 1):
-        nodo_origen = camino[i]
-        nodo_destino = camino[i + 1]
-        
-        # Obtener estaciones
-        est_origen = estaciones_dict[nodo_origen.estacion]
-        est_destino = estaciones_dict[nodo_destino.estacion]
-        
-        # Buscar conexión
-        conexion = None
+        origen = camino[i]
+        destino = camino[i + 1]
+        linea_destino = lineas[destino]
 
-        for conn in est_origen.conexiones:
-            if conn.estacion == nodo_destino.estacion and conn.linea == nodo_destino.linea_actual:
-                conexion = conn
-                break
+        # Detectar transbordo
+        es_transbordo = lineas[origen] != linea_destino
+        if es_transbordo:
+            transbordos += 1
+        if linea_destino not in lineas_usadas:
+            lineas_usadas[linea_destino] = LineasUsadas(
+                linea=linea_destino, orden=len(lineas_usadas) + 1)
         
-        if conexion:
-            # Calcular costo de este paso
-            costo_paso = nodo_destino.g - nodo_origen.g
-            
-            # Detectar transbordo
-            es_transbordo = nodo_origen.linea_actual != nodo_destino.linea_actual
-            if es_transbordo:
-                transbordos += 1
-            if any(lu.linea == nodo_destino.linea_actual for lu in lineas_usadas) is False:
-                l_u += 1
-                lineas_usadas.add(
-                    LineasUsadas(linea=nodo_destino.linea_actual, orden=l_u))
-            
-            paso = PasoRuta(
-                estacion_origen=nodo_origen.estacion,
-                estacion_destino=nodo_destino.estacion,
-                nombre_origen=nodo_origen.nombre_real,
-                nombre_destino=nodo_destino.nombre_real,
-                linea=nodo_destino.linea_actual,
-                distancia_km=conexion.distancia,
-                costo_segundos=costo_paso,
-                es_transbordo=es_transbordo,
-                posicion_origen=i + 1
-            )
-            resultado.pasos.append(paso)
+        paso = PasoRuta(
+            estacion_origen=estaciones[origen],
+            estacion_destino=estaciones[destino],
+            nombre_origen=nombres[origen],
+            nombre_destino=nombres[destino],
+            linea=linea_destino,
+            distancia_km=registros.distancias_paso[destino],
+            costo_segundos=g[destino] - g[origen],
+            es_transbordo=es_transbordo,
+            posicion_origen=i + 1
+        )
+        resultado.pasos.append(paso)
     
     resultado.numero_transbordos = transbordos
-    resultado.lineas_utilizadas = list(lineas_usadas)
+    resultado.lineas_utilizadas = list(lineas_usadas.values())
     
     return resultado
 
@@ -143,7 +134,7 @@ def a_estrella(
         dia_viaje: datetime,
         afluencia_max: int,
         velocidad_metro_kmh: float,
-        debug: bool = False
+        traza: Optional[Traza] = None
     ) -> ResultadoRuta:
     """Implementación del algoritmo A* para encontrar la ruta óptima.
     
@@ -154,6 +145,7 @@ def a_estrella(
         dia_viaje: Fecha del viaje
         afluencia_max: Afluencia máxima para normalizar costos
         velocidad_metro_kmh: Velocidad del metro en km/h
+        traza: Si se indica, acumula contadores y tiempos de la búsqueda
     
     Returns:
         ResultadoRuta con la ruta óptima o mensaje de error
@@ -193,10 +185,25 @@ def a_estrella(
     coord_destino = (est_destino.ubicacion[0].latitud, est_destino.ubicacion[0].longitud)
     
     # Inicializar estructuras de datos
-    abiertos: List[NodoAEstrella] = []  # Cola de prioridad (heap)
+    abiertos: List[Tuple[float, int]] = []  # Cola de prioridad (heap) de (f, índice de registro)
+    registros = RegistrosBusqueda()
+    mejor_g: Dict[Tuple[str, LineaEnum], float] = {}  # Menor g insertado por estado
     cerrados: Set[Tuple[str, LineaEnum]] = set()  # Estados ya explorados
+    estaciones, lineas, g = registros.estaciones, registros.lineas, registros.g
+    distancias = registros.distancias
+
+    # Primitivas de la búsqueda; con traza se sustituyen por versiones que cuentan
+    insertar, extraer = heapq.heappush, heapq.heappop
+    calcular_costo, calcular_h, reconstruir = costo_real, heuristica, reconstruir_ruta
+    if traza is not None:
+        reconstruir = traza.cronometrada(reconstruir_ruta, "segundos_reconstruccion")
+    if traza is not None and traza.contadores:
+        insertar, extraer = traza.heap()
+        calcular_costo = traza.cronometrada(costo_real, "segundos_costo")
+        calcular_h = traza.cronometrada(heuristica, "segundos_heuristica")
+        cerrados = traza.cerrado_conjunto()
     
-    # Crear nodos iniciales (uno por cada línea de la estación origen)
+    # Crear registros iniciales (uno por cada línea de la estación origen)
     for linea in est_origen.lineas:
         # Obtener coordenadas de la estación origen en esta línea
         coord_origen = None
@@ -206,49 +213,56 @@ def a_estrella(
                 break
         
         if coord_origen:
-            h_inicial = heuristica(coord_origen, coord_destino, velocidad_metro_kmh)
-            nodo_inicial = NodoAEstrella(estacion_origen, est_origen.nombre_original, linea, g=0.0, h=h_inicial)
-            heapq.heappush(abiertos, nodo_inicial)
+            h_inicial = calcular_h(coord_origen, coord_destino, velocidad_metro_kmh)
+            mejor_g[(estacion_origen, linea)] = 0.0
+            indice = registros.agregar(estacion_origen, est_origen.nombre_original, linea,
+                                       g=0.0, distancia=0.0, distancia_paso=0.0, padre=-1)
+            insertar(abiertos, (costo_total(0.0, h_inicial), indice))
     
     # Algoritmo A*
     while abiertos:
-        # Obtener nodo con menor f
-        nodo_actual = heapq.heappop(abiertos)
+        # Obtener registro con menor f
+        _, actual = extraer(abiertos)
+        estacion_actual = estaciones[actual]
         
         # Verificar si llegamos al destino
-        if nodo_actual.estacion == estacion_destino:
-            return reconstruir_ruta(nodo_actual, estaciones_dict)
+        if estacion_actual == estacion_destino:
+            resultado = reconstruir(registros, actual)
+            resultado.nodos_expandidos = len(cerrados)
+            if traza is not None:
+                traza.finalizar(len(cerrados), encontrado=True)
+            return resultado
 
-        # Marcar como explorado
-        estado_actual = (nodo_actual.estacion, nodo_actual.linea_actual)
+        # Marcar como explorado; las entradas obsoletas de un estado ya
+        # expandido se descartan aquí (borrado perezoso)
+        estado_actual = (estacion_actual, lineas[actual])
         if estado_actual in cerrados:
             continue
         cerrados.add(estado_actual)
 
         # Obtener estación actual
-        est_actual = estaciones_dict[nodo_actual.estacion]
-        
-        if debug:
-            print(f"\n[DEBUG] Explorando: {nodo_actual.estacion} (linea {nodo_actual.linea_actual.value})")
-            print(f"        g={nodo_actual.g:.1f}, h={nodo_actual.h:.1f}, f={nodo_actual.f:.1f}")
-            print(f"        Conexiones disponibles: {len(est_actual.conexiones)}")
+        est_actual = estaciones_dict[estacion_actual]
+        g_actual = g[actual]
+        distancia_actual = distancias[actual]
         
         # Expandir vecinos (estaciones conectadas)
         for conexion in est_actual.conexiones:
             estacion_vecina = conexion.estacion
             linea_conexion = conexion.linea
             
-            if debug:
-                print(f"          -> {estacion_vecina} (linea {linea_conexion.value}, dist {conexion.distancia}km)")            # Verificar que la estación vecina existe
+            # Verificar que la estación vecina existe
             if estacion_vecina not in estaciones_dict:
-                if debug:
-                    print(f"            X Estacion '{estacion_vecina}' no esta en el diccionario")
+                continue
+
+            # Verificar si ya fue explorado
+            estado_vecino = (estacion_vecina, linea_conexion)
+            if estado_vecino in cerrados:
                 continue
 
             est_vecina = estaciones_dict[estacion_vecina]
 
             # Calcular costo real de moverse a este vecino
-            costo_movimiento = costo_real(
+            costo_movimiento = calcular_costo(
                 est_actual, est_vecina, linea_conexion, velocidad_metro_kmh,
                 afluencia_max, dia_viaje
             )
@@ -256,13 +270,10 @@ def a_estrella(
             if costo_movimiento is None:
                 continue
 
-            # Calcular g del vecino
-            g_vecino = nodo_actual.g + costo_movimiento
-            distancia_vecino = nodo_actual.distancia_acumulada + conexion.distancia
-            
-            # Verificar si ya fue explorado
-            estado_vecino = (estacion_vecina, linea_conexion)
-            if estado_vecino in cerrados:
+            # Calcular g del vecino; si no mejora el mejor conocido, la
+            # entrada nunca se expandiría y no se inserta
+            g_vecino = g_actual + costo_movimiento
+            if g_vecino >= mejor_g.get(estado_vecino, math.inf):
                 continue
             
             # Calcular heurística del vecino
@@ -279,18 +290,22 @@ def a_estrella(
                 else:
                     continue
             
-            h_vecino = heuristica(coord_vecina, coord_destino, velocidad_metro_kmh)
+            h_vecino = calcular_h(coord_vecina, coord_destino, velocidad_metro_kmh)
             
-            # Crear nodo vecino y agregarlo a abiertos
-            nodo_vecino = NodoAEstrella(
-                estacion_vecina, est_vecina.nombre_original,
-                linea_conexion, g_vecino, h_vecino,
-                padre=nodo_actual, distancia_acumulada=distancia_vecino
+            # Registrar el vecino y agregarlo a abiertos
+            mejor_g[estado_vecino] = g_vecino
+            indice = registros.agregar(
+                estacion_vecina, est_vecina.nombre_original, linea_conexion, g_vecino,
+                distancia=distancia_actual + conexion.distancia,
+                distancia_paso=conexion.distancia, padre=actual
             )
-            heapq.heappush(abiertos, nodo_vecino)
+            insertar(abiertos, (costo_total(g_vecino, h_vecino), indice))
 
     # No se encontró ruta
+    if traza is not None:
+        traza.finalizar(len(cerrados), encontrado=False)
     return ResultadoRuta(
         exito=False,
-        mensaje=f"No se encontró ruta entre '{estacion_origen}' y '{estacion_destino}'"
+        mensaje=f"No se encontró ruta entre '{estacion_origen}' y '{estacion_destino}'",
+        nodos_expandidos=len(cerrados)
     )
@@ -0,0 +1,185 @@
+"""A* bidireccional sobre el grafo compilado.
+
+Una búsqueda avanza desde las líneas de la estación de origen por las aristas
+de `conexiones` y otra retrocede desde las líneas de la estación destino por
+la adyacencia inversa (`GrafoCompilado.entrantes`). Cada vez que un estado
+mejora en una dirección se compara con el costo que ya tiene en la otra; la
+mejor suma vista (`mu`) es el costo de la mejor ruta encontrada. La búsqueda
+termina cuando el menor `f` de cualquiera de las dos colas alcanza `mu`, pues
+con una heurística admisible ningún camino pendiente puede mejorarla.
+
+Como las heurísticas de cada dirección no son consistentes entre sí, los
+estados no se cierran: una entrada de la cola se descarta solo si su `g` ya
+no es el mejor conocido y un estado puede volver a expandirse si mejora.
+"""
+
+import heapq
+import math
+from typing import List, Optional
+
+from models.resultado_ruta import ResultadoRuta
+from bin.algoritmo.grafo_compilado import GrafoCompilado
+from bin.algoritmo.heuristica import heuristica
+from bin.algoritmo.tablas_costo import TablasCosto, Regimen
+from bin.algoritmo.landmarks import Landmarks
+from bin.algoritmo.a_estrella_compilado import resultado_desde_aristas, validar_consulta, sin_ruta
+
+
+def a_estrella_bidireccional(
+        grafo: GrafoCompilado,
+        tablas: TablasCosto,
+        estacion_origen: str,
+        estacion_destino: str,
+        regimen: Regimen,
+        landmarks: Optional[Landmarks] = None
+    ) -> ResultadoRuta:
+    """A* bidireccional entre dos estaciones.
+
+    Args:
+        grafo: Grafo compilado de la red
+        tablas: Tablas de costo calculadas para `grafo`
+        estacion_origen: Nombre de la estación de inicio
+        estacion_destino: Nombre de la estación objetivo
+        regimen: Régimen de costo de la consulta (franja horaria y lluvia)
+        landmarks: Si se indican, se usa la heurística ALT en lugar de haversine
+
+    Returns:
+        ResultadoRuta con la ruta encontrada o mensaje de error; `nodos_expandidos`
+        suma las expansiones de ambas direcciones
+    """
+    invalida = validar_consulta(grafo, estacion_origen, estacion_destino)
+    if invalida is not None:
+        return invalida
+
+    origen = grafo.indice[estacion_origen]
+    objetivo = grafo.indice[estacion_destino]
+    inicios = [e for e in grafo.estados_de(origen) if grafo.con_ubicacion[e]]
+    finales = list(grafo.estados_de(objetivo))
+    if not inicios:
+        return sin_ruta(estacion_origen, estacion_destino)
+
+    offsets = memoryview(grafo.offsets)
+    destinos = memoryview(grafo.destinos)
+    offsets_inv, orden_inv = grafo.entrantes
+    offsets_inv = memoryview(offsets_inv)
+    orden_inv = memoryview(orden_inv)
+    fuentes = memoryview(grafo.fuentes)
+    tabla = tablas.de(regimen)
+    costos = memoryview(tabla)
+
+    latitudes = memoryview(grafo.latitudes)
+    longitudes = memoryview(grafo.longitudes)
+    coord_destino = (float(grafo.estacion_latitud[objetivo]), float(grafo.estacion_longitud[objetivo]))
+    coord_origen = (float(grafo.estacion_latitud[origen]), float(grafo.estacion_longitud[origen]))
+    velocidad_metro_kmh = regimen.velocidad_kmh
+
+    # h por estado y dirección: ALT se calcula completo al inicio, haversine
+    # (hacia el destino o desde el origen) bajo demanda
+    n = grafo.numero_estados
+    if landmarks is not None:
+        h_ida = landmarks.cotas(regimen, finales).tolist()
+        h_vuelta = landmarks.cotas(regimen, inicios, inverso=True).tolist()
+    else:
+        h_ida = [None] * n
+        h_vuelta = [None] * n
+
+    # g y arista padre de cada dirección; en la de vuelta el padre es la
+    # arista por la que se sale del estado hacia el destino
+    g_ida = [math.inf] * n
+    g_vuelta = [math.inf] * n
+    padre_ida = [-1] * n
+    padre_vuelta = [-1] * n
+    cola_ida: List[tuple] = []
+    cola_vuelta: List[tuple] = []
+
+    for estado in inicios:
+        h = h_ida[estado]
+        if h is None:
+            h = h_ida[estado] = heuristica(
+                (latitudes[estado], longitudes[estado]), coord_destino, velocidad_metro_kmh)
+        g_ida[estado] = 0.0
+        cola_ida.append((h, 0.0, estado))
+    for estado in finales:
+        h = h_vuelta[estado]
+        if h is None:
+            h = h_vuelta[estado] = heuristica(
+                coord_origen, (latitudes[estado], longitudes[estado]), velocidad_metro_kmh)
+        g_vuelta[estado] = 0.0
+        cola_vuelta.append((h, 0.0, estado))
+    heapq.heapify(cola_ida)
+    heapq.heapify(cola_vuelta)
+
+    mu = math.inf
+    encuentro = -1
+    for estado in inicios:
+        if g_vuelta[estado] == 0.0:
+            mu, encuentro = 0.0, estado
+    expandidos = 0
+
+    while cola_ida and cola_vuelta:
+        if cola_ida[0][0] >= mu or cola_vuelta[0][0] >= mu:
+            break
+
+        # Se avanza por la frontera más pequeña
+        if len(cola_ida) <= len(cola_vuelta):
+            _, g_u, u = heapq.heappop(cola_ida)
+            if g_u > g_ida[u]:
+                continue
+            expandidos += 1
+            for arista in range(offsets[u], offsets[u + 1]):
+                v = destinos[arista]
+                g_v = g_u + costos[arista]
+                if g_v < g_ida[v]:
+                    g_ida[v] = g_v
+                    padre_ida[v] = arista
+                    h = h_ida[v]
+                    if h is None:
+                        h = h_ida[v] = heuristica(
+                            (latitudes[v], longitudes[v]), coord_destino, velocidad_metro_kmh)
+                    heapq.heappush(cola_ida, (g_v + h, g_v, v))
+                    total = g_v + g_vuelta[v]
+                    if total < mu:
+                        mu, encuentro = total, v
+        else:
+            _, g_u, u = heapq.heappop(cola_vuelta)
+            if g_u > g_vuelta[u]:
+                continue
+            expandidos += 1
+            for posicion in range(offsets_inv[u], offsets_inv[u + 1]):
+                arista = orden_inv[posicion]
+                v = fuentes[arista]
+                g_v = g_u + costos[arista]
+                if g_v < g_vuelta[v]:
+                    g_vuelta[v] = g_v
+                    padre_vuelta[v] = arista
+                    h = h_vuelta[v]
+                    if h is None:
+                        h = h_vuelta[v] = heuristica(
+                            coord_origen, (latitudes[v], longitudes[v]), velocidad_metro_kmh)
+                    heapq.heappush(cola_vuelta, (g_v + h, g_v, v))
+                    total = g_ida[v] + g_v
+                    if total < mu:
+                        mu, encuentro = total, v
+
+    if encuentro == -1:
+        resultado = sin_ruta(estacion_origen, estacion_destino)
+        resultado.nodos_expandidos = expandidos
+        return resultado
+
+    # Unión de ambas mitades: del origen al encuentro y del encuentro al destino
+    aristas: List[int] = []
+    estado = encuentro
+    while padre_ida[estado] != -1:
+        arista = padre_ida[estado]
+        aristas.append(arista)
+        estado = fuentes[arista]
+    aristas.reverse()
+    estado = encuentro
+    while padre_vuelta[estado] != -1:
+        arista = padre_vuelta[estado]
+        aristas.append(arista)
+        estado = destinos[arista]
+
+    resultado = resultado_desde_aristas(grafo, aristas, tabla)
+    resultado.nodos_expandidos = expandidos
+    return resultado
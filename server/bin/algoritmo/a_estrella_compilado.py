@@ -0,0 +1,275 @@
+"""Variante de A* que trabaja directamente sobre un `GrafoCompilado`.
+
+Usa el mismo modelo de costo y la misma heurística que `a_estrella`, pero el
+bucle interno solo indexa arreglos: los estados son enteros, el costo de cada
+arista se lee de la tabla del régimen de la consulta, `g` y los padres se
+guardan en listas por estado y el conjunto cerrado es un `bytearray`.
+"""
+
+import heapq
+import math
+from typing import List, Optional, Sequence
+
+from models.resultado_ruta import ResultadoRuta, PasoRuta, LineasUsadas
+from bin.algoritmo.grafo_compilado import GrafoCompilado, LINEAS
+from bin.algoritmo.heuristica import heuristica
+from bin.algoritmo.tablas_costo import TablasCosto, Regimen
+from bin.algoritmo.landmarks import Landmarks
+from bin.algoritmo.traza import Traza
+
+
+def resultado_desde_aristas(grafo: GrafoCompilado, aristas: Sequence[int],
+                            costos: Sequence[float]) -> ResultadoRuta:
+    """Construye el ResultadoRuta de un camino dado como lista de aristas.
+
+    Args:
+        grafo: Grafo sobre el que se hizo la búsqueda
+        aristas: Aristas del camino, en orden
+        costos: Costo de cada arista del grafo en el régimen de la consulta
+
+    Returns:
+        ResultadoRuta con toda la información de la ruta
+    """
+    estado_estacion = grafo.estado_estacion
+    estado_linea = grafo.estado_linea
+    fuentes = grafo.fuentes
+    destinos = grafo.destinos
+    nombres = grafo.nombres
+    originales = grafo.nombres_originales
+
+    estaciones_ruta = [int(estado_estacion[fuentes[aristas[0]]])] if aristas else []
+    resultado = ResultadoRuta(exito=True, mensaje="Ruta encontrada exitosamente")
+    lineas_vistas = set()
+    costo_total = 0.0
+    distancia_total = 0.0
+
+    for posicion, arista in enumerate(aristas, 1):
+        u = int(fuentes[arista])
+        v = int(destinos[arista])
+        origen = int(estado_estacion[u])
+        destino = int(estado_estacion[v])
+        linea = LINEAS[estado_linea[v]]
+        es_transbordo = bool(estado_linea[u] != estado_linea[v])
+        if es_transbordo:
+            resultado.numero_transbordos += 1
+        if linea not in lineas_vistas:
+            lineas_vistas.add(linea)
+            resultado.lineas_utilizadas.append(
+                LineasUsadas(linea=linea, orden=len(lineas_vistas)))
+
+        costo = float(costos[arista])
+        distancia = float(grafo.distancias[arista])
+        costo_total += costo
+        distancia_total += distancia
+        estaciones_ruta.append(destino)
+        resultado.pasos.append(PasoRuta(
+            estacion_origen=nombres[origen],
+            estacion_destino=nombres[destino],
+            nombre_origen=originales[origen],
+            nombre_destino=originales[destino],
+            linea=linea,
+            distancia_km=distancia,
+            costo_segundos=costo,
+            es_transbordo=es_transbordo,
+            posicion_origen=posicion
+        ))
+
+    resultado.estaciones = [nombres[i] for i in estaciones_ruta]
+    resultado.nombres_originales = [originales[i] for i in estaciones_ruta]
+    resultado.costo_total_segundos = costo_total
+    resultado.distancia_total_km = distancia_total
+    return resultado
+
+
+def reconstruir_ruta_compilada(grafo: GrafoCompilado, estado_final: int,
+                               padre: List[int], costos: Sequence[float]) -> ResultadoRuta:
+    """Reconstruye la ruta siguiendo la arista padre de cada estado.
+
+    Args:
+        grafo: Grafo sobre el que se hizo la búsqueda
+        estado_final: Estado objetivo alcanzado
+        padre: Arista por la que se llegó a cada estado (-1 en los iniciales)
+        costos: Costo de cada arista en el régimen de la consulta
+
+    Returns:
+        ResultadoRuta con toda la información de la ruta
+    """
+    aristas: List[int] = []
+    estado = estado_final
+    while padre[estado] != -1:
+        arista = padre[estado]
+        aristas.append(arista)
+        estado = int(grafo.fuentes[arista])
+    aristas.reverse()
+    return resultado_desde_aristas(grafo, aristas, costos)
+
+
+def validar_consulta(grafo: GrafoCompilado, estacion_origen: str,
+                     estacion_destino: str) -> Optional[ResultadoRuta]:
+    """Valida una consulta antes de buscar.
+
+    Returns:
+        ResultadoRuta final si la consulta no requiere búsqueda (estación
+        inexistente o cerrada, o mismo origen y destino), None si se debe buscar
+    """
+    if estacion_origen not in grafo.indice:
+        return ResultadoRuta(
+            exito=False,
+            mensaje=f"Estación de origen '{estacion_origen}' no encontrada"
+        )
+
+    if estacion_destino not in grafo.indice:
+        return ResultadoRuta(
+            exito=False,
+            mensaje=f"Estación de destino '{estacion_destino}' no encontrada"
+        )
+
+    if not grafo.abierta[grafo.indice[estacion_origen]]:
+        return ResultadoRuta(
+            exito=False,
+            mensaje=f"Estación de origen '{estacion_origen}' está cerrada"
+        )
+
+    if not grafo.abierta[grafo.indice[estacion_destino]]:
+        return ResultadoRuta(
+            exito=False,
+            mensaje=f"Estación de destino '{estacion_destino}' está cerrada"
+        )
+
+    if estacion_origen == estacion_destino:
+        return ResultadoRuta(
+            exito=True,
+            mensaje="Origen y destino son la misma estación",
+            estaciones=[estacion_origen],
+            costo_total_segundos=0.0
+        )
+
+    if math.isnan(grafo.estacion_latitud[grafo.indice[estacion_destino]]):
+        return ResultadoRuta(
+            exito=False,
+            mensaje=f"Estación destino '{estacion_destino}' no tiene ubicación definida"
+        )
+
+    return None
+
+
+def sin_ruta(estacion_origen: str, estacion_destino: str) -> ResultadoRuta:
+    """Resultado para consultas sin camino entre origen y destino."""
+    return ResultadoRuta(
+        exito=False,
+        mensaje=f"No se encontró ruta entre '{estacion_origen}' y '{estacion_destino}'"
+    )
+
+
+def a_estrella_compilado(
+        grafo: GrafoCompilado,
+        tablas: TablasCosto,
+        estacion_origen: str,
+        estacion_destino: str,
+        regimen: Regimen,
+        landmarks: Optional[Landmarks] = None,
+        traza: Optional[Traza] = None
+    ) -> ResultadoRuta:
+    """A* sobre el grafo compilado; equivalente a `a_estrella`.
+
+    Args:
+        grafo: Grafo compilado de la red
+        tablas: Tablas de costo calculadas para `grafo`
+        estacion_origen: Nombre de la estación de inicio
+        estacion_destino: Nombre de la estación objetivo
+        regimen: Régimen de costo de la consulta (franja horaria y lluvia)
+        landmarks: Si se indican, se usa la heurística ALT en lugar de haversine
+        traza: Si se indica, acumula contadores y tiempos de la búsqueda (los
+            costos se leen de tablas precalculadas, así que no hay tiempo de
+            costo que medir)
+
+    Returns:
+        ResultadoRuta con la ruta óptima o mensaje de error
+    """
+    invalida = validar_consulta(grafo, estacion_origen, estacion_destino)
+    if invalida is not None:
+        return invalida
+
+    # Primitivas de la búsqueda; con traza se sustituyen por versiones que cuentan
+    insertar, extraer = heapq.heappush, heapq.heappop
+    calcular_h = heuristica
+    reconstruir = reconstruir_ruta_compilada
+    n = grafo.numero_estados
+    cerrado = bytearray(n)
+    if traza is not None:
+        reconstruir = traza.cronometrada(reconstruir_ruta_compilada, "segundos_reconstruccion")
+    if traza is not None and traza.contadores:
+        insertar, extraer = traza.heap()
+        calcular_h = traza.cronometrada(heuristica, "segundos_heuristica")
+        cerrado = traza.cerrado_estados(n)
+
+    origen = grafo.indice[estacion_origen]
+    objetivo = grafo.indice[estacion_destino]
+    coord_destino = (float(grafo.estacion_latitud[objetivo]), float(grafo.estacion_longitud[objetivo]))
+    velocidad_metro_kmh = regimen.velocidad_kmh
+
+    # Vistas de los arreglos: indexarlas devuelve objetos de Python sin copiar los datos
+    offsets = memoryview(grafo.offsets)
+    destinos = memoryview(grafo.destinos)
+    tabla = tablas.de(regimen)
+    costos = memoryview(tabla)
+    estado_estacion = memoryview(grafo.estado_estacion)
+    latitudes = memoryview(grafo.latitudes)
+    longitudes = memoryview(grafo.longitudes)
+
+    g = [math.inf] * n
+    padre = [-1] * n
+    abiertos: List[tuple] = []
+    expandidos = 0
+
+    # h por estado: ALT se calcula completo al inicio, haversine bajo demanda
+    if landmarks is not None:
+        cotas = landmarks.cotas
+        if traza is not None and traza.contadores:
+            cotas = traza.cronometrada(cotas, "segundos_heuristica")
+        h_cache = cotas(regimen, grafo.estados_de(objetivo)).tolist()
+    else:
+        h_cache = [None] * n
+
+    for estado in grafo.estados_de(origen):
+        if grafo.con_ubicacion[estado]:
+            h = h_cache[estado]
+            if h is None:
+                h = h_cache[estado] = calcular_h(
+                    (latitudes[estado], longitudes[estado]), coord_destino, velocidad_metro_kmh)
+            g[estado] = 0.0
+            insertar(abiertos, (h, estado))
+
+    while abiertos:
+        _, u = extraer(abiertos)
+        if cerrado[u]:
+            continue
+        if estado_estacion[u] == objetivo:
+            resultado = reconstruir(grafo, u, padre, tabla)
+            resultado.nodos_expandidos = expandidos
+            if traza is not None:
+                traza.finalizar(expandidos, encontrado=True)
+            return resultado
+        cerrado[u] = 1
+        expandidos += 1
+
+        g_u = g[u]
+        for arista in range(offsets[u], offsets[u + 1]):
+            v = destinos[arista]
+            if cerrado[v]:
+                continue
+            g_v = g_u + costos[arista]
+            if g_v < g[v]:
+                g[v] = g_v
+                padre[v] = arista
+                h = h_cache[v]
+                if h is None:
+                    h = h_cache[v] = calcular_h(
+                        (latitudes[v], longitudes[v]), coord_destino, velocidad_metro_kmh)
+                insertar(abiertos, (g_v + h, v))
+
+    if traza is not None:
+        traza.finalizar(expandidos, encontrado=False)
+    resultado = sin_ruta(estacion_origen, estacion_destino)
+    resultado.nodos_expandidos = expandidos
+    return resultado
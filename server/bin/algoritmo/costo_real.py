@@ -19,6 +19,7 @@ from bin.algoritmo.constantes import (
     FACTOR_NO_HORA_PICO
 )
 from datetime import datetime
+from enum import Enum
 
 
 def obtener_conexion(
@@ -40,6 +41,57 @@ def obtener_conexion(
     return None
 
 
+class TipoHorario(str, Enum):
+    """Franjas de día/hora que el costo distingue."""
+    SEMANA_PICO = "semana_pico"
+    SEMANA_VALLE = "semana_valle"
+    FIN_DE_SEMANA = "fin_de_semana"
+
+
+def clasificar_horario(dia_viaje: datetime) -> TipoHorario:
+    """Clasifica la fecha del viaje en la franja que determina el factor de hora.
+    
+    Args:
+        dia_viaje: Fecha del viaje
+    
+    Returns:
+        TipoHorario correspondiente
+    """
+    if dia_viaje.weekday() < 5:  # Días laborables
+        if 7 <= dia_viaje.hour < 9 or 18 <= dia_viaje.hour < 20:
+            return TipoHorario.SEMANA_PICO
+        return TipoHorario.SEMANA_VALLE
+    return TipoHorario.FIN_DE_SEMANA
+
+
+def factor_por_horario(horario: TipoHorario) -> float:
+    """Factor que escala el efecto de la afluencia en cada franja.
+    
+    Args:
+        horario: Franja de día/hora
+    
+    Returns:
+        Factor de día/hora (días laborables y horas pico pesan más)
+    """
+    if horario == TipoHorario.SEMANA_PICO:
+        return FACTOR_DIA_SEMANA * FACTOR_HORA_PICO
+    if horario == TipoHorario.SEMANA_VALLE:
+        return FACTOR_DIA_SEMANA * FACTOR_NO_HORA_PICO
+    return FACTOR_FIN_DE_SEMANA
+
+
+def calcular_factor_hora(dia_viaje: datetime) -> float:
+    """Calcula el factor por día y hora que escala el efecto de la afluencia.
+    
+    Args:
+        dia_viaje: Fecha del viaje
+    
+    Returns:
+        Factor de día/hora (días laborables y horas pico pesan más)
+    """
+    return factor_por_horario(clasificar_horario(dia_viaje))
+
+
 def calcular_factor_afluencia(afluencia: int, afluencia_max: int, dia_viaje: datetime) -> float:
     """Calcula el factor multiplicador basado en la afluencia de la estación.
     
@@ -56,16 +108,7 @@ def calcular_factor_afluencia(afluencia: int, afluencia_max: int, dia_viaje: dat
     # Normalizar afluencia: por cada 10,000 personas, agregar 10% de retraso
     # Factor mínimo de 1.0 (sin retraso) hasta ~2.0 para estaciones muy concurridas
     # Agregamos un factor por dia y hora
-    factor_hora = 0
-    if dia_viaje.weekday() < 5:  # Días laborables
-        factor_hora = FACTOR_DIA_SEMANA
-        if 7 <= dia_viaje.hour < 9 or 18 <= dia_viaje.hour < 20:
-            factor_hora *= FACTOR_HORA_PICO
-        else:
-            factor_hora *= FACTOR_NO_HORA_PICO
-        
-    else:
-        factor_hora = FACTOR_FIN_DE_SEMANA
+    factor_hora = calcular_factor_hora(dia_viaje)
 
     factor = 1.0 + (afluencia / afluencia_max)  * factor_hora
     return factor  # Limitar a máximo 2x
@@ -119,16 +162,17 @@ def costo_real(
         afluencia_max: Afluencia máxima usada para normalizar el factor de afluencia
     
     Returns:
-        Tiempo en segundos para el movimiento, o None si no hay conexión directa
+        Tiempo en segundos para el movimiento, o None si la estación destino
+        está cerrada o no hay conexión directa (el movimiento se descarta)
     """
     # 1. Verificar si hay conexión directa
     if not estacion_destino.abierta:
-        return 2e10
+        return None
     conexion = obtener_conexion(estacion_origen, estacion_destino)
     
     if conexion is None:
         # No hay conexión directa en esta línea
-        return 2e10
+        return None
     
     # 2. Calcular tiempo base de viaje (distancia / velocidad)
     distancia_km = conexion.distancia
@@ -143,9 +187,8 @@ def costo_real(
             afluencia_linea = afluencia.promedio
             break
     
-    if afluencia_linea == 0:
-        print(f"Advertencia: Afluencia no encontrada para línea {linea_actual} en estación {estacion_origen.name}")
-    
+    # Una afluencia faltante cuenta como 0; el grafo compilado la detecta al
+    # construir la red y la instantánea la reporta una sola vez
     factor_afluencia = calcular_factor_afluencia(afluencia_linea, afluencia_max, dia_viaje)
     tiempo_con_afluencia = tiempo_viaje_segundos * factor_afluencia
     
@@ -0,0 +1,153 @@
+"""Árbol de caminos mínimos desde un origen sobre el grafo compilado.
+
+Una sola ejecución de Dijkstra desde las líneas de una estación de origen
+sirve para todos los destinos de esa estación: cada estación queda resuelta
+la primera vez que se extrae de la cola alguno de sus estados.
+"""
+
+import heapq
+import math
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.resultado_ruta import ResultadoRuta
+from bin.algoritmo.grafo_compilado import GrafoCompilado
+from bin.algoritmo.a_estrella_compilado import reconstruir_ruta_compilada
+
+
+class ArbolRutas:
+    """Resultado de una búsqueda de un origen a muchos destinos.
+
+    Attributes:
+        g: Costo mínimo de cada estado (inf si no se alcanzó)
+        padre: Arista por la que se llegó a cada estado (-1 en los iniciales)
+        mejor_estado: Primer estado resuelto de cada estación (-1 si no se alcanzó)
+        orden: Estados en el orden en que se resolvieron
+        expandidos: Número de estados extraídos de la cola
+    """
+
+    def __init__(self, g: List[float], padre: List[int], mejor_estado: List[int], orden: List[int]):
+        self.g = g
+        self.padre = padre
+        self.mejor_estado = mejor_estado
+        self.orden = orden
+
+    @property
+    def expandidos(self) -> int:
+        return len(self.orden)
+
+    def alcanzada(self, estacion: int) -> bool:
+        return self.mejor_estado[estacion] != -1
+
+    def costo(self, estacion: int) -> float:
+        estado = self.mejor_estado[estacion]
+        return self.g[estado] if estado != -1 else math.inf
+
+
+def estados_iniciales(grafo: GrafoCompilado, estacion: int) -> List[int]:
+    """Estados desde los que parte una búsqueda: líneas de la estación con ubicación propia."""
+    return [e for e in grafo.estados_de(estacion) if grafo.con_ubicacion[e]]
+
+
+def arbol_dijkstra(
+        grafo: GrafoCompilado,
+        costos: np.ndarray,
+        origen: int,
+        destinos: Optional[Iterable[int]] = None,
+        limite_segundos: Optional[float] = None
+    ) -> ArbolRutas:
+    """Dijkstra desde la estación `origen` sobre el grafo de estados.
+
+    Args:
+        grafo: Grafo compilado de la red
+        costos: Costo de cada arista en el régimen de la consulta
+        origen: Índice de la estación de origen
+        destinos: Estaciones de interés; la búsqueda termina al resolverlas todas.
+            None recorre todo lo alcanzable
+        limite_segundos: Costo máximo a explorar; los estados más lejanos no se expanden
+
+    Returns:
+        ArbolRutas con los costos y padres de los estados resueltos
+    """
+    n = grafo.numero_estados
+    offsets = memoryview(grafo.offsets)
+    destino_arista = memoryview(grafo.destinos)
+    estado_estacion = memoryview(grafo.estado_estacion)
+    costos = memoryview(costos)
+    limite = math.inf if limite_segundos is None else limite_segundos
+
+    g = [math.inf] * n
+    padre = [-1] * n
+    cerrado = bytearray(n)
+    mejor_estado = [-1] * grafo.numero_estaciones
+    pendientes = set(destinos) if destinos is not None else None
+    abiertos: List[tuple] = []
+    orden: List[int] = []
+
+    for estado in estados_iniciales(grafo, origen):
+        g[estado] = 0.0
+        abiertos.append((0.0, estado))
+    heapq.heapify(abiertos)
+
+    while abiertos:
+        g_u, u = heapq.heappop(abiertos)
+        if cerrado[u]:
+            continue
+        if g_u > limite:
+            break
+        cerrado[u] = 1
+        orden.append(u)
+
+        estacion = estado_estacion[u]
+        if mejor_estado[estacion] == -1:
+            mejor_estado[estacion] = u
+            if pendientes is not None:
+                pendientes.discard(estacion)
+                if not pendientes:
+                    break
+
+        for arista in range(offsets[u], offsets[u + 1]):
+            v = destino_arista[arista]
+            if cerrado[v]:
+                continue
+            g_v = g_u + costos[arista]
+            if g_v < g[v]:
+                g[v] = g_v
+                padre[v] = arista
+                heapq.heappush(abiertos, (g_v, v))
+
+    return ArbolRutas(g, padre, mejor_estado, orden)
+
+
+def ruta_desde_arbol(grafo: GrafoCompilado, arbol: ArbolRutas, destino: int,
+                     costos: Sequence[float]) -> Optional[ResultadoRuta]:
+    """Ruta del origen del árbol a la estación `destino`, o None si no se alcanzó."""
+    estado = arbol.mejor_estado[destino]
+    if estado == -1:
+        return None
+    return reconstruir_ruta_compilada(grafo, estado, arbol.padre, costos)
+
+
+def distancias_y_transbordos(grafo: GrafoCompilado, arbol: ArbolRutas) -> Tuple[List[float], List[int]]:
+    """Distancia recorrida y transbordos de cada estado resuelto del árbol.
+
+    Se calculan en el orden de resolución, así que el padre de cada estado
+    ya tiene sus valores cuando se procesa.
+
+    Returns:
+        Tupla (distancia_km, transbordos) indexada por estado
+    """
+    n = grafo.numero_estados
+    distancia = [0.0] * n
+    transbordos = [0] * n
+    fuentes = grafo.fuentes
+    estado_linea = grafo.estado_linea
+    for v in arbol.orden:
+        arista = arbol.padre[v]
+        if arista == -1:
+            continue
+        u = int(fuentes[arista])
+        distancia[v] = distancia[u] + float(grafo.distancias[arista])
+        transbordos[v] = transbordos[u] + (estado_linea[u] != estado_linea[v])
+    return distancia, transbordos
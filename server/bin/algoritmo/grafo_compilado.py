@@ -0,0 +1,288 @@
+"""Compilación de la red a un grafo indexado por enteros (formato CSR).
+
+Cada estado de búsqueda (estación, línea) recibe un identificador entero y las
+conexiones se guardan en arreglos contiguos: para el estado `u` sus aristas son
+`offsets[u]:offsets[u + 1]`, con destino `destinos[e]` y distancia
+`distancias[e]`. Los datos que el costo necesita por arista (afluencia de la
+estación de origen en la línea de la conexión y caminata de transbordo) se
+resuelven una sola vez al compilar, de modo que la búsqueda no vuelve a
+recorrer objetos pydantic ni a hacer búsquedas por nombre.
+"""
+
+import copy
+from functools import cached_property
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from models.estacion_completa import EstacionCompleta, LineaEnum
+from bin.algoritmo.costo_real import obtener_conexion, obtener_distancia_transbordo
+
+# Orden fijo de las líneas; `estado_linea` guarda el índice en esta tupla
+LINEAS: Tuple[LineaEnum, ...] = tuple(LineaEnum)
+_CODIGO_LINEA: Dict[LineaEnum, int] = {linea: i for i, linea in enumerate(LINEAS)}
+
+
+class GrafoCompilado:
+    """Grafo de estados (estación, línea) respaldado por arreglos de NumPy.
+
+    Los estados de una misma estación son consecutivos: la estación `i` ocupa
+    los estados `estacion_offsets[i]:estacion_offsets[i + 1]`.
+
+    Attributes:
+        nombres: Nombre interno de cada estación
+        nombres_originales: Nombre para mostrar de cada estación
+        indice: Mapeo nombre interno -> índice de estación
+        estacion_offsets: Primer estado de cada estación (n_estaciones + 1)
+        estacion_latitud: Latitud de referencia de cada estación (primera ubicación)
+        estacion_longitud: Longitud de referencia de cada estación
+        abierta: Estado de operación de cada estación
+        estado_estacion: Estación a la que pertenece cada estado
+        estado_linea: Código de línea de cada estado (índice en `LINEAS`)
+        latitudes: Latitud de cada estado en su línea
+        longitudes: Longitud de cada estado en su línea
+        con_ubicacion: Si el estado tiene coordenadas propias de su línea
+        afluencia: Afluencia promedio de la estación en la línea del estado
+        offsets: Inicio de las aristas de cada estado (n_estados + 1)
+        destinos: Estado destino de cada arista
+        fuentes: Estado origen de cada arista
+        distancias: Distancia en km de cada arista
+        afluencia_aristas: Afluencia de la estación origen en la línea de la arista
+        transbordo_km: Caminata de transbordo que `costo_real` cobra al tomar la arista
+        afluencia_max: Afluencia máxima usada para normalizar costos
+        advertencias: Problemas de calidad de datos detectados al compilar
+    """
+
+    def __init__(self, nombres: Sequence[str], nombres_originales: Sequence[str],
+                 estacion_offsets: np.ndarray, estacion_latitud: np.ndarray,
+                 estacion_longitud: np.ndarray, abierta: np.ndarray,
+                 estado_estacion: np.ndarray, estado_linea: np.ndarray,
+                 latitudes: np.ndarray, longitudes: np.ndarray, con_ubicacion: np.ndarray,
+                 afluencia: np.ndarray, offsets: np.ndarray, destinos: np.ndarray,
+                 fuentes: np.ndarray, distancias: np.ndarray, afluencia_aristas: np.ndarray,
+                 transbordo_km: np.ndarray, afluencia_max: int,
+                 advertencias: Sequence[str] = ()):
+        self.nombres = tuple(nombres)
+        self.nombres_originales = tuple(nombres_originales)
+        self.indice: Dict[str, int] = {nombre: i for i, nombre in enumerate(self.nombres)}
+        self.estacion_offsets = estacion_offsets
+        self.estacion_latitud = estacion_latitud
+        self.estacion_longitud = estacion_longitud
+        self.abierta = abierta
+        self.estado_estacion = estado_estacion
+        self.estado_linea = estado_linea
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.con_ubicacion = con_ubicacion
+        self.afluencia = afluencia
+        self.offsets = offsets
+        self.destinos = destinos
+        self.fuentes = fuentes
+        self.distancias = distancias
+        self.afluencia_aristas = afluencia_aristas
+        self.transbordo_km = transbordo_km
+        self.afluencia_max = afluencia_max
+        self.advertencias = tuple(advertencias)
+
+    @property
+    def numero_estaciones(self) -> int:
+        return len(self.nombres)
+
+    @property
+    def numero_estados(self) -> int:
+        return len(self.estado_estacion)
+
+    @property
+    def numero_aristas(self) -> int:
+        return len(self.destinos)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los arreglos del grafo (sin contar los nombres)."""
+        return sum(
+            arreglo.nbytes for arreglo in vars(self).values()
+            if isinstance(arreglo, np.ndarray)
+        )
+
+    def estados_de(self, estacion: int) -> range:
+        """Estados (uno por línea) de la estación con índice `estacion`."""
+        return range(int(self.estacion_offsets[estacion]), int(self.estacion_offsets[estacion + 1]))
+
+    def linea_de(self, estado: int) -> LineaEnum:
+        """Línea del estado `estado`."""
+        return LINEAS[self.estado_linea[estado]]
+
+    def codigo_linea(self, linea: LineaEnum) -> int:
+        """Código de `linea` en `estado_linea`."""
+        return _CODIGO_LINEA[linea]
+
+    def aristas_de_tramo(self, estacion_a: int, estacion_b: int, linea: int) -> np.ndarray:
+        """Aristas del tramo entre dos estaciones en una línea, en ambos sentidos.
+
+        Args:
+            estacion_a: Índice de una de las estaciones
+            estacion_b: Índice de la otra estación
+            linea: Código de la línea (ver `codigo_linea`)
+
+        Returns:
+            Índices de las aristas que llegan a una de las dos estaciones por
+            `linea` desde la otra
+        """
+        desde = self.estado_estacion[self.fuentes]
+        hacia = self.estado_estacion[self.destinos]
+        en_linea = self.estado_linea[self.destinos] == linea
+        ida = (desde == estacion_a) & (hacia == estacion_b)
+        vuelta = (desde == estacion_b) & (hacia == estacion_a)
+        return np.flatnonzero(en_linea & (ida | vuelta))
+
+    def mascara_cierres(self, tramos: Iterable[Tuple[int, int, int]] = ()) -> np.ndarray:
+        """Aristas cerradas: las que entran a una estación cerrada y las de `tramos`.
+
+        Args:
+            tramos: Tramos cerrados como (estacion_a, estacion_b, codigo_linea)
+
+        Returns:
+            Arreglo booleano indexado por arista
+        """
+        cerradas = ~self.abierta[self.estado_estacion[self.destinos]]
+        for estacion_a, estacion_b, linea in tramos:
+            cerradas[self.aristas_de_tramo(estacion_a, estacion_b, linea)] = True
+        return cerradas
+
+    def con_abiertas(self, abierta: np.ndarray) -> "GrafoCompilado":
+        """Copia del grafo con otro estado de operación de las estaciones.
+
+        La copia comparte todos los arreglos (y la adyacencia inversa ya
+        calculada) salvo `abierta`.
+        """
+        grafo = copy.copy(self)
+        grafo.abierta = abierta
+        return grafo
+
+    @cached_property
+    def entrantes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Adyacencia inversa en formato CSR, derivada de `destinos`.
+
+        Returns:
+            Tupla (offsets, aristas): las aristas que llegan al estado `v` son
+            `aristas[offsets[v]:offsets[v + 1]]` y su origen es `fuentes[arista]`
+        """
+        aristas = np.argsort(self.destinos, kind="stable").astype(np.int32)
+        offsets = np.zeros(self.numero_estados + 1, dtype=np.int32)
+        np.cumsum(np.bincount(self.destinos, minlength=self.numero_estados), out=offsets[1:])
+        return offsets, aristas
+
+
+def compilar_grafo(estaciones: Sequence[EstacionCompleta]) -> GrafoCompilado:
+    """Compila la lista de estaciones a un `GrafoCompilado`.
+
+    Se crea un estado por cada línea de la estación (más cualquier línea con la
+    que otra estación llegue a ella). Las conexiones hacia estaciones que no
+    existen o que no tienen ubicación se descartan, igual que en `a_estrella`.
+
+    Args:
+        estaciones: Estaciones de la red
+
+    Returns:
+        GrafoCompilado equivalente a la lista de estaciones
+    """
+    estaciones_dict = {e.name: e for e in estaciones}
+    advertencias: List[str] = []
+
+    # Líneas (estados) de cada estación, en orden estable
+    lineas_por_estacion: Dict[str, List[LineaEnum]] = {
+        e.name: list(dict.fromkeys(e.lineas)) for e in estaciones
+    }
+    for estacion in estaciones:
+        for conexion in estacion.conexiones:
+            lineas_destino = lineas_por_estacion.get(conexion.estacion)
+            if lineas_destino is not None and conexion.linea not in lineas_destino:
+                lineas_destino.append(conexion.linea)
+
+    estado_id: Dict[Tuple[str, LineaEnum], int] = {}
+    estacion_offsets = [0]
+    estado_estacion: List[int] = []
+    estado_linea: List[int] = []
+    latitudes: List[float] = []
+    longitudes: List[float] = []
+    con_ubicacion: List[bool] = []
+    afluencia: List[int] = []
+    estacion_latitud: List[float] = []
+    estacion_longitud: List[float] = []
+
+    for i, estacion in enumerate(estaciones):
+        ubicaciones = {u.linea: u for u in estacion.ubicacion}
+        afluencias = {a.linea: a.promedio for a in estacion.afluencia_promedio}
+        referencia = estacion.ubicacion[0] if estacion.ubicacion else None
+        estacion_latitud.append(referencia.latitud if referencia else np.nan)
+        estacion_longitud.append(referencia.longitud if referencia else np.nan)
+
+        for linea in lineas_por_estacion[estacion.name]:
+            estado_id[(estacion.name, linea)] = len(estado_estacion)
+            estado_estacion.append(i)
+            estado_linea.append(_CODIGO_LINEA[linea])
+            ubicacion = ubicaciones.get(linea, referencia)
+            latitudes.append(ubicacion.latitud if ubicacion else np.nan)
+            longitudes.append(ubicacion.longitud if ubicacion else np.nan)
+            con_ubicacion.append(linea in ubicaciones)
+            afluencia.append(afluencias.get(linea, 0))
+        estacion_offsets.append(len(estado_estacion))
+
+    offsets = [0]
+    destinos: List[int] = []
+    fuentes: List[int] = []
+    distancias: List[float] = []
+    afluencia_aristas: List[float] = []
+    transbordo_km: List[float] = []
+
+    for estacion in estaciones:
+        afluencias = {a.linea: a.promedio for a in estacion.afluencia_promedio}
+        for linea_actual in lineas_por_estacion[estacion.name]:
+            u = estado_id[(estacion.name, linea_actual)]
+            for conexion in estacion.conexiones:
+                vecina = estaciones_dict.get(conexion.estacion)
+                if vecina is None or not vecina.ubicacion:
+                    continue
+                # `a_estrella` llama a `costo_real` con la línea de la conexión como
+                # línea actual y éste resuelve la conexión con `obtener_conexion`;
+                # se replica aquí para que ambos motores cobren exactamente lo mismo
+                conexion_costo = obtener_conexion(estacion, vecina)
+                if conexion_costo.linea not in afluencias:
+                    advertencias.append(
+                        f"Afluencia no encontrada para línea {conexion_costo.linea.value} "
+                        f"en estación {estacion.name}"
+                    )
+                destinos.append(estado_id[(conexion.estacion, conexion.linea)])
+                fuentes.append(u)
+                distancias.append(conexion.distancia)
+                afluencia_aristas.append(afluencias.get(conexion_costo.linea, 0))
+                transbordo_km.append(
+                    obtener_distancia_transbordo(estacion, conexion.linea, conexion_costo.linea)
+                    if conexion_costo.linea != conexion.linea else 0.0
+                )
+            offsets.append(len(destinos))
+
+    afluencia_max = max(afluencia, default=0)
+
+    return GrafoCompilado(
+        nombres=[e.name for e in estaciones],
+        nombres_originales=[e.nombre_original for e in estaciones],
+        estacion_offsets=np.asarray(estacion_offsets, dtype=np.int32),
+        estacion_latitud=np.asarray(estacion_latitud, dtype=np.float64),
+        estacion_longitud=np.asarray(estacion_longitud, dtype=np.float64),
+        abierta=np.asarray([e.abierta for e in estaciones], dtype=np.bool_),
+        estado_estacion=np.asarray(estado_estacion, dtype=np.int32),
+        estado_linea=np.asarray(estado_linea, dtype=np.int8),
+        latitudes=np.asarray(latitudes, dtype=np.float64),
+        longitudes=np.asarray(longitudes, dtype=np.float64),
+        con_ubicacion=np.asarray(con_ubicacion, dtype=np.bool_),
+        afluencia=np.asarray(afluencia, dtype=np.int64),
+        offsets=np.asarray(offsets, dtype=np.int32),
+        destinos=np.asarray(destinos, dtype=np.int32),
+        fuentes=np.asarray(fuentes, dtype=np.int32),
+        distancias=np.asarray(distancias, dtype=np.float64),
+        afluencia_aristas=np.asarray(afluencia_aristas, dtype=np.float64),
+        transbordo_km=np.asarray(transbordo_km, dtype=np.float64),
+        afluencia_max=afluencia_max,
+        advertencias=list(dict.fromkeys(advertencias)),
+    )
@@ -0,0 +1,428 @@
+"""Jerarquía de contracción (CH) sobre el grafo de estados (estación, línea).
+
+Preprocesamiento: los estados se contraen uno a uno en orden de importancia
+(diferencia de aristas). Al contraer `v`, para cada par de vecinos `u -> v ->
+w` aún sin contraer se agrega el atajo `u -> w` salvo que una búsqueda de
+testigos encuentre un camino igual de barato que no pase por `v`. Como los
+costos dependen del régimen, se construye una jerarquía por régimen.
+
+Consulta: búsqueda bidireccional que solo sube de rango, hacia adelante desde
+las líneas del origen y hacia atrás desde las líneas del destino; el mejor
+estado de encuentro da la ruta, cuyos atajos se desempacan recursivamente en
+las aristas originales para construir el mismo `ResultadoRuta`.
+
+La jerarquía se guarda en un `.npz` junto al archivo de datos y se identifica
+con una firma de las tablas de costo, de modo que un archivo de otra red o de
+otras constantes nunca se usa por error.
+"""
+
+import heapq
+import math
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from models.resultado_ruta import ResultadoRuta
+from bin.algoritmo.grafo_compilado import GrafoCompilado
+from bin.algoritmo.tablas_costo import TablasCosto, Regimen, REGIMENES
+from bin.algoritmo.a_estrella_compilado import resultado_desde_aristas, validar_consulta, sin_ruta
+
+# Estados que puede asentar una búsqueda de testigos antes de rendirse (y
+# agregar el atajo, que siempre es seguro)
+MAX_ASENTADOS_TESTIGOS = 500
+
+# Campos de cada capa que se guardan en el archivo
+_CAMPOS_CAPA = ("rango", "fuentes", "destinos", "costos", "hijo_a", "hijo_b",
+                "subida_offsets", "subida_aristas", "bajada_offsets", "bajada_aristas")
+
+
+def ruta_jerarquia(datos: Union[str, Path]) -> Path:
+    """Archivo en el que se guarda la jerarquía de un archivo de datos."""
+    datos = Path(datos)
+    return datos.with_name(f"{datos.stem}.ch.npz")
+
+
+class CapaJerarquia:
+    """Jerarquía de contracción de un régimen.
+
+    Las aristas de la jerarquía incluyen las originales y los atajos. Una
+    arista original guarda en `hijo_a` su índice en el grafo compilado y -1 en
+    `hijo_b`; un atajo guarda las dos aristas de la jerarquía que reemplaza.
+
+    Attributes:
+        rango: Posición de cada estado en el orden de contracción
+        fuentes: Estado origen de cada arista de la jerarquía
+        destinos: Estado destino de cada arista
+        costos: Costo en segundos de cada arista
+        hijo_a: Arista original, o primera mitad del atajo
+        hijo_b: -1, o segunda mitad del atajo
+        subida_offsets: CSR por origen de las aristas que suben de rango
+        subida_aristas: Aristas que suben de rango, agrupadas por origen
+        bajada_offsets: CSR por destino de las aristas que bajan de rango
+        bajada_aristas: Aristas que bajan de rango, agrupadas por destino
+    """
+
+    def __init__(self, rango: np.ndarray, fuentes: np.ndarray, destinos: np.ndarray,
+                 costos: np.ndarray, hijo_a: np.ndarray, hijo_b: np.ndarray,
+                 subida_offsets: np.ndarray, subida_aristas: np.ndarray,
+                 bajada_offsets: np.ndarray, bajada_aristas: np.ndarray):
+        self.rango = rango
+        self.fuentes = fuentes
+        self.destinos = destinos
+        self.costos = costos
+        self.hijo_a = hijo_a
+        self.hijo_b = hijo_b
+        self.subida_offsets = subida_offsets
+        self.subida_aristas = subida_aristas
+        self.bajada_offsets = bajada_offsets
+        self.bajada_aristas = bajada_aristas
+
+    @property
+    def numero_atajos(self) -> int:
+        return int(np.count_nonzero(self.hijo_b != -1))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, campo).nbytes for campo in _CAMPOS_CAPA)
+
+    def desempacar(self, aristas: List[int]) -> List[int]:
+        """Convierte aristas de la jerarquía en las aristas originales que representan."""
+        hijo_a = self.hijo_a
+        hijo_b = self.hijo_b
+        originales: List[int] = []
+        pila = list(reversed(aristas))
+        while pila:
+            arista = pila.pop()
+            b = int(hijo_b[arista])
+            if b == -1:
+                originales.append(int(hijo_a[arista]))
+            else:
+                pila.append(b)
+                pila.append(int(hijo_a[arista]))
+        return originales
+
+
+class JerarquiaContraccion:
+    """Jerarquías de contracción de todos los regímenes.
+
+    Attributes:
+        capas: Jerarquía de cada régimen
+        firma: Firma de las tablas de costo usadas (`TablasCosto.firma`)
+        segundos_construccion: Tiempo que tomó el preprocesamiento (0 si se cargó)
+    """
+
+    def __init__(self, capas: Dict[Regimen, CapaJerarquia], firma: str,
+                 segundos_construccion: float = 0.0):
+        self.capas = capas
+        self.firma = firma
+        self.segundos_construccion = segundos_construccion
+
+    def de(self, regimen: Regimen) -> CapaJerarquia:
+        """Jerarquía del régimen `regimen`."""
+        return self.capas[regimen]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(capa.nbytes for capa in self.capas.values())
+
+    def guardar(self, path: Union[str, Path]) -> Path:
+        """Guarda la jerarquía en un archivo `.npz`.
+
+        Returns:
+            Ruta del archivo escrito
+        """
+        path = Path(path)
+        arreglos = {"firma": np.array(self.firma)}
+        for regimen, capa in self.capas.items():
+            for campo in _CAMPOS_CAPA:
+                arreglos[f"{regimen.clave}__{campo}"] = getattr(capa, campo)
+        # Se escribe en un temporal y se renombra para no dejar archivos a medias
+        temporal = path.with_name(path.name + ".tmp")
+        with open(temporal, "wb") as archivo:
+            np.savez(archivo, **arreglos)
+        temporal.replace(path)
+        return path
+
+
+def cargar_jerarquia(path: Union[str, Path], firma: str) -> Optional[JerarquiaContraccion]:
+    """Carga una jerarquía guardada con `JerarquiaContraccion.guardar`.
+
+    Args:
+        path: Archivo `.npz`
+        firma: Firma esperada (la de las tablas de costo de la red actual)
+
+    Returns:
+        La jerarquía, o None si el archivo no existe o corresponde a otras tablas
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    with np.load(path, allow_pickle=False) as datos:
+        if str(datos["firma"]) != firma:
+            return None
+        capas = {
+            regimen: CapaJerarquia(**{campo: datos[f"{regimen.clave}__{campo}"] for campo in _CAMPOS_CAPA})
+            for regimen in REGIMENES
+        }
+    return JerarquiaContraccion(capas, firma)
+
+
+def _csr(claves: np.ndarray, aristas: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Agrupa `aristas` por `claves` en formato CSR."""
+    orden = np.argsort(claves, kind="stable")
+    offsets = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(claves, minlength=n), out=offsets[1:])
+    return offsets, aristas[orden].astype(np.int32)
+
+
+def _contraer(grafo: GrafoCompilado, costos_grafo: np.ndarray) -> CapaJerarquia:
+    """Construye la jerarquía de un régimen."""
+    n = grafo.numero_estados
+    fuentes: List[int] = []
+    destinos: List[int] = []
+    costos: List[float] = []
+    hijo_a: List[int] = []
+    hijo_b: List[int] = []
+    # Aristas vigentes entre estados aún no contraídos: vecino -> arista
+    salida: List[Dict[int, int]] = [{} for _ in range(n)]
+    entrada: List[Dict[int, int]] = [{} for _ in range(n)]
+
+    def agregar(u: int, v: int, costo: float, a: int, b: int) -> None:
+        actual = salida[u].get(v)
+        if actual is not None and costos[actual] <= costo:
+            return
+        arista = len(fuentes)
+        fuentes.append(u)
+        destinos.append(v)
+        costos.append(costo)
+        hijo_a.append(a)
+        hijo_b.append(b)
+        salida[u][v] = arista
+        entrada[v][u] = arista
+
+    for arista in range(grafo.numero_aristas):
+        u = int(grafo.fuentes[arista])
+        v = int(grafo.destinos[arista])
+        if u != v:
+            agregar(u, v, float(costos_grafo[arista]), arista, -1)
+
+    def testigos(u: int, excluido: int, limite: float) -> Dict[int, float]:
+        distancia = {u: 0.0}
+        abiertos = [(0.0, u)]
+        asentados = 0
+        while abiertos:
+            d, x = heapq.heappop(abiertos)
+            if d > distancia[x]:
+                continue
+            if d > limite or asentados >= MAX_ASENTADOS_TESTIGOS:
+                break
+            asentados += 1
+            for y, arista in salida[x].items():
+                if y == excluido:
+                    continue
+                nueva = d + costos[arista]
+                if nueva < distancia.get(y, math.inf):
+                    distancia[y] = nueva
+                    heapq.heappush(abiertos, (nueva, y))
+        return distancia
+
+    def atajos(v: int) -> List[Tuple[int, int, float, int, int]]:
+        necesarios = []
+        salientes = list(salida[v].items())
+        for u, arista_uv in entrada[v].items():
+            costo_uv = costos[arista_uv]
+            limite = max((costos[a] for w, a in salientes if w != u), default=None)
+            if limite is None:
+                continue
+            distancia = testigos(u, v, costo_uv + limite)
+            for w, arista_vw in salientes:
+                if w == u:
+                    continue
+                costo = costo_uv + costos[arista_vw]
+                if distancia.get(w, math.inf) > costo:
+                    necesarios.append((u, w, costo, arista_uv, arista_vw))
+        return necesarios
+
+    vecinos_contraidos = [0] * n
+
+    def prioridad(v: int, necesarios: list) -> int:
+        return len(necesarios) - len(entrada[v]) - len(salida[v]) + vecinos_contraidos[v]
+
+    cola = []
+    for v in range(n):
+        cola.append((prioridad(v, atajos(v)), v))
+    heapq.heapify(cola)
+
+    rango = np.empty(n, dtype=np.int32)
+    nivel = 0
+    while cola:
+        _, v = heapq.heappop(cola)
+        # Actualización perezosa: si la prioridad empeoró, se reinserta
+        necesarios = atajos(v)
+        actual = prioridad(v, necesarios)
+        if cola and actual > cola[0][0]:
+            heapq.heappush(cola, (actual, v))
+            continue
+
+        rango[v] = nivel
+        nivel += 1
+        for u, w, costo, a, b in necesarios:
+            agregar(u, w, costo, a, b)
+        for u in entrada[v]:
+            del salida[u][v]
+            vecinos_contraidos[u] += 1
+        for w in salida[v]:
+            del entrada[w][v]
+            vecinos_contraidos[w] += 1
+        salida[v].clear()
+        entrada[v].clear()
+
+    fuentes_arr = np.asarray(fuentes, dtype=np.int32)
+    destinos_arr = np.asarray(destinos, dtype=np.int32)
+    todas = np.arange(len(fuentes_arr), dtype=np.int32)
+    sube = rango[fuentes_arr] < rango[destinos_arr]
+    subida_offsets, subida_aristas = _csr(fuentes_arr[sube], todas[sube], n)
+    bajada_offsets, bajada_aristas = _csr(destinos_arr[~sube], todas[~sube], n)
+
+    return CapaJerarquia(
+        rango=rango,
+        fuentes=fuentes_arr,
+        destinos=destinos_arr,
+        costos=np.asarray(costos, dtype=np.float64),
+        hijo_a=np.asarray(hijo_a, dtype=np.int32),
+        hijo_b=np.asarray(hijo_b, dtype=np.int32),
+        subida_offsets=subida_offsets,
+        subida_aristas=subida_aristas,
+        bajada_offsets=bajada_offsets,
+        bajada_aristas=bajada_aristas
+    )
+
+
+def construir_jerarquia(grafo: GrafoCompilado, tablas: TablasCosto) -> JerarquiaContraccion:
+    """Preprocesa la jerarquía de contracción de todos los regímenes.
+
+    Args:
+        grafo: Grafo compilado de la red
+        tablas: Tablas de costo de `grafo`
+
+    Returns:
+        JerarquiaContraccion con una capa por régimen de `REGIMENES`
+    """
+    inicio = time.perf_counter()
+    capas = {regimen: _contraer(grafo, tablas.de(regimen)) for regimen in REGIMENES}
+    return JerarquiaContraccion(capas, tablas.firma, time.perf_counter() - inicio)
+
+
+def ruta_desde_jerarquia(
+        grafo: GrafoCompilado,
+        tablas: TablasCosto,
+        jerarquia: JerarquiaContraccion,
+        estacion_origen: str,
+        estacion_destino: str,
+        regimen: Regimen
+    ) -> ResultadoRuta:
+    """Responde una consulta con búsquedas ascendentes sobre la jerarquía.
+
+    Args:
+        grafo: Grafo compilado de la red
+        tablas: Tablas de costo usadas para construir `jerarquia`
+        jerarquia: Jerarquía de contracción de la red
+        estacion_origen: Nombre de la estación de inicio
+        estacion_destino: Nombre de la estación objetivo
+        regimen: Régimen de costo de la consulta
+
+    Returns:
+        ResultadoRuta con la ruta óptima o mensaje de error
+    """
+    invalida = validar_consulta(grafo, estacion_origen, estacion_destino)
+    if invalida is not None:
+        return invalida
+
+    capa = jerarquia.de(regimen)
+    subida_offsets = memoryview(capa.subida_offsets)
+    subida_aristas = memoryview(capa.subida_aristas)
+    bajada_offsets = memoryview(capa.bajada_offsets)
+    bajada_aristas = memoryview(capa.bajada_aristas)
+    fuentes = memoryview(capa.fuentes)
+    destinos = memoryview(capa.destinos)
+    costos = memoryview(capa.costos)
+
+    # Igual que en A*, solo se parte de las líneas con ubicación propia
+    origen = grafo.indice[estacion_origen]
+    inicios = [e for e in grafo.estados_de(origen) if grafo.con_ubicacion[e]]
+    finales = grafo.estados_de(grafo.indice[estacion_destino])
+
+    # Costos y padres en diccionarios: cada búsqueda toca pocos estados
+    g_ida: Dict[int, float] = {e: 0.0 for e in inicios}
+    g_vuelta: Dict[int, float] = {e: 0.0 for e in finales}
+    padre_ida: Dict[int, int] = {}
+    padre_vuelta: Dict[int, int] = {}
+    cola_ida = [(0.0, e) for e in inicios]
+    cola_vuelta = [(0.0, e) for e in finales]
+
+    mu = math.inf
+    encuentro = -1
+    for estado in inicios:
+        if estado in g_vuelta:
+            mu, encuentro = 0.0, estado
+    expandidos = 0
+
+    while (cola_ida and cola_ida[0][0] < mu) or (cola_vuelta and cola_vuelta[0][0] < mu):
+        adelante = bool(cola_ida) and cola_ida[0][0] < mu and (
+            not cola_vuelta or cola_vuelta[0][0] >= mu or cola_ida[0][0] <= cola_vuelta[0][0])
+        if adelante:
+            g_u, u = heapq.heappop(cola_ida)
+            if g_u > g_ida[u]:
+                continue
+            expandidos += 1
+            for posicion in range(subida_offsets[u], subida_offsets[u + 1]):
+                arista = subida_aristas[posicion]
+                v = destinos[arista]
+                g_v = g_u + costos[arista]
+                if g_v < g_ida.get(v, math.inf):
+                    g_ida[v] = g_v
+                    padre_ida[v] = arista
+                    heapq.heappush(cola_ida, (g_v, v))
+                    total = g_v + g_vuelta.get(v, math.inf)
+                    if total < mu:
+                        mu, encuentro = total, v
+        else:
+            g_u, u = heapq.heappop(cola_vuelta)
+            if g_u > g_vuelta[u]:
+                continue
+            expandidos += 1
+            for posicion in range(bajada_offsets[u], bajada_offsets[u + 1]):
+                arista = bajada_aristas[posicion]
+                v = fuentes[arista]
+                g_v = g_u + costos[arista]
+                if g_v < g_vuelta.get(v, math.inf):
+                    g_vuelta[v] = g_v
+                    padre_vuelta[v] = arista
+                    heapq.heappush(cola_vuelta, (g_v, v))
+                    total = g_ida.get(v, math.inf) + g_v
+                    if total < mu:
+                        mu, encuentro = total, v
+
+    if encuentro == -1:
+        resultado = sin_ruta(estacion_origen, estacion_destino)
+        resultado.nodos_expandidos = expandidos
+        return resultado
+
+    aristas: List[int] = []
+    estado = encuentro
+    while estado in padre_ida:
+        arista = padre_ida[estado]
+        aristas.append(arista)
+        estado = fuentes[arista]
+    aristas.reverse()
+    estado = encuentro
+    while estado in padre_vuelta:
+        arista = padre_vuelta[estado]
+        aristas.append(arista)
+        estado = destinos[arista]
+
+    resultado = resultado_desde_aristas(grafo, capa.desempacar(aristas), tablas.de(regimen))
+    resultado.nodos_expandidos = expandidos
+    return resultado
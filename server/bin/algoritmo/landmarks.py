@@ -0,0 +1,184 @@
+"""Heurística ALT (A*, landmarks y desigualdad del triángulo).
+
+Se eligen K estados de referencia (landmarks) por instantánea de la red y, para
+cada régimen, se precalcula el costo exacto desde cada landmark a todos los
+estados y desde todos los estados hacia cada landmark. Para un estado `v` y un
+objetivo `t` la desigualdad del triángulo da la cota inferior
+
+    h(v) = max_L max(d(L, t) - d(L, v), d(v, L) - d(t, L))
+
+que nunca sobreestima el costo real, a diferencia de la distancia en línea
+recta entre coordenadas, que con los factores de afluencia queda muy por debajo
+del costo real en viajes largos (y en algunos tramos del conjunto de datos
+incluso por encima).
+"""
+
+import heapq
+import math
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from bin.algoritmo.grafo_compilado import GrafoCompilado
+from bin.algoritmo.tablas_costo import TablasCosto, Regimen, REGIMENES
+from bin.algoritmo.costo_real import TipoHorario
+
+# Número de landmarks por defecto
+NUM_LANDMARKS = 8
+
+# Régimen usado para elegir los landmarks (la posición relativa de los
+# estados casi no cambia entre regímenes)
+_REGIMEN_SELECCION = Regimen(TipoHorario.SEMANA_VALLE, False)
+
+
+def dijkstra_estados(grafo: GrafoCompilado, costos: np.ndarray, inicio: Union[int, Iterable[int]],
+                     inverso: bool = False) -> np.ndarray:
+    """Costo mínimo entre el estado `inicio` y todos los demás.
+
+    Args:
+        grafo: Grafo compilado de la red
+        costos: Costo de cada arista
+        inicio: Estado de partida, o varios (se toma el más cercano)
+        inverso: Si es True, calcula el costo de cada estado *hacia* `inicio`
+            recorriendo la adyacencia inversa
+
+    Returns:
+        Arreglo con el costo de cada estado (inf si no hay camino)
+    """
+    n = grafo.numero_estados
+    if inverso:
+        offsets, orden = grafo.entrantes
+        extremo = memoryview(grafo.fuentes)
+    else:
+        offsets, orden = grafo.offsets, None
+        extremo = memoryview(grafo.destinos)
+    offsets = memoryview(offsets)
+    orden = memoryview(orden) if orden is not None else None
+    costos = memoryview(costos)
+
+    g = [math.inf] * n
+    inicios = [int(inicio)] if isinstance(inicio, (int, np.integer)) else list(inicio)
+    for estado in inicios:
+        g[estado] = 0.0
+    cerrado = bytearray(n)
+    abiertos = [(0.0, estado) for estado in inicios]
+    while abiertos:
+        g_u, u = heapq.heappop(abiertos)
+        if cerrado[u]:
+            continue
+        cerrado[u] = 1
+        for posicion in range(offsets[u], offsets[u + 1]):
+            arista = orden[posicion] if orden is not None else posicion
+            v = extremo[arista]
+            g_v = g_u + costos[arista]
+            if g_v < g[v]:
+                g[v] = g_v
+                heapq.heappush(abiertos, (g_v, v))
+    return np.asarray(g)
+
+
+class Landmarks:
+    """Costos exactos desde y hacia los landmarks, por régimen.
+
+    Attributes:
+        estados: Estados elegidos como landmarks
+        desde: Arreglo (n_regimenes, K, n_estados) con d(L, v)
+        hacia: Arreglo (n_regimenes, K, n_estados) con d(v, L)
+        huella: Constantes de las tablas de costo usadas
+    """
+
+    def __init__(self, estados: Sequence[int], desde: np.ndarray, hacia: np.ndarray,
+                 huella: Tuple[float, ...]):
+        self.estados = tuple(estados)
+        self.desde = desde
+        self.hacia = hacia
+        self.huella = huella
+        self._fila = {regimen: i for i, regimen in enumerate(REGIMENES)}
+
+    @property
+    def nbytes(self) -> int:
+        return self.desde.nbytes + self.hacia.nbytes
+
+    def cotas(self, regimen: Regimen, objetivos: Sequence[int], inverso: bool = False) -> np.ndarray:
+        """Cota inferior del costo de cada estado al objetivo más cercano.
+
+        Args:
+            regimen: Régimen de costo de la consulta
+            objetivos: Estados que cuentan como llegada (las líneas del destino)
+            inverso: Si es True, acota el costo *desde* el objetivo más cercano
+                hasta cada estado (para la búsqueda hacia atrás)
+
+        Returns:
+            Arreglo con h(v) para todos los estados
+        """
+        capa = self._fila[regimen]
+        desde = self.desde[capa]
+        hacia = self.hacia[capa]
+        if inverso:
+            # d(s, v) >= d(L, v) - d(L, s) y d(s, v) >= d(s, L) - d(v, L): son
+            # las mismas expresiones con ambas tablas cambiadas de signo
+            desde, hacia = -desde, -hacia
+        mejor = np.full(desde.shape[1], np.inf)
+        with np.errstate(invalid="ignore"):
+            for t in objetivos:
+                # inf - inf da nan: ese landmark no aporta información
+                adelante = desde[:, t:t + 1] - desde
+                atras = hacia - hacia[:, t:t + 1]
+                cota = np.fmax.reduce(np.fmax(adelante, atras), axis=0)
+                np.minimum(mejor, np.fmax(np.nan_to_num(cota, nan=0.0, posinf=np.inf), 0.0), out=mejor)
+        return mejor
+
+
+def elegir_landmarks(grafo: GrafoCompilado, costos: np.ndarray, k: int) -> List[int]:
+    """Elige `k` landmarks con la estrategia del más lejano.
+
+    Cada landmark nuevo es el estado alcanzable cuya distancia (ida + vuelta)
+    al landmark más cercano ya elegido es máxima, de modo que queden repartidos
+    en la periferia de la red.
+    """
+    k = min(k, grafo.numero_estados)
+    if k <= 0:
+        return []
+
+    def ida_y_vuelta(estado: int) -> np.ndarray:
+        return dijkstra_estados(grafo, costos, estado) + dijkstra_estados(grafo, costos, estado, inverso=True)
+
+    cercania = ida_y_vuelta(0)
+    elegidos: List[int] = []
+    while len(elegidos) < k:
+        candidatos = np.where(np.isfinite(cercania), cercania, -1.0)
+        if elegidos:
+            candidatos[elegidos] = -1.0
+        siguiente = int(np.argmax(candidatos))
+        if candidatos[siguiente] < 0:
+            break
+        elegidos.append(siguiente)
+        nueva = ida_y_vuelta(siguiente)
+        cercania = nueva if len(elegidos) == 1 else np.minimum(cercania, nueva)
+    return elegidos
+
+
+def construir_landmarks(grafo: GrafoCompilado, tablas: TablasCosto,
+                        k: int = NUM_LANDMARKS, estados: Optional[Sequence[int]] = None) -> Landmarks:
+    """Precalcula los costos desde y hacia los landmarks para todos los regímenes.
+
+    Args:
+        grafo: Grafo compilado de la red
+        tablas: Tablas de costo de `grafo`
+        k: Número de landmarks a elegir
+        estados: Landmarks ya elegidos (se omite la selección)
+
+    Returns:
+        Landmarks listos para calcular cotas
+    """
+    if estados is None:
+        estados = elegir_landmarks(grafo, tablas.de(_REGIMEN_SELECCION), k)
+    n = grafo.numero_estados
+    desde = np.empty((len(REGIMENES), len(estados), n))
+    hacia = np.empty((len(REGIMENES), len(estados), n))
+    for i, regimen in enumerate(REGIMENES):
+        costos = tablas.de(regimen)
+        for j, estado in enumerate(estados):
+            desde[i, j] = dijkstra_estados(grafo, costos, estado)
+            hacia[i, j] = dijkstra_estados(grafo, costos, estado, inverso=True)
+    return Landmarks(estados, desde, hacia, tablas.huella)
@@ -0,0 +1,283 @@
+"""Rutas alternativas: los k caminos sin ciclos de menor costo (Yen).
+
+Cada ruta alternativa se obtiene desviándose de una ruta ya aceptada en algún
+estado intermedio (el nodo de desvío): se conserva el prefijo (raíz), se
+prohíben las aristas con que las rutas aceptadas salen de esa misma raíz y se
+busca el mejor camino del nodo de desvío al destino sin volver a pasar por las
+estaciones de la raíz.
+
+Para no repetir búsquedas completas:
+
+* Se calcula una sola vez el árbol inverso de caminos mínimos hacia el
+  destino. Si el camino del árbol desde el nodo de desvío no usa nada
+  prohibido, ése es el desvío óptimo y no se busca nada. Si no, su costo es
+  una heurística exacta para la red completa que sigue siendo admisible y
+  consistente cuando se prohíben aristas o estaciones (eso solo encarece los
+  caminos), así que la búsqueda de desvío es un A* que casi no se aparta del
+  camino final.
+* Con la mejora de Lawler, una ruta nueva solo genera desvíos a partir del
+  punto en que se separó de su ruta madre; los anteriores ya se exploraron.
+* Las búsquedas de desvío se memorizan por (inicio, aristas prohibidas,
+  estaciones bloqueadas).
+
+Las rutas no repiten estaciones: cambiar de línea en una estación sin bajar
+no es una alternativa real.
+"""
+
+import heapq
+import math
+import time
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from models.resultado_ruta import ResultadoRuta
+from bin.algoritmo.grafo_compilado import GrafoCompilado
+from bin.algoritmo.tablas_costo import TablasCosto, Regimen
+from bin.algoritmo.landmarks import dijkstra_estados
+from bin.algoritmo.a_estrella_compilado import resultado_desde_aristas, validar_consulta, sin_ruta
+
+# Un camino: estado inicial y aristas en orden
+Camino = Tuple[int, Tuple[int, ...]]
+
+
+class RutasAlternativas:
+    """Resultado de una búsqueda de rutas alternativas.
+
+    Attributes:
+        rutas: Rutas en orden de costo (la primera es la óptima), o un único
+            ResultadoRuta sin éxito si la consulta no es válida
+        completa: False si se agotó el tiempo antes de encontrar las k rutas
+            (puede haber menos rutas aunque sea True: no existen más)
+        busquedas: Búsquedas de desvío ejecutadas
+        reutilizadas: Desvíos resueltos con el árbol inverso o desde la memoria
+    """
+
+    def __init__(self, rutas: List[ResultadoRuta], completa: bool = True,
+                 busquedas: int = 0, reutilizadas: int = 0):
+        self.rutas = rutas
+        self.completa = completa
+        self.busquedas = busquedas
+        self.reutilizadas = reutilizadas
+
+
+def _buscar_desvio(
+        grafo: GrafoCompilado,
+        costos: memoryview,
+        h: List[float],
+        inicios: Sequence[int],
+        objetivo: int,
+        prohibidas: FrozenSet[int],
+        bloqueadas: FrozenSet[int]
+    ) -> Optional[Camino]:
+    """A* con heurística exacta desde `inicios` hasta cualquier línea de `objetivo`.
+
+    Args:
+        grafo: Grafo compilado de la red
+        costos: Costo de cada arista
+        h: Costo mínimo de cada estado al destino en la red completa
+        inicios: Estados de partida
+        objetivo: Estación destino
+        prohibidas: Aristas que no se pueden usar
+        bloqueadas: Estaciones a las que no se puede entrar
+
+    Returns:
+        Camino encontrado, o None si no hay
+    """
+    offsets = memoryview(grafo.offsets)
+    destinos = memoryview(grafo.destinos)
+    fuentes = memoryview(grafo.fuentes)
+    estado_estacion = memoryview(grafo.estado_estacion)
+
+    g: Dict[int, float] = {}
+    padre: Dict[int, int] = {}
+    cerrado: Set[int] = set()
+    abiertos = []
+    for estado in inicios:
+        if h[estado] < math.inf:
+            g[estado] = 0.0
+            abiertos.append((h[estado], estado))
+    heapq.heapify(abiertos)
+
+    while abiertos:
+        _, u = heapq.heappop(abiertos)
+        if u in cerrado:
+            continue
+        if estado_estacion[u] == objetivo:
+            aristas = []
+            while u in padre:
+                arista = padre[u]
+                aristas.append(arista)
+                u = fuentes[arista]
+            aristas.reverse()
+            return u, tuple(aristas)
+        cerrado.add(u)
+
+        g_u = g[u]
+        for arista in range(offsets[u], offsets[u + 1]):
+            v = destinos[arista]
+            if v in cerrado or arista in prohibidas or estado_estacion[v] in bloqueadas:
+                continue
+            g_v = g_u + costos[arista]
+            if g_v < g.get(v, math.inf) and h[v] < math.inf:
+                g[v] = g_v
+                padre[v] = arista
+                heapq.heappush(abiertos, (g_v + h[v], v))
+    return None
+
+
+def rutas_alternativas(
+        grafo: GrafoCompilado,
+        tablas: TablasCosto,
+        estacion_origen: str,
+        estacion_destino: str,
+        regimen: Regimen,
+        k: int,
+        limite_segundos: Optional[float] = None
+    ) -> RutasAlternativas:
+    """Calcula hasta `k` rutas sin estaciones repetidas, en orden de costo.
+
+    Args:
+        grafo: Grafo compilado de la red
+        tablas: Tablas de costo de `grafo`
+        estacion_origen: Nombre de la estación de inicio
+        estacion_destino: Nombre de la estación objetivo
+        regimen: Régimen de costo de la consulta
+        k: Número máximo de rutas
+        limite_segundos: Tiempo máximo de cómputo; al agotarse se devuelven
+            las rutas encontradas hasta ese momento
+
+    Returns:
+        RutasAlternativas con las rutas encontradas
+    """
+    invalida = validar_consulta(grafo, estacion_origen, estacion_destino)
+    if invalida is not None:
+        return RutasAlternativas([invalida])
+
+    limite = math.inf if limite_segundos is None else time.perf_counter() + limite_segundos
+    origen = grafo.indice[estacion_origen]
+    objetivo = grafo.indice[estacion_destino]
+    tabla = tablas.de(regimen)
+    costos = memoryview(tabla)
+    destinos = grafo.destinos
+    estado_estacion = grafo.estado_estacion
+
+    # Árbol inverso: costo mínimo de cada estado al destino
+    h = dijkstra_estados(grafo, tabla, grafo.estados_de(objetivo), inverso=True).tolist()
+    inicios = [e for e in grafo.estados_de(origen) if grafo.con_ubicacion[e]]
+
+    offsets = grafo.offsets
+    sucesor: Dict[int, int] = {}
+    memoria: Dict[tuple, Optional[Camino]] = {}
+    busquedas = 0
+    reutilizadas = 0
+
+    def camino_del_arbol(inicio: int, prohibidas: FrozenSet[int],
+                         bloqueadas: FrozenSet[int]) -> Optional[Camino]:
+        """Desvío óptimo tomado del árbol inverso, o None si hay que buscarlo.
+
+        La primera arista es la permitida con menor costo + h; si desde ahí el
+        camino del árbol no usa nada prohibido, su costo es exactamente h y
+        ninguna otra salida puede mejorarlo.
+        """
+        permitidas = [
+            a for a in range(offsets[inicio], offsets[inicio + 1])
+            if a not in prohibidas and estado_estacion[destinos[a]] not in bloqueadas
+        ]
+        if not permitidas:
+            return None
+        arista = min(permitidas, key=lambda a: costos[a] + h[destinos[a]])
+        if h[destinos[arista]] == math.inf:
+            return None
+        aristas = [arista]
+        estado = int(destinos[arista])
+        while estado_estacion[estado] != objetivo:
+            if len(aristas) > grafo.numero_estados:
+                return None
+            if estado not in sucesor:
+                salida = range(offsets[estado], offsets[estado + 1])
+                sucesor[estado] = min(salida, key=lambda a: costos[a] + h[destinos[a]], default=-1)
+            arista = sucesor[estado]
+            if arista == -1 or arista in prohibidas or estado_estacion[destinos[arista]] in bloqueadas:
+                return None
+            aristas.append(arista)
+            estado = int(destinos[arista])
+        return inicio, tuple(aristas)
+
+    def desvio(inicios_desvio: Sequence[int], prohibidas: FrozenSet[int],
+               bloqueadas: FrozenSet[int]) -> Optional[Camino]:
+        nonlocal busquedas, reutilizadas
+        clave = (tuple(inicios_desvio), prohibidas, bloqueadas)
+        if clave in memoria:
+            reutilizadas += 1
+            return memoria[clave]
+        camino = None
+        if len(inicios_desvio) == 1 and h[inicios_desvio[0]] < math.inf:
+            camino = camino_del_arbol(inicios_desvio[0], prohibidas, bloqueadas)
+        if camino is not None:
+            reutilizadas += 1
+        else:
+            busquedas += 1
+            camino = _buscar_desvio(grafo, costos, h, inicios_desvio, objetivo, prohibidas, bloqueadas)
+        memoria[clave] = camino
+        return camino
+
+    def costo(camino: Camino) -> float:
+        return sum(costos[arista] for arista in camino[1])
+
+    def recorrido(camino: Camino) -> Tuple[int, ...]:
+        # Dos caminos que solo difieren en la línea de partida se ven igual
+        # (mismos pasos), así que se identifican por los estados que visitan
+        return tuple(int(destinos[a]) for a in camino[1])
+
+    def estaciones(camino: Camino) -> List[int]:
+        inicio, aristas = camino
+        return [int(estado_estacion[inicio])] + [int(estado_estacion[destinos[a]]) for a in aristas]
+
+    primera = desvio(inicios, frozenset(), frozenset([origen]))
+    if primera is None:
+        return RutasAlternativas([sin_ruta(estacion_origen, estacion_destino)],
+                                 busquedas=busquedas)
+
+    # Rutas aceptadas con el índice en que se separaron de su ruta madre
+    # (-1: cambiaron de estado inicial)
+    aceptadas: List[Tuple[Camino, int]] = [(primera, -1)]
+    candidatas: List[Tuple[float, int, Camino, int]] = []
+    vistos = {recorrido(primera)}
+    completa = True
+
+    while len(aceptadas) < k:
+        camino, separacion = aceptadas[-1]
+        inicio, aristas = camino
+        recorridas = estaciones(camino)
+        estados = [inicio] + [int(destinos[a]) for a in aristas]
+
+        for i in range(separacion, len(aristas)):
+            if time.perf_counter() > limite:
+                completa = False
+                break
+            if i == -1:
+                # Desvío en el estado inicial: otra línea de la estación de origen
+                usados = {c[0] for c, _ in aceptadas}
+                inicios_desvio = [e for e in inicios if e not in usados]
+                nuevo = desvio(inicios_desvio, frozenset(), frozenset([origen])) if inicios_desvio else None
+            else:
+                raiz = aristas[:i]
+                prohibidas = frozenset(
+                    c[1][i] for c, _ in aceptadas
+                    if c[0] == inicio and len(c[1]) > i and c[1][:i] == raiz
+                )
+                encontrado = desvio([estados[i]], prohibidas, frozenset(recorridas[:i + 1]))
+                nuevo = (inicio, raiz + encontrado[1]) if encontrado is not None else None
+            if nuevo is None or recorrido(nuevo) in vistos:
+                continue
+            vistos.add(recorrido(nuevo))
+            paradas = estaciones(nuevo)
+            if len(set(paradas)) == len(paradas):
+                heapq.heappush(candidatas, (costo(nuevo), len(vistos), nuevo, i))
+
+        if not completa or not candidatas:
+            break
+        _, _, camino, separacion = heapq.heappop(candidatas)
+        aceptadas.append((camino, separacion))
+
+    rutas = [resultado_desde_aristas(grafo, aristas, tabla) for (_, aristas), _ in aceptadas]
+    return RutasAlternativas(rutas, completa, busquedas, reutilizadas)
@@ -0,0 +1,246 @@
+"""Rutas Pareto-óptimas por tiempo, transbordos y exposición a la afluencia.
+
+`costo_real` mezcla los tres criterios en un solo número; aquí se conservan
+por separado y se devuelven todas las rutas que no son peores que otra en los
+tres a la vez, para que cada usuario elija según lo que le importa.
+
+Búsqueda multicriterio por etiquetas (label-setting): cada etiqueta es un
+camino parcial con su vector (tiempo, transbordos, exposición). Las etiquetas
+salen de la cola en orden de tiempo + cota inferior del tiempo restante, así
+que una etiqueta que sale más tarde nunca domina a las que ya se asentaron en
+su mismo estado. Se descarta una etiqueta si:
+
+* alguna etiqueta asentada en su estado la domina;
+* alguna ruta que ya llegó al destino domina su vector más las cotas
+  inferiores de lo que le falta en cada criterio (árboles inversos desde el
+  destino, uno por criterio);
+* su estado ya tiene `max_etiquetas` asentadas.
+
+Las cotas de etiquetas por estado y el límite de tiempo mantienen acotada la
+latencia; si alguno de los dos recorta la búsqueda el resultado se marca como
+incompleto, y si lo hace antes de que alguna etiqueta llegue al destino se
+devuelve solo la ruta más rápida (del árbol inverso de tiempos).
+
+La exposición de una ruta es la suma, sobre cada estación a la que llega (en
+la línea en que llega), de su afluencia promedio normalizada por la afluencia
+máxima de la red.
+"""
+
+import heapq
+import math
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from models.resultado_ruta import ResultadoRuta
+from bin.algoritmo.grafo_compilado import GrafoCompilado
+from bin.algoritmo.tablas_costo import TablasCosto, Regimen
+from bin.algoritmo.landmarks import dijkstra_estados
+from bin.algoritmo.a_estrella_compilado import resultado_desde_aristas, validar_consulta, sin_ruta
+
+# Vector de criterios: (tiempo en segundos, transbordos, exposición)
+Criterios = Tuple[float, int, float]
+
+
+class RutasPareto:
+    """Resultado de una búsqueda multicriterio.
+
+    Attributes:
+        rutas: Rutas del frente de Pareto en orden de tiempo, o un único
+            ResultadoRuta sin éxito si la consulta no es válida
+        completa: False si las cotas de etiquetas o el límite de tiempo
+            recortaron la búsqueda (puede faltar alguna ruta del frente)
+        etiquetas: Etiquetas asentadas durante la búsqueda
+    """
+
+    def __init__(self, rutas: List[ResultadoRuta], completa: bool = True, etiquetas: int = 0):
+        self.rutas = rutas
+        self.completa = completa
+        self.etiquetas = etiquetas
+
+
+def criterios_de_aristas(grafo: GrafoCompilado, costos: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Transbordos y exposición que suma cada arista.
+
+    Args:
+        grafo: Grafo compilado de la red
+        costos: Costo en tiempo de cada arista (inf en las cerradas, que
+            reciben inf también en los otros criterios)
+
+    Returns:
+        (transbordos, exposicion) por arista
+    """
+    transbordos = (grafo.estado_linea[grafo.fuentes] != grafo.estado_linea[grafo.destinos]).astype(np.float64)
+    if grafo.afluencia_max > 0:
+        exposicion = grafo.afluencia[grafo.destinos] / float(grafo.afluencia_max)
+    else:
+        exposicion = np.zeros(grafo.numero_aristas)
+    cerradas = np.isinf(costos)
+    transbordos[cerradas] = math.inf
+    exposicion[cerradas] = math.inf
+    return transbordos, exposicion
+
+
+def _dominada(frente: List[Criterios], t: float, x: int, e: float) -> bool:
+    """Si algún vector de `frente` es menor o igual que (t, x, e) en todo."""
+    for ft, fx, fe in frente:
+        if ft <= t and fx <= x and fe <= e:
+            return True
+    return False
+
+
+def _camino_mas_rapido(grafo: GrafoCompilado, costos: np.ndarray, cota_t: List[float],
+                       inicios: List[int], objetivo: int) -> Optional[List[int]]:
+    """Aristas del camino de menor tiempo, siguiendo el árbol inverso `cota_t`.
+
+    Returns:
+        Aristas en orden, o None si ningún inicio llega al destino
+    """
+    estado = min(inicios, key=lambda s: cota_t[s], default=None)
+    if estado is None or cota_t[estado] == math.inf:
+        return None
+    aristas: List[int] = []
+    while grafo.estado_estacion[estado] != objetivo:
+        if len(aristas) > grafo.numero_estados:
+            return None
+        arista = min(range(grafo.offsets[estado], grafo.offsets[estado + 1]),
+                     key=lambda a: costos[a] + cota_t[grafo.destinos[a]])
+        aristas.append(arista)
+        estado = int(grafo.destinos[arista])
+    return aristas
+
+
+def rutas_pareto(
+        grafo: GrafoCompilado,
+        tablas: TablasCosto,
+        estacion_origen: str,
+        estacion_destino: str,
+        regimen: Regimen,
+        max_etiquetas: int = 8,
+        limite_segundos: Optional[float] = None
+    ) -> RutasPareto:
+    """Calcula el frente de Pareto de rutas entre dos estaciones.
+
+    Args:
+        grafo: Grafo compilado de la red
+        tablas: Tablas de costo de `grafo`
+        estacion_origen: Nombre de la estación de inicio
+        estacion_destino: Nombre de la estación objetivo
+        regimen: Régimen de costo de la consulta (para el tiempo)
+        max_etiquetas: Máximo de etiquetas asentadas por estado
+        limite_segundos: Tiempo máximo de cómputo; al agotarse se devuelven
+            las rutas encontradas hasta ese momento
+
+    Returns:
+        RutasPareto con las rutas encontradas; cada una lleva su
+        `exposicion_afluencia`
+    """
+    invalida = validar_consulta(grafo, estacion_origen, estacion_destino)
+    if invalida is not None:
+        return RutasPareto([invalida])
+
+    limite = math.inf if limite_segundos is None else time.perf_counter() + limite_segundos
+    origen = grafo.indice[estacion_origen]
+    objetivo = grafo.indice[estacion_destino]
+    tabla = tablas.de(regimen)
+    transbordos, exposicion = criterios_de_aristas(grafo, tabla)
+
+    # Cotas inferiores de lo que falta hasta el destino en cada criterio
+    finales = grafo.estados_de(objetivo)
+    cota_t = dijkstra_estados(grafo, tabla, finales, inverso=True).tolist()
+    cota_x = dijkstra_estados(grafo, transbordos, finales, inverso=True).tolist()
+    cota_e = dijkstra_estados(grafo, exposicion, finales, inverso=True).tolist()
+
+    offsets = memoryview(grafo.offsets)
+    destinos = memoryview(grafo.destinos)
+    estado_estacion = memoryview(grafo.estado_estacion)
+    costos = memoryview(tabla)
+    pasos_x = transbordos.tolist()
+    pasos_e = memoryview(exposicion)
+
+    # Etiquetas: tiempo, etiqueta padre y arista con que se llegó (los demás
+    # criterios y el estado viajan en la cola)
+    etiquetas_t: List[float] = []
+    etiquetas_padre: List[int] = []
+    etiquetas_arista: List[int] = []
+    asentadas: List[List[Criterios]] = [[] for _ in range(grafo.numero_estados)]
+    llegadas: List[Tuple[Criterios, int]] = []
+    frente: List[Criterios] = []
+    abiertos: List[tuple] = []
+    completa = True
+    numero_asentadas = 0
+
+    def nueva(t: float, x: int, e: float, estado: int, padre: int, arista: int) -> None:
+        etiquetas_t.append(t)
+        etiquetas_padre.append(padre)
+        etiquetas_arista.append(arista)
+        heapq.heappush(abiertos, (t + cota_t[estado], x, e, len(etiquetas_t) - 1, estado))
+
+    for estado in grafo.estados_de(origen):
+        if grafo.con_ubicacion[estado] and cota_t[estado] < math.inf:
+            nueva(0.0, 0, 0.0, estado, -1, -1)
+
+    while abiertos:
+        if time.perf_counter() > limite:
+            completa = False
+            break
+        _, x, e, etiqueta, u = heapq.heappop(abiertos)
+        t = etiquetas_t[etiqueta]
+        if _dominada(asentadas[u], t, x, e):
+            continue
+        if _dominada(frente, t + cota_t[u], x + cota_x[u], e + cota_e[u]):
+            continue
+        if len(asentadas[u]) >= max_etiquetas:
+            completa = False
+            continue
+        asentadas[u].append((t, x, e))
+        numero_asentadas += 1
+
+        if estado_estacion[u] == objetivo:
+            frente.append((t, x, e))
+            llegadas.append(((t, x, e), etiqueta))
+            continue
+
+        for arista in range(offsets[u], offsets[u + 1]):
+            v = destinos[arista]
+            costo = costos[arista]
+            if costo == math.inf or cota_t[v] == math.inf:
+                continue
+            t_v = t + costo
+            x_v = x + int(pasos_x[arista])
+            e_v = e + pasos_e[arista]
+            if _dominada(asentadas[v], t_v, x_v, e_v):
+                continue
+            if _dominada(frente, t_v + cota_t[v], x_v + cota_x[v], e_v + cota_e[v]):
+                continue
+            nueva(t_v, x_v, e_v, v, etiqueta, arista)
+
+    if not llegadas and not completa:
+        # Se agotó el presupuesto antes de llegar: la ruta más rápida sigue
+        # siendo un punto del frente
+        inicios = [s for s in grafo.estados_de(origen) if grafo.con_ubicacion[s]]
+        aristas = _camino_mas_rapido(grafo, tabla, cota_t, inicios, objetivo)
+        if aristas is not None:
+            resultado = resultado_desde_aristas(grafo, aristas, tabla)
+            resultado.exposicion_afluencia = float(exposicion[aristas].sum())
+            resultado.nodos_expandidos = numero_asentadas
+            return RutasPareto([resultado], completa, numero_asentadas)
+
+    if not llegadas:
+        resultado = sin_ruta(estacion_origen, estacion_destino)
+        resultado.nodos_expandidos = numero_asentadas
+        return RutasPareto([resultado], completa, numero_asentadas)
+
+    rutas = []
+    for (_, _, e), etiqueta in llegadas:
+        aristas: List[int] = []
+        while etiquetas_arista[etiqueta] != -1:
+            aristas.append(etiquetas_arista[etiqueta])
+            etiqueta = etiquetas_padre[etiqueta]
+        aristas.reverse()
+        resultado = resultado_desde_aristas(grafo, aristas, tabla)
+        resultado.exposicion_afluencia = e
+        resultado.nodos_expandidos = numero_asentadas
+        rutas.append(resultado)
+    return RutasPareto(rutas, completa, numero_asentadas)
@@ -0,0 +1,155 @@
+"""Tablas de costo por arista precalculadas para cada régimen.
+
+El costo de `costo_real` solo depende de la franja horaria (semana pico,
+semana valle, fin de semana) y de la velocidad (normal o con lluvia), así que
+hay seis regímenes posibles. Para cada uno se calcula el costo de todas las
+aristas del `GrafoCompilado` de una sola vez con NumPy; la búsqueda elige el
+régimen al inicio de la consulta y lee los pesos por índice.
+"""
+
+import hashlib
+from functools import cached_property
+from typing import Dict, NamedTuple, Optional, Tuple
+from datetime import datetime
+
+import numpy as np
+
+from bin.algoritmo import constantes
+from bin.algoritmo.costo_real import TipoHorario, clasificar_horario, factor_por_horario
+from bin.algoritmo.grafo_compilado import GrafoCompilado
+
+class Regimen(NamedTuple):
+    """Combinación de franja horaria y clima que determina los costos."""
+    horario: TipoHorario
+    lluvia: bool
+
+    @property
+    def clave(self) -> str:
+        return f"{self.horario.value}_lluvia" if self.lluvia else self.horario.value
+
+    @property
+    def velocidad_kmh(self) -> float:
+        return constantes.VELOCIDAD_POR_LLUVIA if self.lluvia else constantes.VELOCIDAD_NORMAL_PROMEDIO
+
+
+REGIMENES: Tuple[Regimen, ...] = tuple(
+    Regimen(horario, lluvia) for lluvia in (False, True) for horario in TipoHorario
+)
+
+
+def regimen_de(dia_viaje: datetime, lluvia: bool) -> Regimen:
+    """Régimen de costo que corresponde a una consulta."""
+    return Regimen(clasificar_horario(dia_viaje), lluvia)
+
+
+def huella_constantes() -> Tuple[float, ...]:
+    """Valores efectivos de las constantes de las que dependen las tablas."""
+    return (
+        constantes.VELOCIDAD_NORMAL_PROMEDIO,
+        constantes.VELOCIDAD_POR_LLUVIA,
+        constantes.VELOCIDAD_CAMINATA_PROMEDIO,
+        *(factor_por_horario(horario) for horario in TipoHorario),
+    )
+
+
+class TablasCosto:
+    """Costo en segundos de cada arista del grafo para cada régimen.
+
+    Attributes:
+        costos: Matriz (n_regimenes, n_aristas) de costos en segundos
+        huella: Constantes con las que se calcularon las tablas
+    """
+
+    def __init__(self, costos: np.ndarray, huella: Tuple[float, ...]):
+        self.costos = costos
+        self.huella = huella
+        self._fila: Dict[Regimen, int] = {regimen: i for i, regimen in enumerate(REGIMENES)}
+
+    def de(self, regimen: Regimen) -> np.ndarray:
+        """Costos de todas las aristas en `regimen`."""
+        return self.costos[self._fila[regimen]]
+
+    @property
+    def nbytes(self) -> int:
+        return self.costos.nbytes
+
+    @cached_property
+    def firma(self) -> str:
+        """Hash del contenido de las tablas; identifica artefactos guardados en disco."""
+        return hashlib.sha256(np.ascontiguousarray(self.costos).tobytes()).hexdigest()
+
+    def vigente(self) -> bool:
+        """Indica si las constantes no han cambiado desde que se calcularon."""
+        return self.huella == huella_constantes()
+
+
+def costos_de_aristas(grafo: GrafoCompilado, aristas: Optional[np.ndarray] = None) -> np.ndarray:
+    """Costo de las aristas indicadas en todos los regímenes, sin considerar cierres.
+
+    Replica `costo_real`: tiempo de viaje (distancia / velocidad) escalado por el
+    factor de afluencia de la estación de origen, más la caminata de transbordo.
+
+    Args:
+        grafo: Grafo compilado de la red
+        aristas: Índices de las aristas a calcular (None = todas)
+
+    Returns:
+        Matriz (n_regimenes, len(aristas)) de costos en segundos
+    """
+    seleccion = slice(None) if aristas is None else aristas
+    distancias = grafo.distancias[seleccion]
+    proporcion_afluencia = grafo.afluencia_aristas[seleccion] / grafo.afluencia_max
+    tiempo_caminata = grafo.transbordo_km[seleccion] * (3600.0 / constantes.VELOCIDAD_CAMINATA_PROMEDIO)
+
+    costos = np.empty((len(REGIMENES), len(distancias)), dtype=np.float64)
+    for i, regimen in enumerate(REGIMENES):
+        tiempo_viaje = distancias * (3600.0 / regimen.velocidad_kmh)
+        factor_afluencia = 1.0 + proporcion_afluencia * factor_por_horario(regimen.horario)
+        costos[i] = tiempo_viaje * factor_afluencia + tiempo_caminata
+    return costos
+
+
+def construir_tablas(grafo: GrafoCompilado, cerradas: Optional[np.ndarray] = None) -> TablasCosto:
+    """Calcula las tablas de costo de todos los regímenes.
+
+    Las aristas cerradas cuestan infinito: como `g + inf` nunca mejora a un
+    estado, las búsquedas las descartan sin encolar nada (igual que
+    `costo_real`, que devuelve None para una estación cerrada).
+
+    Args:
+        grafo: Grafo compilado de la red
+        cerradas: Máscara de aristas cerradas; por defecto, las que entran a
+            una estación con `abierta` en falso
+
+    Returns:
+        TablasCosto con una fila por régimen de `REGIMENES`
+    """
+    huella = huella_constantes()
+    if cerradas is None:
+        cerradas = grafo.mascara_cierres()
+    costos = costos_de_aristas(grafo)
+    costos[:, cerradas] = np.inf
+    return TablasCosto(costos, huella)
+
+
+def actualizar_tablas(tablas: TablasCosto, grafo: GrafoCompilado,
+                      cerradas_antes: np.ndarray, cerradas: np.ndarray) -> TablasCosto:
+    """Tablas nuevas que solo recalculan las aristas cuyo cierre cambió.
+
+    Args:
+        tablas: Tablas vigentes, calculadas con `cerradas_antes`
+        grafo: Grafo compilado de la red
+        cerradas_antes: Máscara de aristas cerradas de `tablas`
+        cerradas: Máscara de aristas cerradas de las tablas nuevas
+
+    Returns:
+        TablasCosto nuevas; `tablas` no se modifica
+    """
+    if not tablas.vigente():
+        return construir_tablas(grafo, cerradas)
+    costos = tablas.costos.copy()
+    costos[:, cerradas & ~cerradas_antes] = np.inf
+    reabiertas = np.flatnonzero(cerradas_antes & ~cerradas)
+    if len(reabiertas):
+        costos[:, reabiertas] = costos_de_aristas(grafo, reabiertas)
+    return TablasCosto(costos, tablas.huella)
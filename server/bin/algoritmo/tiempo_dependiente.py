@@ -0,0 +1,210 @@
+"""Búsqueda dependiente del tiempo: la franja horaria se evalúa al llegar a cada arista.
+
+En los demás modos el régimen se fija con la hora de salida, así que un viaje
+que sale a las 6:50 y llega al centro a las 7:20 se cobra completo como hora
+valle. Aquí el costo de cada arista se toma de la franja vigente en el momento
+en que se llega a su estación de origen (salida + `g`).
+
+La franja horaria es constante por tramos a lo largo de la semana
+(`CalendarioRegimenes`), igual para todas las aristas: el costo de una arista
+en función del tiempo es su columna de las tablas de costo indexada por el
+tramo del calendario, que se localiza con búsqueda binaria una vez por estado
+expandido.
+
+FIFO: con costos constantes por tramos, salir justo después de que termina la
+hora pico puede llegar antes que salir justo antes. Para que llegar más tarde
+a un estado nunca permita llegar antes a los siguientes (condición necesaria
+para que A* con conjunto cerrado sea correcto), el tiempo de llegada de una
+arista es el mínimo entre tomarla ahora y tomarla al inicio de cualquier
+cambio de franja que ocurra antes de esa llegada.
+"""
+
+import heapq
+import math
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from models.resultado_ruta import ResultadoRuta
+from bin.algoritmo.costo_real import TipoHorario, clasificar_horario, factor_por_horario
+from bin.algoritmo.grafo_compilado import GrafoCompilado
+from bin.algoritmo.heuristica import heuristica
+from bin.algoritmo.tablas_costo import TablasCosto, Regimen
+from bin.algoritmo.landmarks import Landmarks
+from bin.algoritmo.a_estrella_compilado import resultado_desde_aristas, validar_consulta, sin_ruta
+
+SEGUNDOS_SEMANA = 7 * 24 * 3600.0
+
+
+def segundos_de_semana(momento: datetime) -> float:
+    """Segundos transcurridos desde el lunes a las 00:00 de la semana de `momento`."""
+    return (momento.weekday() * 86400.0 + momento.hour * 3600.0 + momento.minute * 60.0
+            + momento.second + momento.microsecond / 1e6)
+
+
+class CalendarioRegimenes:
+    """Franja horaria vigente a lo largo de la semana, constante por tramos.
+
+    Attributes:
+        inicios: Segundo de la semana en que empieza cada tramo (el primero es 0)
+        horarios: Franja horaria de cada tramo
+    """
+
+    def __init__(self, inicios: List[float], horarios: List[TipoHorario]):
+        self.inicios = inicios
+        self.horarios = horarios
+
+    def __len__(self) -> int:
+        return len(self.inicios)
+
+    def tramo(self, t: float) -> int:
+        """Índice del tramo vigente en el segundo `t` (puede exceder una semana)."""
+        return bisect_right(self.inicios, t % SEGUNDOS_SEMANA) - 1
+
+    def siguiente_cambio(self, t: float) -> float:
+        """Primer inicio de tramo estrictamente posterior a `t`, en la misma escala que `t`."""
+        semana = math.floor(t / SEGUNDOS_SEMANA) * SEGUNDOS_SEMANA
+        i = self.tramo(t) + 1
+        if i < len(self.inicios):
+            return semana + self.inicios[i]
+        return semana + SEGUNDOS_SEMANA
+
+
+def construir_calendario() -> CalendarioRegimenes:
+    """Deriva el calendario semanal de `clasificar_horario`, hora por hora."""
+    lunes = datetime(2024, 1, 1)  # Un lunes cualquiera
+    inicios: List[float] = []
+    horarios: List[TipoHorario] = []
+    for hora in range(7 * 24):
+        horario = clasificar_horario(lunes + timedelta(hours=hora))
+        if not horarios or horarios[-1] != horario:
+            inicios.append(hora * 3600.0)
+            horarios.append(horario)
+    return CalendarioRegimenes(inicios, horarios)
+
+
+CALENDARIO = construir_calendario()
+
+
+def a_estrella_dependiente(
+        grafo: GrafoCompilado,
+        tablas: TablasCosto,
+        estacion_origen: str,
+        estacion_destino: str,
+        salida: datetime,
+        lluvia: bool,
+        landmarks: Optional[Landmarks] = None,
+        calendario: CalendarioRegimenes = CALENDARIO
+    ) -> ResultadoRuta:
+    """A* en el que el costo de cada arista depende de la hora de llegada.
+
+    Args:
+        grafo: Grafo compilado de la red
+        tablas: Tablas de costo de `grafo`
+        estacion_origen: Nombre de la estación de inicio
+        estacion_destino: Nombre de la estación objetivo
+        salida: Fecha y hora de salida
+        lluvia: Si llueve (fija la velocidad durante todo el viaje)
+        landmarks: Si se indican, se usa ALT con las cotas de la franja de
+            menor factor de afluencia, que es la más barata para todas las
+            aristas y por eso acota el costo en cualquier momento
+        calendario: Franjas horarias de la semana
+
+    Returns:
+        ResultadoRuta con la ruta encontrada; el costo de cada paso es el de
+        la franja en que se toma
+    """
+    invalida = validar_consulta(grafo, estacion_origen, estacion_destino)
+    if invalida is not None:
+        return invalida
+
+    origen = grafo.indice[estacion_origen]
+    objetivo = grafo.indice[estacion_destino]
+    t0 = segundos_de_semana(salida)
+    # Régimen más barato del calendario: cota inferior del costo de cada arista
+    regimen_minimo = Regimen(min(calendario.horarios, key=factor_por_horario), lluvia)
+    velocidad_metro_kmh = regimen_minimo.velocidad_kmh
+    coord_destino = (float(grafo.estacion_latitud[objetivo]), float(grafo.estacion_longitud[objetivo]))
+
+    offsets = memoryview(grafo.offsets)
+    destinos = memoryview(grafo.destinos)
+    estado_estacion = memoryview(grafo.estado_estacion)
+    latitudes = memoryview(grafo.latitudes)
+    longitudes = memoryview(grafo.longitudes)
+    # Costos de cada tramo del calendario
+    por_tramo = [memoryview(tablas.de(Regimen(horario, lluvia))) for horario in calendario.horarios]
+
+    n = grafo.numero_estados
+    g = [math.inf] * n
+    padre = [-1] * n
+    costo_padre = [0.0] * n
+    cerrado = bytearray(n)
+    abiertos: List[Tuple[float, int]] = []
+    expandidos = 0
+
+    if landmarks is not None:
+        h_cache = landmarks.cotas(regimen_minimo, grafo.estados_de(objetivo)).tolist()
+    else:
+        h_cache = [None] * n
+
+    for estado in grafo.estados_de(origen):
+        if grafo.con_ubicacion[estado]:
+            h = h_cache[estado]
+            if h is None:
+                h = h_cache[estado] = heuristica(
+                    (latitudes[estado], longitudes[estado]), coord_destino, velocidad_metro_kmh)
+            g[estado] = 0.0
+            heapq.heappush(abiertos, (h, estado))
+
+    while abiertos:
+        _, u = heapq.heappop(abiertos)
+        if cerrado[u]:
+            continue
+        if estado_estacion[u] == objetivo:
+            aristas: List[int] = []
+            costos_ruta: Dict[int, float] = {}
+            estado = u
+            while padre[estado] != -1:
+                arista = padre[estado]
+                aristas.append(arista)
+                costos_ruta[arista] = costo_padre[estado]
+                estado = int(grafo.fuentes[arista])
+            aristas.reverse()
+            resultado = resultado_desde_aristas(grafo, aristas, costos_ruta)
+            resultado.nodos_expandidos = expandidos
+            return resultado
+        cerrado[u] = 1
+        expandidos += 1
+
+        g_u = g[u]
+        t_u = t0 + g_u
+        costos = por_tramo[calendario.tramo(t_u)]
+        cambio = calendario.siguiente_cambio(t_u)
+        for arista in range(offsets[u], offsets[u + 1]):
+            v = destinos[arista]
+            if cerrado[v]:
+                continue
+            costo = costos[arista]
+            if costo == math.inf:
+                continue  # Arista cerrada: lo está en todas las franjas
+            llegada = t_u + costo
+            # FIFO: esperar a que cambie la franja nunca debe llegar antes
+            siguiente = cambio
+            while siguiente < llegada:
+                llegada = min(llegada, siguiente + por_tramo[calendario.tramo(siguiente)][arista])
+                siguiente = calendario.siguiente_cambio(siguiente)
+            costo = llegada - t_u
+            g_v = g_u + costo
+            if g_v < g[v]:
+                g[v] = g_v
+                padre[v] = arista
+                costo_padre[v] = costo
+                h = h_cache[v]
+                if h is None:
+                    h = h_cache[v] = heuristica(
+                        (latitudes[v], longitudes[v]), coord_destino, velocidad_metro_kmh)
+                heapq.heappush(abiertos, (g_v + h, v))
+
+    resultado = sin_ruta(estacion_origen, estacion_destino)
+    resultado.nodos_expandidos = expandidos
+    return resultado
@@ -0,0 +1,151 @@
+"""Matrices de rutas entre todos los pares de estados.
+
+Con unos cuantos cientos de estados (estación, línea) y seis regímenes de
+costo, todos los caminos mínimos caben en memoria. Para cada régimen se
+calcula con Floyd-Warshall (vectorizado con NumPy) la matriz de tiempos, la de
+distancias y la matriz de siguiente arista, de modo que una consulta se
+responde con una búsqueda en tabla y la ruta se reconstruye siguiendo la
+siguiente arista hasta llegar al destino.
+"""
+
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+from models.resultado_ruta import ResultadoRuta
+from bin.algoritmo.grafo_compilado import GrafoCompilado
+from bin.algoritmo.tablas_costo import TablasCosto, Regimen, REGIMENES
+from bin.algoritmo.a_estrella_compilado import resultado_desde_aristas, validar_consulta, sin_ruta
+
+
+class MatricesRutas:
+    """Caminos mínimos entre todos los pares de estados, por régimen.
+
+    Attributes:
+        tiempos: Matriz (n_regimenes, n_estados, n_estados) de costos en segundos
+        distancias: Distancia en km del camino de menor costo de cada par
+        siguiente: Primera arista del camino de menor costo (-1 si no hay camino)
+        huella: Constantes de las tablas de costo usadas
+    """
+
+    def __init__(self, tiempos: np.ndarray, distancias: np.ndarray,
+                 siguiente: np.ndarray, huella: Tuple[float, ...]):
+        self.tiempos = tiempos
+        self.distancias = distancias
+        self.siguiente = siguiente
+        self.huella = huella
+        self._fila = {regimen: i for i, regimen in enumerate(REGIMENES)}
+
+    @property
+    def nbytes(self) -> int:
+        return self.tiempos.nbytes + self.distancias.nbytes + self.siguiente.nbytes
+
+    def indice_regimen(self, regimen: Regimen) -> int:
+        return self._fila[regimen]
+
+
+def _floyd_warshall(grafo: GrafoCompilado, costos: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Floyd-Warshall sobre el grafo de estados para un vector de costos."""
+    n = grafo.numero_estados
+    tiempos = np.full((n, n), np.inf)
+    distancias = np.full((n, n), np.inf)
+    siguiente = np.full((n, n), -1, dtype=np.int32)
+    np.fill_diagonal(tiempos, 0.0)
+    np.fill_diagonal(distancias, 0.0)
+
+    for arista in range(grafo.numero_aristas):
+        u = grafo.fuentes[arista]
+        v = grafo.destinos[arista]
+        if u != v and costos[arista] < tiempos[u, v]:
+            tiempos[u, v] = costos[arista]
+            distancias[u, v] = grafo.distancias[arista]
+            siguiente[u, v] = arista
+
+    for k in range(n):
+        candidato = tiempos[:, k:k + 1] + tiempos[k:k + 1, :]
+        mejora = candidato < tiempos
+        np.copyto(tiempos, candidato, where=mejora)
+        np.copyto(distancias, distancias[:, k:k + 1] + distancias[k:k + 1, :], where=mejora)
+        np.copyto(siguiente, siguiente[:, k:k + 1], where=mejora)
+
+    return tiempos, distancias, siguiente
+
+
+def construir_matrices(grafo: GrafoCompilado, tablas: TablasCosto) -> MatricesRutas:
+    """Calcula las matrices de todos los pares para cada régimen.
+
+    Args:
+        grafo: Grafo compilado de la red
+        tablas: Tablas de costo de `grafo`
+
+    Returns:
+        MatricesRutas con una capa por régimen de `REGIMENES`
+    """
+    n = grafo.numero_estados
+    tiempos = np.empty((len(REGIMENES), n, n))
+    distancias = np.empty((len(REGIMENES), n, n))
+    siguiente = np.empty((len(REGIMENES), n, n), dtype=np.int32)
+
+    for i, regimen in enumerate(REGIMENES):
+        tiempos[i], distancias[i], siguiente[i] = _floyd_warshall(grafo, tablas.de(regimen))
+
+    return MatricesRutas(tiempos, distancias, siguiente, tablas.huella)
+
+
+def ruta_desde_matrices(
+        grafo: GrafoCompilado,
+        tablas: TablasCosto,
+        matrices: MatricesRutas,
+        estacion_origen: str,
+        estacion_destino: str,
+        regimen: Regimen
+    ) -> ResultadoRuta:
+    """Responde una consulta con las matrices precalculadas.
+
+    El mejor par (estado de origen, estado de destino) se elige entre las
+    líneas de ambas estaciones y la ruta se reconstruye siguiendo la matriz
+    de siguiente arista, sin ejecutar ninguna búsqueda.
+
+    Args:
+        grafo: Grafo compilado de la red
+        tablas: Tablas de costo usadas para construir `matrices`
+        matrices: Matrices de todos los pares
+        estacion_origen: Nombre de la estación de inicio
+        estacion_destino: Nombre de la estación objetivo
+        regimen: Régimen de costo de la consulta
+
+    Returns:
+        ResultadoRuta con la ruta óptima o mensaje de error
+    """
+    invalida = validar_consulta(grafo, estacion_origen, estacion_destino)
+    if invalida is not None:
+        return invalida
+
+    capa = matrices.indice_regimen(regimen)
+    tiempos = matrices.tiempos[capa]
+    siguiente = matrices.siguiente[capa]
+
+    # Igual que en A*, solo se parte de las líneas con ubicación propia
+    inicios = [e for e in grafo.estados_de(grafo.indice[estacion_origen]) if grafo.con_ubicacion[e]]
+    finales = grafo.estados_de(grafo.indice[estacion_destino])
+
+    mejor = math.inf
+    par = None
+    for i in inicios:
+        for j in finales:
+            if tiempos[i, j] < mejor:
+                mejor = tiempos[i, j]
+                par = (i, j)
+
+    if par is None:
+        return sin_ruta(estacion_origen, estacion_destino)
+
+    estado, final = par
+    aristas: List[int] = []
+    while estado != final:
+        arista = int(siguiente[estado, final])
+        aristas.append(arista)
+        estado = int(grafo.destinos[arista])
+
+    return resultado_desde_aristas(grafo, aristas, tablas.de(regimen))
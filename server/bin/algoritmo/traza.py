@@ -0,0 +1,161 @@
+"""Instrumentación opcional de las búsquedas.
+
+Los motores reciben `traza=None` por defecto y en ese caso usan las primitivas
+de siempre (`heapq`, el conjunto cerrado, la función de costo y la
+heurística) sin ninguna comprobación extra en el bucle. Con una `Traza`, esas
+mismas primitivas se sustituyen por envolturas que cuentan y cronometran, así
+que el bucle es idéntico en ambos casos y la instrumentación solo cuesta
+cuando se pide.
+
+Con `Traza(contadores=False)` solo se cronometra la reconstrucción de la
+ruta, una llamada por consulta: es lo que usan las métricas de la API en cada
+petición.
+
+Los contadores que se pueden deducir al terminar no se llevan en el bucle:
+las extracciones obsoletas son las que no expandieron ni alcanzaron el
+destino, y los descartes por conjunto cerrado son las consultas positivas al
+conjunto que no fueron extracciones obsoletas.
+"""
+
+import heapq
+import time
+from typing import Any, Callable, Dict, Tuple
+
+
+class Traza:
+    """Contadores y tiempos de una búsqueda.
+
+    Attributes:
+        expandidos: Estados expandidos
+        inserciones: Inserciones en la cola de prioridad
+        extracciones: Extracciones de la cola de prioridad
+        extracciones_obsoletas: Extracciones de estados ya cerrados
+        cerrados_descartados: Vecinos descartados por estar ya cerrados
+        frontera_max: Tamaño máximo de la cola de prioridad
+        segundos_costo: Tiempo calculando costos de aristas
+        segundos_heuristica: Tiempo calculando la heurística
+        segundos_reconstruccion: Tiempo reconstruyendo la ruta
+        segundos_total: Tiempo total de la consulta
+        contadores: Si se instrumenta el bucle de búsqueda; si es False solo
+            se miden la reconstrucción, el total y los nodos expandidos
+    """
+
+    __slots__ = (
+        "expandidos", "inserciones", "extracciones", "extracciones_obsoletas",
+        "cerrados_descartados", "frontera_max", "segundos_costo", "segundos_heuristica",
+        "segundos_reconstruccion", "segundos_total", "contadores", "_consultas_cerrado",
+    )
+
+    def __init__(self, contadores: bool = True):
+        self.contadores = contadores
+        self.expandidos = 0
+        self.inserciones = 0
+        self.extracciones = 0
+        self.extracciones_obsoletas = 0
+        self.cerrados_descartados = 0
+        self.frontera_max = 0
+        self.segundos_costo = 0.0
+        self.segundos_heuristica = 0.0
+        self.segundos_reconstruccion = 0.0
+        self.segundos_total = 0.0
+        self._consultas_cerrado = 0
+
+    def heap(self) -> Tuple[Callable[[list, Any], None], Callable[[list], Any]]:
+        """`heappush` y `heappop` que cuentan y registran el tamaño de la frontera."""
+        def insertar(cola: list, elemento: Any) -> None:
+            heapq.heappush(cola, elemento)
+            self.inserciones += 1
+            if len(cola) > self.frontera_max:
+                self.frontera_max = len(cola)
+
+        def extraer(cola: list) -> Any:
+            self.extracciones += 1
+            return heapq.heappop(cola)
+
+        return insertar, extraer
+
+    def cronometrada(self, funcion: Callable, campo: str) -> Callable:
+        """Envuelve `funcion` para acumular su tiempo en el atributo `campo`."""
+        reloj = time.perf_counter
+
+        def envoltura(*args, **kwargs):
+            inicio = reloj()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                setattr(self, campo, getattr(self, campo) + reloj() - inicio)
+
+        return envoltura
+
+    def cerrado_estados(self, n: int) -> bytearray:
+        """Conjunto cerrado por estado (bytearray) que cuenta las consultas positivas."""
+        return _BytearrayContado(self, n)
+
+    def cerrado_conjunto(self) -> set:
+        """Conjunto cerrado (set) que cuenta las consultas positivas."""
+        return _ConjuntoContado(self)
+
+    def finalizar(self, expandidos: int, encontrado: bool) -> None:
+        """Deduce los contadores que no se llevan en el bucle.
+
+        Args:
+            expandidos: Estados expandidos por la búsqueda
+            encontrado: Si la última extracción alcanzó el destino
+        """
+        self.expandidos = expandidos
+        if not self.contadores:
+            return
+        self.extracciones_obsoletas = self.extracciones - expandidos - int(encontrado)
+        self.cerrados_descartados = self._consultas_cerrado - self.extracciones_obsoletas
+
+    def a_dict(self) -> Dict[str, float]:
+        """Contadores y tiempos (en milisegundos) para la respuesta de la API."""
+        return {
+            "expandidos": self.expandidos,
+            "inserciones": self.inserciones,
+            "extracciones": self.extracciones,
+            "extracciones_obsoletas": self.extracciones_obsoletas,
+            "cerrados_descartados": self.cerrados_descartados,
+            "frontera_max": self.frontera_max,
+            "costo_ms": self.segundos_costo * 1000.0,
+            "heuristica_ms": self.segundos_heuristica * 1000.0,
+            "reconstruccion_ms": self.segundos_reconstruccion * 1000.0,
+            "total_ms": self.segundos_total * 1000.0,
+        }
+
+    def server_timing(self) -> str:
+        """Valor de la cabecera `Server-Timing` con los tiempos y contadores."""
+        metricas = [
+            f"busqueda;dur={self.segundos_total * 1000.0:.3f}",
+            f"costo;dur={self.segundos_costo * 1000.0:.3f}",
+            f"heuristica;dur={self.segundos_heuristica * 1000.0:.3f}",
+            f"reconstruccion;dur={self.segundos_reconstruccion * 1000.0:.3f}",
+        ]
+        for nombre in ("expandidos", "inserciones", "extracciones_obsoletas",
+                       "cerrados_descartados", "frontera_max"):
+            metricas.append(f'{nombre};desc="{getattr(self, nombre)}"')
+        return ", ".join(metricas)
+
+
+class _BytearrayContado(bytearray):
+    def __init__(self, traza: Traza, n: int):
+        super().__init__(n)
+        self.traza = traza
+
+    def __getitem__(self, indice):
+        valor = bytearray.__getitem__(self, indice)
+        if valor:
+            self.traza._consultas_cerrado += 1
+        return valor
+
+
+class _ConjuntoContado(set):
+    def __init__(self, traza: Traza):
+        super().__init__()
+        self.traza = traza
+
+    def __contains__(self, elemento) -> bool:
+        if set.__contains__(self, elemento):
+            self.traza._consultas_cerrado += 1
+            return True
+        return False
@@ -0,0 +1,5 @@
+# Red del metro compartida entre peticiones
+from .snapshot import RedSnapshot, Tramo, construir_snapshot, cargar_snapshot
+from .gestor import GestorRed
+
+__all__ = ["RedSnapshot", "Tramo", "construir_snapshot", "cargar_snapshot", "GestorRed"]
@@ -0,0 +1,198 @@
+"""Caché LRU/TTL de rutas ya serializadas.
+
+La mayor parte del tráfico se concentra en unos cuantos cientos de pares
+origen/destino. El resultado solo depende de los datos de la red, de los
+cierres vigentes, del par, del régimen de costo y del motor y heurística
+usados, así que la clave normaliza `dia_viaje` al régimen: dos consultas en la
+misma franja horaria comparten entrada sin importar la hora exacta. La
+excepción es el modo dependiente del tiempo, cuyo resultado cambia con la hora
+de salida (`ClaveRuta.salida`).
+
+Los cierres no forman parte de la clave. Cada entrada recuerda qué estaciones
+y tramos recorre y con qué cierres se calculó, y al publicarse una instantánea
+con otros cierres (`actualizar`) solo se descartan las entradas afectadas:
+
+* al cerrar una estación o tramo, las rutas que pasan por él;
+* al reabrirlo, las rutas calculadas mientras estaba cerrado (podría haber
+  ahora un camino mejor a través de él).
+
+Una ruta que no toca lo que se cerró sigue siendo la mejor, porque cerrar solo
+encarece los demás caminos.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, NamedTuple, Optional, Set, Tuple
+
+from bin.algoritmo.tablas_costo import Regimen
+from bin.red.snapshot import RedSnapshot, Tramo
+
+
+class ClaveRuta(NamedTuple):
+    """Consulta a la que corresponde una ruta calculada."""
+    version_datos: int
+    origen: str
+    destino: str
+    regimen: Regimen
+    modo: str
+    heuristica: str
+    salida: Optional[datetime] = None  # Solo en el modo dependiente del tiempo
+
+
+class DependenciasRuta(NamedTuple):
+    """Lo que una ruta guardada usa de la red y los cierres con que se calculó."""
+    estaciones: FrozenSet[str]
+    tramos: FrozenSet[Tramo]
+    cerradas: FrozenSet[str] = frozenset()
+    tramos_cerrados: FrozenSet[Tramo] = frozenset()
+
+
+class CacheRutas:
+    """Caché acotado de payloads de rutas con expiración y contadores.
+
+    Attributes:
+        capacidad: Número máximo de entradas
+        ttl_segundos: Vida de cada entrada (None = sin expiración)
+    """
+
+    def __init__(self, capacidad: int = 1024, ttl_segundos: Optional[float] = None,
+                 reloj: Callable[[], float] = time.monotonic):
+        if capacidad <= 0:
+            raise ValueError("La capacidad del caché debe ser positiva")
+        self.capacidad = capacidad
+        self.ttl_segundos = ttl_segundos
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[ClaveRuta, tuple]" = OrderedDict()
+        # Índices para invalidar por estación recorrida y por cierre vigente
+        self._por_estacion: Dict[str, Set[ClaveRuta]] = {}
+        self._por_cierre: Dict[object, Set[ClaveRuta]] = {}
+        # (version_datos, cerradas, tramos_cerrados) de la última instantánea vista
+        self._estado: Optional[Tuple[int, FrozenSet[str], FrozenSet[Tramo]]] = None
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self.expiradas = 0
+        self.invalidaciones = 0
+        self.invalidaciones_parciales = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def obtener(self, clave: ClaveRuta) -> Optional[Dict[str, Any]]:
+        """Retorna el payload guardado para `clave` o None si no está o expiró."""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            payload, expira, _ = entrada
+            if expira is not None and self._reloj() >= expira:
+                self._quitar(clave)
+                self.expiradas += 1
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return payload
+
+    def guardar(self, clave: ClaveRuta, payload: Dict[str, Any],
+                dependencias: DependenciasRuta) -> None:
+        """Guarda `payload`, expulsando la entrada menos usada si hace falta.
+
+        Args:
+            clave: Consulta
+            payload: Ruta serializada
+            dependencias: Estaciones y tramos de la ruta y cierres con que se
+                calculó. Si los cierres ya no son los vigentes (la red cambió
+                mientras se calculaba) la entrada no se guarda
+        """
+        expira = self._reloj() + self.ttl_segundos if self.ttl_segundos is not None else None
+        with self._lock:
+            if self._estado is not None and (
+                    (clave.version_datos, dependencias.cerradas, dependencias.tramos_cerrados)
+                    != self._estado):
+                return
+            if clave in self._entradas:
+                self._quitar(clave)
+            self._entradas[clave] = (payload, expira, dependencias)
+            for estacion in dependencias.estaciones:
+                self._por_estacion.setdefault(estacion, set()).add(clave)
+            for cierre in dependencias.cerradas | dependencias.tramos_cerrados:
+                self._por_cierre.setdefault(cierre, set()).add(clave)
+            while len(self._entradas) > self.capacidad:
+                self._quitar(next(iter(self._entradas)))
+                self.expulsiones += 1
+
+    def _quitar(self, clave: ClaveRuta) -> None:
+        """Elimina una entrada y sus referencias en los índices (con el candado tomado)."""
+        _, _, dependencias = self._entradas.pop(clave)
+        for indice, llaves in ((self._por_estacion, dependencias.estaciones),
+                               (self._por_cierre, dependencias.cerradas | dependencias.tramos_cerrados)):
+            for llave in llaves:
+                claves = indice.get(llave)
+                if claves is not None:
+                    claves.discard(clave)
+                    if not claves:
+                        del indice[llave]
+
+    def invalidar(self, *_: Any) -> None:
+        """Vacía el caché. Acepta argumentos para usarse como suscriptor del gestor."""
+        with self._lock:
+            self._entradas.clear()
+            self._por_estacion.clear()
+            self._por_cierre.clear()
+            self.invalidaciones += 1
+
+    def actualizar(self, red: RedSnapshot) -> None:
+        """Adapta el caché a una instantánea recién publicada.
+
+        Si cambiaron los datos de la red se vacía; si solo cambiaron los
+        cierres se descartan únicamente las entradas afectadas.
+        """
+        estado = (red.version_datos, red.cerradas, red.tramos_cerrados)
+        with self._lock:
+            anterior, self._estado = self._estado, estado
+        if anterior is None or anterior[0] != estado[0]:
+            self.invalidar()
+            return
+        if anterior == estado:
+            return
+
+        _, cerradas_antes, tramos_antes = anterior
+        _, cerradas, tramos = estado
+        with self._lock:
+            afectadas: Set[ClaveRuta] = set()
+            for estacion in cerradas - cerradas_antes:
+                afectadas |= self._por_estacion.get(estacion, set())
+            for tramo in tramos - tramos_antes:
+                afectadas |= {
+                    clave for clave in self._por_estacion.get(tramo.estacion_a, set())
+                    if tramo in self._entradas[clave][2].tramos
+                }
+            for cierre in (cerradas_antes - cerradas) | (tramos_antes - tramos):
+                afectadas |= self._por_cierre.get(cierre, set())
+            for clave in afectadas:
+                self._quitar(clave)
+            self.invalidaciones_parciales += len(afectadas)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Contadores del caché."""
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "capacidad": self.capacidad,
+                "ttl_segundos": self.ttl_segundos,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+                "expulsiones": self.expulsiones,
+                "expiradas": self.expiradas,
+                "invalidaciones": self.invalidaciones,
+                "invalidaciones_parciales": self.invalidaciones_parciales,
+            }
@@ -0,0 +1,361 @@
+"""Ejecución de búsquedas fuera del bucle de eventos.
+
+La búsqueda es CPU pura: en el pool de hilos de Starlette las peticiones
+simultáneas se serializan en el GIL. `EjecutorBusquedas` las ejecuta en un
+pool de procesos y además:
+
+* une las consultas idénticas en curso (mismo par, régimen, motor y misma
+  instantánea, es decir, mismos datos y cierres) en un solo cálculo cuyo
+  resultado comparten todas las peticiones que lo esperan;
+* limita las búsquedas pendientes; pasado el límite rechaza las nuevas con
+  `EjecutorSaturado` en lugar de dejar crecer la cola;
+* si un proceso del pool muere (el pool queda inutilizable), reemplaza el
+  pool por uno nuevo y responde las consultas afectadas con
+  `EjecutorNoDisponible`.
+
+Cada proceso carga la red del mismo archivo de datos que el gestor (con el
+formato binario, las páginas se comparten entre procesos) y deriva los cierres
+de la instantánea con que se hizo cada consulta. Con varias redes (ver
+`bin.red.registro`) cada proceso carga las otras al recibir su primera
+consulta y conserva las `max_redes` usadas más recientemente además de la
+inicial, descartando antes las menos usadas si la memoria de sus redes (con
+las matrices o la jerarquía que construyan sus consultas, ver
+`RedSnapshot.nbytes`) pasa de `memoria_max_bytes`. Con `procesos=0` las búsquedas se ejecutan en el pool de hilos por
+defecto del bucle de eventos, con la misma unión de consultas y el mismo límite.
+"""
+
+import asyncio
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+from models.schemas import ModoBusqueda, TipoHeuristica
+from bin.algoritmo.tablas_costo import Regimen
+from bin.algoritmo.traza import Traza
+from bin.red.cache_rutas import DependenciasRuta
+from bin.red.rutas import calcular_ruta, dependencias_ruta, payload_ruta
+from bin.red.snapshot import RedSnapshot, Tramo, cargar_snapshot
+
+
+class ConsultaRuta(NamedTuple):
+    """Consulta de ruta que se envía al ejecutor."""
+    estacion_origen: str
+    estacion_destino: str
+    regimen: Regimen
+    modo: ModoBusqueda
+    heuristica: TipoHeuristica
+    salida: Optional[datetime] = None
+    traza: bool = False
+
+
+class ResultadoBusqueda(NamedTuple):
+    """Resultado de una consulta, ya convertido al payload de la API.
+
+    Attributes:
+        payload: Payload `ResultadoRutaParsed`, o None si no hay ruta
+        error: Mensaje si no se encontró ruta
+        dependencias: Lo que la ruta usa de la red, para el caché
+        segundos_busqueda: Tiempo de búsqueda sin la reconstrucción
+        segundos_reconstruccion: Tiempo reconstruyendo la ruta
+        segundos_serializacion: Tiempo construyendo el payload
+        traza: Contadores y tiempos de la búsqueda, si la consulta los pidió
+        server_timing: Cabecera `Server-Timing`, si la consulta pidió traza
+    """
+    payload: Optional[Dict[str, Any]]
+    error: Optional[str]
+    dependencias: Optional[DependenciasRuta]
+    segundos_busqueda: float
+    segundos_reconstruccion: float
+    segundos_serializacion: float
+    traza: Optional[Dict[str, float]] = None
+    server_timing: Optional[str] = None
+
+
+class EjecutorSaturado(RuntimeError):
+    """Hay demasiadas búsquedas pendientes para aceptar otra."""
+
+
+class EjecutorNoDisponible(RuntimeError):
+    """El pool de procesos se rompió durante la búsqueda; ya se reemplazó por uno nuevo."""
+
+
+def resolver_consulta(red: RedSnapshot, consulta: ConsultaRuta) -> ResultadoBusqueda:
+    """Calcula la ruta de `consulta` en `red` y la convierte al payload de la API.
+
+    Raises:
+        ValueError: Si el modo es dependiente del tiempo y no se indica `salida`
+    """
+    # Sin traza pedida solo se cronometra la reconstrucción (una llamada)
+    medicion = Traza(contadores=consulta.traza)
+    resultado = calcular_ruta(red, consulta.estacion_origen, consulta.estacion_destino, consulta.regimen,
+                              consulta.modo, consulta.heuristica, consulta.salida, traza=medicion)
+    payload = dependencias = None
+    segundos_serializacion = 0.0
+    if resultado.exito:
+        inicio = time.perf_counter()
+        payload = payload_ruta(resultado)
+        segundos_serializacion = time.perf_counter() - inicio
+        dependencias = dependencias_ruta(red, resultado)
+    return ResultadoBusqueda(
+        payload=payload,
+        error=None if resultado.exito else resultado.mensaje,
+        dependencias=dependencias,
+        segundos_busqueda=medicion.segundos_total - medicion.segundos_reconstruccion,
+        segundos_reconstruccion=medicion.segundos_reconstruccion,
+        segundos_serializacion=segundos_serializacion,
+        traza=medicion.a_dict() if consulta.traza else None,
+        server_timing=medicion.server_timing() if consulta.traza else None,
+    )
+
+
+# Estado de cada proceso del pool, por archivo de datos: la red del archivo y
+# la derivada con los cierres de la última consulta. La red inicial se prepara
+# como la del gestor y no se descarta; las demás, en orden de uso
+_redes_proceso: "OrderedDict[Path, Tuple[RedSnapshot, RedSnapshot]]" = OrderedDict()
+_origen_proceso: Optional[Path] = None
+_max_redes_proceso = 1
+_memoria_max_proceso: Optional[int] = None
+_preparar_proceso: Dict[str, bool] = {}
+
+
+def _inicializar_proceso(origen: Path, version_datos: int, matrices: bool, jerarquia: bool,
+                         max_redes: int, memoria_max_bytes: Optional[int]) -> None:
+    global _origen_proceso, _max_redes_proceso, _memoria_max_proceso
+    _preparar_proceso.update(matrices=matrices, jerarquia=jerarquia)
+    _origen_proceso, _max_redes_proceso, _memoria_max_proceso = origen, max_redes, memoria_max_bytes
+    base = cargar_snapshot(origen, version=version_datos).preparar(matrices=matrices, jerarquia=jerarquia)
+    _redes_proceso[origen] = (base, base)
+
+
+def _red_de_proceso(origen: Path, version_datos: int, version: int,
+                    cerradas: FrozenSet[str], tramos_cerrados: FrozenSet[Tramo]) -> RedSnapshot:
+    """Instantánea del proceso equivalente a la versión `version` del gestor de `origen`."""
+    base = None
+    if origen in _redes_proceso:
+        _redes_proceso.move_to_end(origen)
+        base, red = _redes_proceso[origen]
+        if red.version == version:
+            return red
+    if base is None or base.version_datos != version_datos:
+        # Red nueva para el proceso, o el gestor recargó el archivo de datos
+        preparar = _preparar_proceso if origen == _origen_proceso else {}
+        base = cargar_snapshot(origen, version=version_datos).preparar(**preparar)
+    red = base
+    # Tras una recarga el gestor publica los cierres con la misma versión que los datos
+    if base.version != version or (base.cerradas, base.tramos_cerrados) != (cerradas, tramos_cerrados):
+        red = base.con_cierres(version, cerradas, tramos_cerrados)
+    _redes_proceso[origen] = (base, red)
+    otras = [o for o in _redes_proceso if o != _origen_proceso]
+    for descartada in otras[:max(0, len(otras) - _max_redes_proceso)]:
+        del _redes_proceso[descartada]
+    return red
+
+
+def _memoria_de(base: RedSnapshot, red: RedSnapshot) -> int:
+    return base.nbytes + (red.nbytes if red is not base else 0)
+
+
+def _ajustar_memoria_proceso(conservar: Path) -> None:
+    """Descarta redes del proceso, de la menos a la más usada, hasta caber en el presupuesto.
+
+    La red inicial y `conservar` (la de la consulta en curso) no se descartan.
+    """
+    if _memoria_max_proceso is None:
+        return
+    total = sum(_memoria_de(base, red) for base, red in _redes_proceso.values())
+    for origen in [o for o in _redes_proceso if o not in (_origen_proceso, conservar)]:
+        if total <= _memoria_max_proceso:
+            break
+        total -= _memoria_de(*_redes_proceso.pop(origen))
+
+
+def _resolver_en_proceso(origen: Path, version_datos: int, version: int, cerradas: FrozenSet[str],
+                         tramos_cerrados: FrozenSet[Tramo], consulta: ConsultaRuta) -> ResultadoBusqueda:
+    red = _red_de_proceso(origen, version_datos, version, cerradas, tramos_cerrados)
+    resultado = resolver_consulta(red, consulta)
+    # Después de la consulta, para contar lo que haya construido (matrices, jerarquía)
+    _ajustar_memoria_proceso(origen)
+    return resultado
+
+
+def _calentar() -> None:
+    """Tarea vacía para arrancar los procesos del pool."""
+
+
+class EjecutorBusquedas:
+    """Pool de búsquedas con unión de consultas idénticas y límite de pendientes.
+
+    Solo debe usarse desde el bucle de eventos de la aplicación.
+
+    Attributes:
+        procesos: Procesos del pool (0 = hilos del bucle de eventos)
+        max_pendientes: Búsquedas distintas en curso antes de rechazar
+        max_redes: Redes además de la inicial que conserva cada proceso
+        memoria_max_bytes: Memoria de las redes de cada proceso antes de
+            descartar las menos usadas (None = sin límite)
+        calculadas: Búsquedas enviadas al pool
+        compartidas: Consultas resueltas con el cálculo de otra en curso
+        rechazadas: Consultas rechazadas por saturación
+        reinicios: Veces que se reemplazó el pool porque se rompió
+    """
+
+    def __init__(self, procesos: int = 0, max_pendientes: int = 64,
+                 precalcular_matrices: bool = False, precalcular_jerarquia: bool = False,
+                 max_redes: int = 1, memoria_max_bytes: Optional[int] = None):
+        if procesos < 0:
+            raise ValueError("El número de procesos no puede ser negativo")
+        if max_pendientes <= 0:
+            raise ValueError("El máximo de búsquedas pendientes debe ser positivo")
+        if max_redes < 0:
+            raise ValueError("El número de redes por proceso no puede ser negativo")
+        self.procesos = procesos
+        self.max_pendientes = max_pendientes
+        self.max_redes = max_redes
+        self.memoria_max_bytes = memoria_max_bytes
+        self.precalcular_matrices = precalcular_matrices
+        self.precalcular_jerarquia = precalcular_jerarquia
+        self._pool: Optional[Executor] = None
+        # Red inicial de los procesos (archivo y versión de datos), para reemplazar el pool
+        self._inicial: Optional[Tuple[Path, int]] = None
+        self._arranque: Optional[asyncio.Task] = None
+        self._en_curso: Dict[Tuple[Optional[Path], int, ConsultaRuta], asyncio.Future] = {}
+        self.calculadas = 0
+        self.compartidas = 0
+        self.rechazadas = 0
+        self.reinicios = 0
+
+    @property
+    def pendientes(self) -> int:
+        """Búsquedas distintas en curso."""
+        return len(self._en_curso)
+
+    async def iniciar(self, red: RedSnapshot) -> None:
+        """Arranca los procesos del pool y carga en ellos la red de `red.origen` (la inicial)."""
+        if self.procesos == 0 or self._pool is not None:
+            return
+        if red.origen is None:
+            raise ValueError("El pool de procesos necesita una red cargada de un archivo")
+        self._inicial = (red.origen, red.version_datos)
+        self._pool = self._crear_pool()
+        await self._arrancar(self._pool)
+
+    def _crear_pool(self) -> Executor:
+        origen, version_datos = self._inicial
+        return ProcessPoolExecutor(
+            max_workers=self.procesos,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_inicializar_proceso,
+            initargs=(origen, version_datos, self.precalcular_matrices, self.precalcular_jerarquia,
+                      self.max_redes, self.memoria_max_bytes),
+        )
+
+    async def _arrancar(self, pool: Executor, ignorar_errores: bool = False) -> None:
+        """Arranca todos los procesos de `pool` con tareas simultáneas."""
+        bucle = asyncio.get_running_loop()
+        await asyncio.gather(*(bucle.run_in_executor(pool, _calentar) for _ in range(self.procesos)),
+                             return_exceptions=ignorar_errores)
+
+    def _reiniciar(self, roto: Executor, red: RedSnapshot) -> None:
+        """Reemplaza el pool `roto` (si sigue siendo el vigente) por uno nuevo.
+
+        Los procesos nuevos cargan la red inicial en la versión de datos de
+        `red` si es la misma red; arrancan en segundo plano.
+        """
+        if self._pool is not roto:
+            return  # Ya se reemplazó, o el ejecutor se cerró
+        roto.shutdown(wait=False, cancel_futures=True)
+        origen, version_datos = self._inicial
+        if red.origen == origen:
+            self._inicial = (origen, red.version_datos)
+        self._pool = self._crear_pool()
+        self.reinicios += 1
+        # Si este también se rompe, lo detecta la siguiente búsqueda
+        self._arranque = asyncio.get_running_loop().create_task(
+            self._arrancar(self._pool, ignorar_errores=True))
+
+    def cerrar(self) -> None:
+        """Detiene el pool; las búsquedas en cola se cancelan."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def resolver(self, red: RedSnapshot, consulta: ConsultaRuta) -> Tuple[ResultadoBusqueda, bool]:
+        """Resuelve `consulta` en `red` fuera del bucle de eventos.
+
+        Args:
+            red: Instantánea de la red tomada por la petición
+            consulta: Consulta a resolver
+
+        Returns:
+            Tupla (resultado, compartido); `compartido` indica que el resultado
+            se calculó para otra petición idéntica que ya estaba en curso
+
+        Raises:
+            EjecutorSaturado: Si hay `max_pendientes` búsquedas en curso
+            EjecutorNoDisponible: Si un proceso del pool murió durante la
+                búsqueda (el pool ya se reemplazó y se puede reintentar)
+            ValueError: Si el modo es dependiente del tiempo y no se indica `salida`
+        """
+        # Las versiones son de cada gestor: dos redes pueden tener la misma
+        clave = (red.origen, red.version, consulta)
+        futuro = self._en_curso.get(clave)
+        if futuro is not None:
+            self.compartidas += 1
+            # Si esta petición se cancela, el cálculo sigue para las demás
+            return await self._esperar(futuro), True
+
+        if len(self._en_curso) >= self.max_pendientes:
+            self.rechazadas += 1
+            raise EjecutorSaturado(
+                f"Hay {len(self._en_curso)} búsquedas pendientes; el máximo es {self.max_pendientes}")
+
+        bucle = asyncio.get_running_loop()
+        pool = self._pool
+        if pool is None or red.origen is None:
+            futuro = bucle.run_in_executor(None, resolver_consulta, red, consulta)
+        else:
+            try:
+                futuro = bucle.run_in_executor(
+                    pool, _resolver_en_proceso, red.origen, red.version_datos, red.version,
+                    red.cerradas, red.tramos_cerrados, consulta)
+            except BrokenProcessPool as e:
+                self._reiniciar(pool, red)
+                raise EjecutorNoDisponible(f"El pool de búsquedas se reinició: {e}") from e
+        self.calculadas += 1
+        self._en_curso[clave] = futuro
+
+        def terminada(futuro: Future) -> None:
+            self._en_curso.pop(clave, None)
+            # Aunque la petición que lo envió se haya cancelado
+            if pool is not None and not futuro.cancelled() and isinstance(futuro.exception(), BrokenProcessPool):
+                self._reiniciar(pool, red)
+
+        futuro.add_done_callback(terminada)
+        return await self._esperar(futuro), False
+
+    @staticmethod
+    async def _esperar(futuro: asyncio.Future) -> ResultadoBusqueda:
+        """Espera `futuro` sin cancelarlo si se cancela quien espera."""
+        try:
+            return await asyncio.shield(futuro)
+        except BrokenProcessPool as e:
+            raise EjecutorNoDisponible(f"El pool de búsquedas se reinició: {e}") from e
+
+    def estadisticas(self) -> Dict[str, int]:
+        """Contadores del ejecutor."""
+        return {
+            "procesos": self.procesos,
+            "pendientes": self.pendientes,
+            "max_pendientes": self.max_pendientes,
+            "max_redes": self.max_redes,
+            "memoria_max_bytes": self.memoria_max_bytes,
+            "calculadas": self.calculadas,
+            "compartidas": self.compartidas,
+            "rechazadas": self.rechazadas,
+            "reinicios": self.reinicios,
+        }
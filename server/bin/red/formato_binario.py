@@ -0,0 +1,212 @@
+"""Formato binario de la red compilada, para cargarla con `mmap`.
+
+`python -m bin.red.preprocesar` compila datos-completos.json a un archivo
+`<datos>.red.bin` con los arreglos del `GrafoCompilado` (estaciones, estados,
+aristas, coordenadas y afluencia) de ancho fijo y una tabla de cadenas con los
+nombres. Al cargarlo, los arreglos son vistas de solo lectura sobre el archivo
+mapeado en memoria: no se analiza JSON ni se construyen objetos pydantic, y
+varios workers que cargan el mismo archivo comparten sus páginas.
+
+Estructura del archivo (todos los enteros en little-endian):
+
+    MAGICO (8 bytes) | versión (u32) | longitud de la cabecera (u32)
+    cabecera JSON (UTF-8) | relleno hasta múltiplo de 8
+    bloques de los arreglos, cada uno alineado a 8 bytes
+
+La cabecera guarda el SHA-256 del archivo JSON del que se compiló; un archivo
+compilado de otra versión de los datos, con otra `FORMATO_VERSION` o con otro
+orden de líneas se ignora y la red se carga del JSON. `FORMATO_VERSION` debe
+incrementarse cuando cambie la estructura del archivo o lo que `compilar_grafo`
+guarda en los arreglos.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from bin.algoritmo.grafo_compilado import LINEAS, GrafoCompilado
+
+logger = logging.getLogger(__name__)
+
+MAGICO = b"METROBIN"
+FORMATO_VERSION = 1
+_PREFIJO = struct.Struct("<8sII")
+_ALINEACION = 8
+
+# Arreglos del grafo que se guardan, en el orden del archivo
+_ARREGLOS: Tuple[str, ...] = (
+    "estacion_offsets", "estacion_latitud", "estacion_longitud", "abierta",
+    "estado_estacion", "estado_linea", "latitudes", "longitudes", "con_ubicacion",
+    "afluencia", "offsets", "destinos", "fuentes", "distancias", "afluencia_aristas",
+    "transbordo_km",
+)
+
+
+class RedBinaria(NamedTuple):
+    """Contenido de un archivo `.red.bin`.
+
+    Attributes:
+        grafo: Grafo compilado; sus arreglos son vistas sobre el archivo mapeado
+        afluencia_max: Afluencia máxima de la red (la de `construir_snapshot`)
+        huella: SHA-256 del archivo JSON del que se compiló
+    """
+    grafo: GrafoCompilado
+    afluencia_max: int
+    huella: str
+
+
+def ruta_binaria(datos: Union[str, Path]) -> Path:
+    """Archivo en el que se guarda la red compilada de un archivo de datos."""
+    datos = Path(datos)
+    return datos.with_name(f"{datos.stem}.red.bin")
+
+
+def huella_archivo(path: Union[str, Path]) -> str:
+    """SHA-256 del contenido de un archivo."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _alinear(posicion: int) -> int:
+    return -posicion % _ALINEACION
+
+
+def _tabla_cadenas(cadenas: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatena `cadenas` en UTF-8; la cadena `i` ocupa `offsets[i]:offsets[i + 1]`."""
+    codificadas = [cadena.encode("utf-8") for cadena in cadenas]
+    offsets = np.zeros(len(codificadas) + 1, dtype="<i4")
+    np.cumsum([len(c) for c in codificadas], out=offsets[1:])
+    return np.frombuffer(b"".join(codificadas), dtype=np.uint8), offsets
+
+
+def guardar_red_binaria(grafo: GrafoCompilado, afluencia_max: int, huella: str,
+                        destino: Union[str, Path]) -> Path:
+    """Guarda el grafo compilado en el formato binario.
+
+    El archivo se escribe completo con otro nombre y luego se renombra, así
+    que un worker que arranca mientras se regenera nunca lee uno a medias.
+
+    Args:
+        grafo: Grafo compilado de la red
+        afluencia_max: Afluencia máxima de la instantánea
+        huella: SHA-256 del archivo JSON de origen (ver `huella_archivo`)
+        destino: Archivo a escribir
+
+    Returns:
+        Ruta del archivo escrito
+    """
+    destino = Path(destino)
+    cadenas = list(grafo.nombres) + list(grafo.nombres_originales) + list(grafo.advertencias)
+    texto, offsets_texto = _tabla_cadenas(cadenas)
+
+    arreglos: Dict[str, np.ndarray] = {}
+    for nombre in _ARREGLOS:
+        arreglo = getattr(grafo, nombre)
+        arreglos[nombre] = np.ascontiguousarray(arreglo, dtype=arreglo.dtype.newbyteorder("<"))
+    arreglos["cadenas"] = texto
+    arreglos["cadenas_offsets"] = offsets_texto
+
+    descriptores = {}
+    posicion = 0
+    for nombre, arreglo in arreglos.items():
+        posicion += _alinear(posicion)
+        descriptores[nombre] = {"dtype": arreglo.dtype.str, "forma": list(arreglo.shape), "offset": posicion}
+        posicion += arreglo.nbytes
+
+    cabecera = json.dumps({
+        "huella": huella,
+        "afluencia_max": int(afluencia_max),
+        "grafo_afluencia_max": int(grafo.afluencia_max),
+        "lineas": [linea.value for linea in LINEAS],
+        "numero_estaciones": grafo.numero_estaciones,
+        "numero_advertencias": len(grafo.advertencias),
+        "arreglos": descriptores,
+    }).encode("utf-8")
+    inicio_datos = _PREFIJO.size + len(cabecera)
+    inicio_datos += _alinear(inicio_datos)
+
+    temporal = destino.with_name(destino.name + f".{os.getpid()}.tmp")
+    with open(temporal, "wb") as archivo:
+        archivo.write(_PREFIJO.pack(MAGICO, FORMATO_VERSION, len(cabecera)))
+        archivo.write(cabecera)
+        archivo.write(b"\0" * (inicio_datos - archivo.tell()))
+        for nombre, arreglo in arreglos.items():
+            archivo.write(b"\0" * (inicio_datos + descriptores[nombre]["offset"] - archivo.tell()))
+            archivo.write(arreglo.tobytes())
+    os.replace(temporal, destino)
+    return destino
+
+
+def cargar_red_binaria(path: Union[str, Path], huella: str) -> Optional[RedBinaria]:
+    """Mapea en memoria un archivo escrito con `guardar_red_binaria`.
+
+    Args:
+        path: Archivo `.red.bin`
+        huella: SHA-256 esperado del archivo JSON de origen
+
+    Returns:
+        La red, o None si el archivo no existe o se compiló de otros datos,
+        con otra versión del formato o con otro orden de líneas
+
+    Raises:
+        ValueError: Si el archivo no tiene el formato esperado
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, "rb") as archivo:
+        if os.fstat(archivo.fileno()).st_size < _PREFIJO.size:
+            raise ValueError(f"{path} no es un archivo de red compilada")
+        # El mapeo sigue vigente después de cerrar el archivo
+        datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magico, version, longitud_cabecera = _PREFIJO.unpack_from(datos, 0)
+    if magico != MAGICO:
+        raise ValueError(f"{path} no es un archivo de red compilada")
+    if version != FORMATO_VERSION:
+        logger.warning("%s usa la versión %d del formato (se esperaba %d); se ignora",
+                       path, version, FORMATO_VERSION)
+        return None
+    try:
+        cabecera = json.loads(datos[_PREFIJO.size:_PREFIJO.size + longitud_cabecera])
+    except ValueError as e:
+        raise ValueError(f"Cabecera inválida en {path}: {e}") from e
+    if cabecera["huella"] != huella:
+        logger.warning("%s se compiló de otra versión de los datos; se ignora", path)
+        return None
+    if cabecera["lineas"] != [linea.value for linea in LINEAS]:
+        logger.warning("%s se compiló con otro orden de líneas; se ignora", path)
+        return None
+
+    inicio_datos = _PREFIJO.size + longitud_cabecera
+    inicio_datos += _alinear(inicio_datos)
+    arreglos: Dict[str, np.ndarray] = {}
+    for nombre, descriptor in cabecera["arreglos"].items():
+        dtype = np.dtype(descriptor["dtype"])
+        cantidad = int(np.prod(descriptor["forma"], dtype=np.int64))
+        offset = inicio_datos + descriptor["offset"]
+        if offset + cantidad * dtype.itemsize > len(datos):
+            raise ValueError(f"{path} está truncado")
+        arreglos[nombre] = np.frombuffer(datos, dtype=dtype, count=cantidad, offset=offset).reshape(
+            descriptor["forma"])
+
+    texto = arreglos.pop("cadenas")
+    offsets_texto = arreglos.pop("cadenas_offsets").tolist()
+    cadenas: List[str] = [
+        texto[inicio:fin].tobytes().decode("utf-8") for inicio, fin in zip(offsets_texto, offsets_texto[1:])
+    ]
+    n = cabecera["numero_estaciones"]
+    grafo = GrafoCompilado(
+        nombres=cadenas[:n],
+        nombres_originales=cadenas[n:2 * n],
+        advertencias=cadenas[2 * n:2 * n + cabecera["numero_advertencias"]],
+        afluencia_max=cabecera["grafo_afluencia_max"],
+        **{nombre: arreglos[nombre] for nombre in _ARREGLOS},
+    )
+    return RedBinaria(grafo, cabecera["afluencia_max"], huella)
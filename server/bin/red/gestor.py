@@ -0,0 +1,204 @@
+"""Gestor de la instantánea activa de la red.
+
+El gestor mantiene una referencia a la `RedSnapshot` vigente. Las consultas
+toman la referencia una sola vez al inicio y trabajan con ella hasta terminar,
+de modo que reemplazar la instantánea es atómico: una petición en curso nunca
+ve una mezcla de la red anterior y la nueva.
+
+Los cierres de estaciones y tramos hechos en tiempo de ejecución publican una
+instantánea derivada (`RedSnapshot.con_cierres`) sin volver a leer el archivo
+y se conservan al recargarlo.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Union
+
+from bin.red.snapshot import RedSnapshot, Tramo, cargar_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class GestorRed:
+    """Mantiene y reemplaza de forma atómica la instantánea de la red.
+
+    Attributes:
+        ruta_datos: Archivo de datos usado por `cargar` y `recargar`
+        precalcular_matrices: Si las instantáneas nuevas se publican con las
+            matrices de todos los pares ya calculadas
+        precalcular_jerarquia: Si las instantáneas nuevas se publican con la
+            jerarquía de contracción ya cargada
+    """
+
+    def __init__(self, ruta_datos: Union[str, Path], precalcular_matrices: bool = False,
+                 precalcular_jerarquia: bool = False):
+        self.ruta_datos = Path(ruta_datos)
+        self.precalcular_matrices = precalcular_matrices
+        self.precalcular_jerarquia = precalcular_jerarquia
+        self._lock = threading.Lock()
+        # Serializa los cambios (recargas y cierres) para que ninguno se pierda
+        self._cambios = threading.Lock()
+        self._actual: Optional[RedSnapshot] = None
+        # Cierres hechos en tiempo de ejecución: estación -> abierta, y tramos
+        self._estaciones_forzadas: Dict[str, bool] = {}
+        self._tramos_cerrados: Set[Tramo] = set()
+        self._ultima_version = 0
+        self._suscriptores: List[Callable[[RedSnapshot], None]] = []
+
+    @property
+    def actual(self) -> RedSnapshot:
+        """Instantánea vigente.
+
+        Raises:
+            RuntimeError: Si todavía no se ha cargado ninguna red
+        """
+        snapshot = self._actual
+        if snapshot is None:
+            raise RuntimeError("La red no ha sido cargada")
+        return snapshot
+
+    @property
+    def vigente(self) -> Optional[RedSnapshot]:
+        """Instantánea vigente, o None si no hay ninguna cargada."""
+        return self._actual
+
+    @property
+    def cargada(self) -> bool:
+        """Indica si ya hay una instantánea disponible."""
+        return self._actual is not None
+
+    def suscribir(self, callback: Callable[[RedSnapshot], None]) -> None:
+        """Registra una función que se llama cada vez que se publica una instantánea.
+
+        Se usa para invalidar lo que dependa de la red anterior (p. ej. el
+        caché de rutas).
+        """
+        self._suscriptores.append(callback)
+
+    def siguiente_version(self) -> int:
+        """Reserva el siguiente número de versión."""
+        with self._lock:
+            self._ultima_version += 1
+            return self._ultima_version
+
+    def cargar(self) -> RedSnapshot:
+        """Carga la red desde `ruta_datos` si aún no está cargada."""
+        if self._actual is None:
+            return self.recargar()
+        return self._actual
+
+    def recargar(self) -> RedSnapshot:
+        """Vuelve a leer el archivo de datos y publica la nueva instantánea.
+
+        La lectura, validación y preparación de los artefactos derivados
+        ocurren con el candado de cambios tomado, así que los cambios de
+        cierres esperan a que termine la recarga (las consultas no: siguen
+        con la instantánea vigente). Si algo falla, la instantánea vigente
+        se conserva sin cambios.
+        """
+        with self._cambios:
+            nueva = cargar_snapshot(self.ruta_datos, version=self.siguiente_version())
+            # Problemas de calidad de datos: una vez por archivo leído, no por consulta
+            for advertencia in nueva.grafo.advertencias:
+                logger.warning("Red v%d: %s", nueva.version, advertencia)
+            if self._estaciones_forzadas or self._tramos_cerrados:
+                nueva = self._aplicar_cierres(nueva, nueva.version)
+            nueva.preparar(matrices=self.precalcular_matrices, jerarquia=self.precalcular_jerarquia)
+            return self.reemplazar(nueva)
+
+    def descargar(self) -> None:
+        """Suelta la instantánea vigente para liberar su memoria.
+
+        Los cierres de tiempo de ejecución y el contador de versiones se
+        conservan: la siguiente `cargar` vuelve a aplicar los cierres y
+        publica una versión posterior a todas las anteriores. Las peticiones
+        en curso terminan con la instantánea que ya tomaron.
+        """
+        with self._cambios, self._lock:
+            self._actual = None
+
+    def _aplicar_cierres(self, base: RedSnapshot, version: int) -> RedSnapshot:
+        """Deriva de `base` una instantánea con los cierres de tiempo de ejecución."""
+        cerradas = set(base.cerradas)
+        for nombre, abierta in self._estaciones_forzadas.items():
+            if nombre not in base.grafo.indice:
+                continue
+            if abierta:
+                cerradas.discard(nombre)
+            else:
+                cerradas.add(nombre)
+        tramos = {
+            t for t in self._tramos_cerrados
+            if t.estacion_a in base.grafo.indice and t.estacion_b in base.grafo.indice
+        }
+        return base.con_cierres(version, cerradas, base.tramos_cerrados | tramos)
+
+    def actualizar_cierres(
+            self,
+            cerrar: Iterable[str] = (),
+            abrir: Iterable[str] = (),
+            cerrar_tramos: Iterable[Tramo] = (),
+            abrir_tramos: Iterable[Tramo] = ()
+        ) -> RedSnapshot:
+        """Abre o cierra estaciones y tramos sin volver a leer el archivo de datos.
+
+        Args:
+            cerrar: Estaciones a cerrar
+            abrir: Estaciones a abrir
+            cerrar_tramos: Tramos a cerrar
+            abrir_tramos: Tramos a abrir
+
+        Returns:
+            La instantánea publicada
+
+        Raises:
+            ValueError: Si una estación o tramo no existe en la red
+            RuntimeError: Si todavía no se ha cargado ninguna red
+        """
+        cerrar, abrir = set(cerrar), set(abrir)
+        cerrar_tramos, abrir_tramos = set(cerrar_tramos), set(abrir_tramos)
+        with self._cambios:
+            actual = self.actual
+            for nombre in abrir:
+                if nombre not in actual.grafo.indice:
+                    raise ValueError(f"Estación '{nombre}' no encontrada")
+            cerradas = (actual.cerradas | cerrar) - abrir
+            tramos = (actual.tramos_cerrados | cerrar_tramos) - abrir_tramos
+            # Valida antes de registrar nada. La versión se toma sin reservarla
+            # (los cambios están serializados) y `reemplazar` la reserva al
+            # publicar: una solicitud rechazada no consume ninguna
+            with self._lock:
+                version = self._ultima_version + 1
+            nueva = actual.con_cierres(version, cerradas, tramos)
+            for nombre in cerrar - abrir:
+                self._estaciones_forzadas[nombre] = False
+            for nombre in abrir:
+                self._estaciones_forzadas[nombre] = True
+            self._tramos_cerrados = (self._tramos_cerrados | cerrar_tramos) - abrir_tramos
+            return self.reemplazar(nueva)
+
+    def reemplazar(self, nueva: RedSnapshot) -> RedSnapshot:
+        """Publica `nueva` como instantánea vigente.
+
+        Args:
+            nueva: Instantánea ya construida
+
+        Returns:
+            La instantánea publicada
+
+        Raises:
+            ValueError: Si `nueva` es más antigua que la vigente
+        """
+        with self._lock:
+            if self._actual is not None and nueva.version <= self._actual.version:
+                raise ValueError(
+                    f"La versión {nueva.version} no es posterior a la vigente ({self._actual.version})"
+                )
+            self._ultima_version = max(self._ultima_version, nueva.version)
+            self._actual = nueva
+        for callback in self._suscriptores:
+            callback(nueva)
+        return nueva
@@ -0,0 +1,226 @@
+"""Índice de nombres de estación para autocompletado y nombres aproximados.
+
+Cada estación se indexa por su nombre interno (`name`) y por su nombre
+original (`nombre_original`), normalizados sin acentos, sin mayúsculas y con
+cualquier separador convertido en un espacio: "Peñón Viejo", "penon_viejo" y
+"PEÑON-VIEJO" se escriben igual.
+
+* Un trie de prefijos resuelve el autocompletado: se inserta el nombre
+  completo y cada sufijo que empieza en una palabra, así que "viejo" también
+  encuentra "Peñón Viejo". Cada nodo guarda las estaciones que pasan por él y
+  una consulta cuesta lo que mide el texto, no lo que mide la red.
+* Un índice de trigramas (como `pg_trgm`) resuelve los errores de escritura:
+  las estaciones candidatas son las que comparten algún trigrama con la
+  consulta y se ordenan por similitud de Jaccard entre conjuntos de trigramas.
+
+El índice solo depende de los nombres, así que se construye una vez por
+instantánea y las instantáneas derivadas con cierres lo comparten.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+_NO_ALFANUMERICO = re.compile(r"[^0-9a-z]+")
+
+# Similitud mínima para sugerir una estación aproximada
+SIMILITUD_MINIMA = 0.3
+# Similitud mínima, y ventaja sobre la segunda estación, para que `resolver`
+# sustituya un nombre que no existe por uno aproximado
+SIMILITUD_RESOLUCION = 0.5
+VENTAJA_RESOLUCION = 0.15
+# Largo mínimo de un prefijo que solo tiene una estación para resolverlo a ella
+PREFIJO_RESOLUCION = 4
+
+
+class TipoCoincidencia:
+    """Cómo coincide una estación con la consulta, de mejor a peor."""
+    EXACTA = "exacta"
+    PREFIJO = "prefijo"  # La consulta es el principio del nombre
+    PALABRA = "palabra"  # La consulta es el principio de una palabra del nombre
+    APROXIMADA = "aproximada"  # Similitud de trigramas
+
+    ORDEN = {EXACTA: 0, PREFIJO: 1, PALABRA: 2, APROXIMADA: 3}
+
+
+class Coincidencia(NamedTuple):
+    """Estación encontrada por una búsqueda.
+
+    Attributes:
+        estacion: Índice de la estación en el grafo
+        nombre: Nombre interno de la estación
+        nombre_original: Nombre original de la estación
+        tipo: Tipo de coincidencia (ver `TipoCoincidencia`)
+        similitud: 1.0 para exacta y prefijos; similitud de trigramas si es aproximada
+    """
+    estacion: int
+    nombre: str
+    nombre_original: str
+    tipo: str
+    similitud: float
+
+
+def normalizar(texto: str) -> str:
+    """Texto sin acentos, en minúsculas y con las palabras separadas por un espacio."""
+    descompuesto = unicodedata.normalize("NFKD", texto.casefold())
+    sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(_NO_ALFANUMERICO.sub(" ", sin_acentos).split())
+
+
+def trigramas(normalizado: str) -> Set[str]:
+    """Trigramas de cada palabra de un texto normalizado, con relleno de espacios."""
+    resultado: Set[str] = set()
+    for palabra in normalizado.split():
+        relleno = f"  {palabra} "
+        resultado.update(relleno[i:i + 3] for i in range(len(relleno) - 2))
+    return resultado
+
+
+class _NodoTrie:
+    __slots__ = ("hijos", "estaciones")
+
+    def __init__(self):
+        self.hijos: Dict[str, "_NodoTrie"] = {}
+        self.estaciones: List[int] = []
+
+
+class IndiceNombres:
+    """Índice de búsqueda sobre los nombres de las estaciones.
+
+    Args:
+        nombres: Nombre interno de cada estación, en el orden del grafo
+        nombres_originales: Nombre original de cada estación
+    """
+
+    def __init__(self, nombres: Sequence[str], nombres_originales: Sequence[str]):
+        self.nombres = tuple(nombres)
+        self.nombres_originales = tuple(nombres_originales)
+        self._indice: Dict[str, int] = {nombre: i for i, nombre in enumerate(self.nombres)}
+        # Formas normalizadas de cada estación (una o dos)
+        self._formas: List[Tuple[str, ...]] = []
+        self._exactas: Dict[str, List[int]] = {}
+        self._raiz = _NodoTrie()
+        self._trigramas: List[Set[str]] = []
+        self._por_trigrama: Dict[str, List[int]] = {}
+
+        for estacion, (nombre, original) in enumerate(zip(self.nombres, self.nombres_originales)):
+            formas = tuple(dict.fromkeys(f for f in (normalizar(original), normalizar(nombre)) if f))
+            self._formas.append(formas)
+            for forma in formas:
+                self._exactas.setdefault(forma, []).append(estacion)
+                palabras = forma.split(" ")
+                for inicio in range(len(palabras)):
+                    self._insertar(" ".join(palabras[inicio:]), estacion)
+            conjunto = set().union(*(trigramas(f) for f in formas))
+            self._trigramas.append(conjunto)
+            for trigrama in conjunto:
+                self._por_trigrama.setdefault(trigrama, []).append(estacion)
+
+    def _insertar(self, clave: str, estacion: int) -> None:
+        nodo = self._raiz
+        for caracter in clave:
+            nodo = nodo.hijos.setdefault(caracter, _NodoTrie())
+            if not nodo.estaciones or nodo.estaciones[-1] != estacion:
+                nodo.estaciones.append(estacion)
+
+    def _prefijo(self, normalizado: str) -> List[int]:
+        """Estaciones con alguna palabra (o el nombre) que empieza por `normalizado`."""
+        nodo = self._raiz
+        for caracter in normalizado:
+            nodo = nodo.hijos.get(caracter)
+            if nodo is None:
+                return []
+        return nodo.estaciones
+
+    def _tipo_prefijo(self, estacion: int, normalizado: str) -> str:
+        formas = self._formas[estacion]
+        if normalizado in formas:
+            return TipoCoincidencia.EXACTA
+        if any(forma.startswith(normalizado) for forma in formas):
+            return TipoCoincidencia.PREFIJO
+        return TipoCoincidencia.PALABRA
+
+    def _similares(self, normalizado: str) -> List[Tuple[float, int]]:
+        """Estaciones con similitud de trigramas suficiente, de mayor a menor."""
+        consulta = trigramas(normalizado)
+        if not consulta:
+            return []
+        comunes: Dict[int, int] = {}
+        for trigrama in consulta:
+            for estacion in self._por_trigrama.get(trigrama, ()):
+                comunes[estacion] = comunes.get(estacion, 0) + 1
+        similares = []
+        for estacion, n in comunes.items():
+            similitud = n / (len(consulta) + len(self._trigramas[estacion]) - n)
+            if similitud >= SIMILITUD_MINIMA:
+                similares.append((similitud, estacion))
+        similares.sort(key=lambda par: (-par[0], self.nombres[par[1]]))
+        return similares
+
+    def _coincidencia(self, estacion: int, tipo: str, similitud: float = 1.0) -> Coincidencia:
+        return Coincidencia(estacion, self.nombres[estacion], self.nombres_originales[estacion], tipo, similitud)
+
+    def buscar(self, texto: str, limite: int = 10) -> List[Coincidencia]:
+        """Estaciones que coinciden con `texto`, de mejor a peor.
+
+        Primero las coincidencias exactas y de prefijo (ordenadas por tipo y
+        luego por nombre); si no llenan `limite`, se completan con las
+        aproximadas por trigramas.
+
+        Args:
+            texto: Texto escrito por el usuario
+            limite: Máximo de coincidencias a devolver
+
+        Returns:
+            Lista de coincidencias, sin estaciones repetidas
+        """
+        normalizado = normalizar(texto)
+        if not normalizado or limite <= 0:
+            return []
+
+        por_prefijo = sorted(
+            ((self._tipo_prefijo(e, normalizado), e) for e in self._prefijo(normalizado)),
+            key=lambda par: (TipoCoincidencia.ORDEN[par[0]], self.nombres_originales[par[1]])
+        )
+        resultado = [self._coincidencia(e, tipo) for tipo, e in por_prefijo[:limite]]
+        if len(resultado) < limite:
+            vistas = {c.estacion for c in resultado}
+            for similitud, estacion in self._similares(normalizado):
+                if estacion in vistas:
+                    continue
+                resultado.append(self._coincidencia(estacion, TipoCoincidencia.APROXIMADA, similitud))
+                if len(resultado) == limite:
+                    break
+        return resultado
+
+    def resolver(self, texto: str) -> Optional[str]:
+        """Nombre interno de la estación a la que se refiere `texto`.
+
+        Acepta el nombre interno, el original con cualquier combinación de
+        acentos, mayúsculas y separadores, el principio de un nombre o de una
+        de sus palabras si solo corresponde a una estación, o un nombre mal
+        escrito si una sola estación se le parece lo suficiente.
+
+        Returns:
+            El nombre interno, o None si no hay una estación clara
+        """
+        if texto in self._indice:
+            return texto
+        normalizado = normalizar(texto)
+        exactas = self._exactas.get(normalizado, ())
+        if len(exactas) == 1:
+            return self.nombres[exactas[0]]
+        if exactas:
+            return None
+        if len(normalizado) >= PREFIJO_RESOLUCION:
+            por_prefijo = self._prefijo(normalizado)
+            if len(por_prefijo) == 1:
+                return self.nombres[por_prefijo[0]]
+            if por_prefijo:
+                return None
+        similares = self._similares(normalizado)
+        if not similares or similares[0][0] < SIMILITUD_RESOLUCION:
+            return None
+        if len(similares) > 1 and similares[0][0] - similares[1][0] < VENTAJA_RESOLUCION:
+            return None
+        return self.nombres[similares[0][1]]
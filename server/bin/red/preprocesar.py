@@ -0,0 +1,96 @@
+"""Preprocesamiento fuera de línea de la red y de la jerarquía de contracción.
+
+Compila la red al formato binario (`bin.red.formato_binario`) y construye su
+jerarquía de contracción; guarda ambos junto al archivo de datos (en
+`Config.DATA_DIR` para la red por defecto) y reporta el tiempo de carga del
+formato binario frente al JSON, el tiempo de preprocesamiento, el tamaño del
+índice y la latencia de consulta comparada con A*. Se ejecuta desde `server/`:
+
+    python -m bin.red.preprocesar [--datos RUTA] [--consultas N]
+"""
+
+import argparse
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from config.config import Config
+from bin.helpers.load_locations import load_estaciones_completas
+from bin.red.formato_binario import (
+    cargar_red_binaria, guardar_red_binaria, huella_archivo, ruta_binaria
+)
+from bin.red.snapshot import construir_snapshot
+from bin.algoritmo.tablas_costo import REGIMENES
+from bin.algoritmo.a_estrella_compilado import a_estrella_compilado
+from bin.algoritmo.jerarquia_contraccion import (
+    construir_jerarquia, ruta_desde_jerarquia, ruta_jerarquia
+)
+
+
+def _latencias_ms(consulta: Callable[[str, str, object], object], pares: List[tuple]) -> List[float]:
+    tiempos = []
+    for origen, destino, regimen in pares:
+        inicio = time.perf_counter()
+        consulta(origen, destino, regimen)
+        tiempos.append((time.perf_counter() - inicio) * 1000.0)
+    return tiempos
+
+
+def _resumen(tiempos: List[float]) -> str:
+    percentiles = statistics.quantiles(tiempos, n=100)
+    return f"p50 {percentiles[49]:.3f} ms  p95 {percentiles[94]:.3f} ms  media {statistics.fmean(tiempos):.3f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compila la red y genera su jerarquía de contracción")
+    parser.add_argument("--datos", type=Path, default=Config.DATOS_COMPLETOS,
+                        help="Archivo de datos de la red")
+    parser.add_argument("--consultas", type=int, default=1000,
+                        help="Consultas aleatorias para medir la latencia (0 para omitir)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    red = construir_snapshot(load_estaciones_completas(args.datos), origen=args.datos)
+    grafo = red.grafo
+    segundos_json = time.perf_counter() - inicio
+    print(f"Red: {grafo.numero_estaciones} estaciones, {grafo.numero_estados} estados, "
+          f"{grafo.numero_aristas} aristas")
+
+    huella = huella_archivo(args.datos)
+    binaria = guardar_red_binaria(grafo, red.afluencia_max, huella, ruta_binaria(args.datos))
+    inicio = time.perf_counter()
+    cargar_red_binaria(binaria, huella_archivo(args.datos))
+    segundos_binaria = time.perf_counter() - inicio
+    print(f"Formato binario: {binaria.stat().st_size / 1024:.1f} KiB en {binaria}; carga "
+          f"{segundos_binaria * 1000:.2f} ms (JSON y compilación: {segundos_json * 1000:.2f} ms)")
+
+    tablas = red.tablas
+
+    jerarquia = construir_jerarquia(grafo, tablas)
+    destino = jerarquia.guardar(ruta_jerarquia(args.datos))
+    print(f"Preprocesamiento: {jerarquia.segundos_construccion:.2f} s")
+    for regimen, capa in jerarquia.capas.items():
+        print(f"  {regimen.clave}: {capa.numero_atajos} atajos")
+    print(f"Índice: {jerarquia.nbytes / 1024:.1f} KiB en memoria, "
+          f"{destino.stat().st_size / 1024:.1f} KiB en {destino}")
+
+    if args.consultas <= 0:
+        return
+    aleatorio = random.Random(0)
+    pares = [
+        (aleatorio.choice(grafo.nombres), aleatorio.choice(grafo.nombres), aleatorio.choice(REGIMENES))
+        for _ in range(args.consultas)
+    ]
+    latencia_ch = _latencias_ms(
+        lambda o, d, r: ruta_desde_jerarquia(grafo, tablas, jerarquia, o, d, r), pares)
+    latencia_a_estrella = _latencias_ms(
+        lambda o, d, r: a_estrella_compilado(grafo, tablas, o, d, r), pares)
+    print(f"Consultas ({args.consultas}):")
+    print(f"  jerarquia:  {_resumen(latencia_ch)}")
+    print(f"  a_estrella: {_resumen(latencia_a_estrella)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""Publicación de la red para los clientes: mapa completo y cambios de estado.
+
+`/api/v1/network` sirve la instantánea vigente (estaciones, coordenadas por
+línea, conexiones y qué está abierto) para que el mapa del frontend use los
+mismos datos con los que el servidor calcula las rutas. El cuerpo se serializa
+y se comprime una sola vez por instantánea (`MapaRed`) y lleva un ETag fuerte,
+así que una petición que ya lo tiene se responde con 304 sin cuerpo.
+
+Los cierres cambian mucho más seguido que la red. `PublicacionRed` guarda los
+cambios de `abierta` de estaciones y tramos de cada versión publicada, y un
+cliente con la versión `v` pide solo lo que cambió desde `v` en lugar de
+volver a descargar el mapa. Si la estructura de la red cambia (una recarga con
+otras estaciones, líneas, coordenadas o conexiones) o `v` ya salió del
+historial, el cliente tiene que descargar el mapa completo.
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import orjson
+
+from bin.algoritmo.grafo_compilado import LINEAS
+from bin.red.snapshot import RedSnapshot, Tramo
+
+
+class MapaRed(NamedTuple):
+    """Mapa de una instantánea, ya serializado.
+
+    Attributes:
+        version: Versión de la instantánea
+        etag: ETag fuerte del cuerpo sin comprimir (con comillas)
+        etag_gzip: ETag del cuerpo comprimido
+        cuerpo: `ServerResponse` con el mapa, en JSON
+        cuerpo_gzip: `cuerpo` comprimido con gzip
+        estructura: Huella de la red sin el estado de operación; dos mapas
+            con la misma huella solo difieren en lo que está abierto
+        abiertas: Estado de operación de cada estación
+        tramos_cerrados: Tramos cerrados
+    """
+    version: int
+    etag: str
+    etag_gzip: str
+    cuerpo: bytes
+    cuerpo_gzip: bytes
+    estructura: str
+    abiertas: Dict[str, bool]
+    tramos_cerrados: FrozenSet[Tramo]
+
+
+class CambiosVersion(NamedTuple):
+    """Cambios de estado de una versión respecto a la publicada antes."""
+    version: int
+    estaciones: Dict[str, bool]
+    tramos: Dict[Tramo, bool]
+
+
+def _conexiones(red: RedSnapshot) -> List[Tuple[int, int, int, float]]:
+    """Conexiones entre estaciones distintas, una por tramo: (a, b, código de línea, km)."""
+    grafo = red.grafo
+    desde = grafo.estado_estacion[grafo.fuentes]
+    hacia = grafo.estado_estacion[grafo.destinos]
+    lineas = grafo.estado_linea[grafo.destinos]
+    conexiones: Dict[Tuple[int, int, int], float] = {}
+    for e in np.flatnonzero(desde != hacia).tolist():
+        a, b = int(desde[e]), int(hacia[e])
+        if b < a:
+            a, b = b, a
+        conexiones.setdefault((a, b, int(lineas[e])), float(grafo.distancias[e]))
+    return sorted((a, b, linea, km) for (a, b, linea), km in conexiones.items())
+
+
+def payload_red(red: RedSnapshot) -> Dict[str, Any]:
+    """Mapa de la red con la forma de `MapaRedParsed`, construido directamente del grafo."""
+    grafo = red.grafo
+    estaciones = []
+    for i, (nombre, original) in enumerate(zip(grafo.nombres, grafo.nombres_originales)):
+        ubicaciones = [
+            {"linea": grafo.linea_de(estado).value,
+             "latitud": float(grafo.latitudes[estado]),
+             "longitud": float(grafo.longitudes[estado])}
+            for estado in grafo.estados_de(i) if grafo.con_ubicacion[estado]
+        ]
+        estaciones.append({
+            "estacion": nombre,
+            "nombre": original,
+            "lineas": [grafo.linea_de(estado).value for estado in grafo.estados_de(i)],
+            "latitud": float(grafo.estacion_latitud[i]),
+            "longitud": float(grafo.estacion_longitud[i]),
+            "ubicaciones": ubicaciones,
+            "abierta": bool(grafo.abierta[i]),
+        })
+
+    conexiones = []
+    for a, b, codigo, km in _conexiones(red):
+        tramo = Tramo.de(grafo.nombres[a], grafo.nombres[b], LINEAS[codigo])
+        conexiones.append({
+            "estacion_a": tramo.estacion_a,
+            "estacion_b": tramo.estacion_b,
+            "linea": tramo.linea.value,
+            "distancia_km": km,
+            "abierta": tramo not in red.tramos_cerrados,
+        })
+
+    return {
+        "version": red.version,
+        "version_datos": red.version_datos,
+        "estaciones": estaciones,
+        "conexiones": conexiones,
+    }
+
+
+def _huella_estructura(payload: Dict[str, Any]) -> str:
+    estructura = (
+        [{k: v for k, v in e.items() if k != "abierta"} for e in payload["estaciones"]],
+        [{k: v for k, v in c.items() if k != "abierta"} for c in payload["conexiones"]],
+    )
+    return hashlib.sha256(orjson.dumps(estructura)).hexdigest()
+
+
+def construir_mapa(red: RedSnapshot) -> MapaRed:
+    """Serializa y comprime el mapa de `red`."""
+    payload = payload_red(red)
+    cuerpo = orjson.dumps({"code": 0, "data": payload, "error": None})
+    # mtime=0: el mismo cuerpo se comprime siempre a los mismos bytes
+    cuerpo_gzip = gzip.compress(cuerpo, compresslevel=9, mtime=0)
+    etiqueta = f"{red.version}-{hashlib.sha256(cuerpo).hexdigest()[:16]}"
+    return MapaRed(
+        version=red.version,
+        etag=f'"{etiqueta}"',
+        etag_gzip=f'"{etiqueta}-gzip"',
+        cuerpo=cuerpo,
+        cuerpo_gzip=cuerpo_gzip,
+        estructura=_huella_estructura(payload),
+        abiertas={e["estacion"]: e["abierta"] for e in payload["estaciones"]},
+        tramos_cerrados=red.tramos_cerrados,
+    )
+
+
+class PublicacionRed:
+    """Mapa de la instantánea vigente e historial de sus cambios de estado.
+
+    Se suscribe al gestor (`GestorRed.suscribir(publicacion.actualizar)`)
+    para construir el mapa de cada instantánea al publicarse.
+
+    Attributes:
+        max_versiones: Versiones con cambios que se conservan en el historial
+    """
+
+    def __init__(self, max_versiones: int = 1024):
+        if max_versiones <= 0:
+            raise ValueError("El historial de cambios debe conservar al menos una versión")
+        self.max_versiones = max_versiones
+        self._lock = threading.Lock()
+        self._mapa: Optional[MapaRed] = None
+        self._historial: Deque[CambiosVersion] = deque()
+        # Menor versión desde la que se pueden pedir cambios
+        self._desde_minima = 0
+
+    def actualizar(self, red: RedSnapshot) -> MapaRed:
+        """Construye el mapa de `red` y registra sus cambios respecto al anterior.
+
+        Returns:
+            El mapa de `red`; para una instantánea anterior a la vigente se
+            construye sin tocar el historial
+        """
+        with self._lock:
+            anterior = self._mapa
+            if anterior is not None and red.version == anterior.version:
+                return anterior
+            mapa = construir_mapa(red)
+            if anterior is not None and red.version < anterior.version:
+                return mapa
+            self._registrar(anterior, mapa)
+            self._mapa = mapa
+            return mapa
+
+    def mapa(self, red: RedSnapshot) -> MapaRed:
+        """Mapa de `red`; el de la vigente se construye una sola vez."""
+        mapa = self._mapa
+        if mapa is not None and mapa.version == red.version:
+            return mapa
+        return self.actualizar(red)
+
+    def _registrar(self, anterior: Optional[MapaRed], mapa: MapaRed) -> None:
+        if anterior is None or anterior.estructura != mapa.estructura:
+            # Otra red: los cambios de estado no bastan para ponerse al día
+            self._historial.clear()
+            self._desde_minima = mapa.version
+            return
+        estaciones = {
+            nombre: abierta for nombre, abierta in mapa.abiertas.items()
+            if anterior.abiertas[nombre] != abierta
+        }
+        tramos = {t: False for t in mapa.tramos_cerrados - anterior.tramos_cerrados}
+        tramos.update((t, True) for t in anterior.tramos_cerrados - mapa.tramos_cerrados)
+        if not estaciones and not tramos:
+            return
+        self._historial.append(CambiosVersion(mapa.version, estaciones, tramos))
+        if len(self._historial) > self.max_versiones:
+            self._desde_minima = self._historial.popleft().version
+
+    def cambios_desde(self, version: int) -> Tuple[MapaRed, List[CambiosVersion]]:
+        """Cambios de estado publicados después de `version`.
+
+        Args:
+            version: Versión del mapa que tiene el cliente
+
+        Returns:
+            Tupla (mapa vigente, cambios en orden de versión); aplicarlos en
+            orden sobre el mapa de `version` da el estado del vigente
+
+        Raises:
+            ValueError: Si `version` es posterior a la vigente, anterior al
+                historial o de una red con otra estructura
+            RuntimeError: Si todavía no se ha publicado ningún mapa
+        """
+        with self._lock:
+            mapa = self._mapa
+            if mapa is None:
+                raise RuntimeError("La red no ha sido publicada")
+            if version > mapa.version:
+                raise ValueError(f"La versión {version} es posterior a la vigente ({mapa.version})")
+            if version < self._desde_minima:
+                raise ValueError(
+                    f"No hay historial de cambios desde la versión {version}; "
+                    f"hay que descargar la red completa"
+                )
+            return mapa, [c for c in self._historial if c.version > version]
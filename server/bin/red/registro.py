@@ -0,0 +1,296 @@
+"""Registro de las redes que sirve el servidor.
+
+Cada archivo `*.json` bajo el directorio de datos (incluidos subdirectorios,
+p. ej. `historico/2019.json`) es una red con el formato de
+datos-completos.json; su nombre es la ruta relativa sin la extensión
+(`datos-completos`, `historico/2019`). Las consultas eligen la red con el
+parámetro `red`. Los archivos se buscan al arrancar y cuando un
+administrador lo pide (`descubrir`); los `.json` que no tienen esa forma
+(un objeto de estaciones con líneas, ubicación y conexiones) se ignoran.
+
+Cada red tiene su propio `GestorRed` (con sus cierres), su caché de rutas y
+su publicación del mapa, y se carga la primera vez que se usa. La memoria de
+los artefactos cargados (grafo, tablas de costo, landmarks, matrices y
+jerarquía; ver `RedSnapshot.nbytes`) se mantiene bajo un presupuesto: al
+cargar una red se descargan las menos usadas recientemente hasta volver a
+caber. La red por defecto nunca se descarga.
+
+Descargar una red solo suelta su instantánea: el gestor conserva los cierres
+hechos en tiempo de ejecución y los vuelve a aplicar al recargarla, y las
+versiones siguen creciendo, así que nada de lo que dependa de la versión
+(caché, ETag del mapa, ejecutor) confunde la red recargada con la anterior.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import orjson
+
+from bin.red.cache_rutas import CacheRutas
+from bin.red.gestor import GestorRed
+from bin.red.publicacion import PublicacionRed
+from bin.red.snapshot import RedSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Claves que toda estación tiene en el formato de datos-completos.json
+_CLAVES_ESTACION = frozenset({"lineas", "ubicacion", "conexiones"})
+
+
+def es_archivo_red(ruta: Path) -> bool:
+    """Indica si un archivo JSON tiene la forma de datos-completos.json.
+
+    Solo revisa la estructura (un objeto no vacío de estaciones con sus
+    claves); el contenido se valida al cargar la red.
+    """
+    try:
+        datos = orjson.loads(ruta.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return False
+    return isinstance(datos, dict) and bool(datos) and all(
+        isinstance(estacion, dict) and _CLAVES_ESTACION <= estacion.keys() for estacion in datos.values()
+    )
+
+
+@dataclass
+class RedRegistrada:
+    """Una red del registro y el estado que la acompaña.
+
+    Attributes:
+        nombre: Nombre de la red (ruta relativa al directorio, sin extensión)
+        gestor: Gestor de la instantánea y de los cierres de la red
+        cache: Caché de rutas de la red
+        publicacion: Mapa publicado y cambios de estado de la red
+        fija: Si nunca se descarga para liberar memoria
+        ultimo_uso: Momento (`time.monotonic`) del último uso
+        cargas: Veces que se ha cargado
+    """
+    nombre: str
+    gestor: GestorRed
+    cache: CacheRutas
+    publicacion: PublicacionRed
+    fija: bool = False
+    ultimo_uso: float = 0.0
+    cargas: int = 0
+    _carga: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def cargada(self) -> bool:
+        return self.gestor.cargada
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria de los artefactos de la instantánea vigente (0 si no está cargada)."""
+        red = self.gestor.vigente
+        return red.nbytes if red is not None else 0
+
+
+class RegistroRedes:
+    """Redes disponibles, cargadas bajo demanda y con un presupuesto de memoria.
+
+    Args:
+        directorio: Directorio en el que se buscan las redes
+        por_defecto: Nombre de la red que se usa si la consulta no indica otra
+        memoria_max_bytes: Presupuesto de memoria de las redes cargadas (None = sin límite)
+        precalcular_matrices: Si la red por defecto se publica con las
+            matrices de todos los pares; las demás las construyen si una
+            consulta las pide
+        precalcular_jerarquia: Lo mismo con la jerarquía de contracción
+        capacidad_cache: Entradas del caché de rutas de cada red
+        ttl_cache_segundos: Vida de las entradas del caché de rutas
+        max_versiones_cambios: Historial de cambios de estado de cada red
+
+    Raises:
+        ValueError: Si la red por defecto no está en el directorio
+    """
+
+    def __init__(self, directorio: Union[str, Path], por_defecto: str,
+                 memoria_max_bytes: Optional[int] = None,
+                 precalcular_matrices: bool = False, precalcular_jerarquia: bool = False,
+                 capacidad_cache: int = 1024, ttl_cache_segundos: Optional[float] = None,
+                 max_versiones_cambios: int = 1024):
+        self.directorio = Path(directorio)
+        self.por_defecto = por_defecto
+        self.memoria_max_bytes = memoria_max_bytes
+        self.precalcular_matrices = precalcular_matrices
+        self.precalcular_jerarquia = precalcular_jerarquia
+        self.capacidad_cache = capacidad_cache
+        self.ttl_cache_segundos = ttl_cache_segundos
+        self.max_versiones_cambios = max_versiones_cambios
+        self._lock = threading.Lock()
+        self._redes: Dict[str, RedRegistrada] = {}
+        self.descargas = 0
+        self.descubrir()
+        if por_defecto not in self._redes:
+            raise ValueError(f"La red por defecto '{por_defecto}' no está en {self.directorio}")
+
+    def descubrir(self) -> List[str]:
+        """Registra las redes nuevas del directorio.
+
+        Los `.json` sin la forma de datos-completos.json se omiten y se
+        vuelven a revisar en la siguiente búsqueda. Las ya registradas se
+        conservan aunque su archivo haya desaparecido (la instantánea cargada
+        sigue sirviendo); una recarga de una red sin archivo falla y conserva
+        la instantánea vigente.
+
+        Returns:
+            Nombres de las redes agregadas
+        """
+        nuevas = []
+        for ruta in sorted(self.directorio.rglob("*.json")):
+            nombre = ruta.relative_to(self.directorio).with_suffix("").as_posix()
+            with self._lock:
+                if nombre in self._redes:
+                    continue
+            # Se revisa fuera del candado: lee el archivo completo
+            if not es_archivo_red(ruta):
+                logger.info("Se omite '%s': no tiene el formato de una red", ruta)
+                continue
+            with self._lock:
+                if nombre in self._redes:
+                    continue
+                self._redes[nombre] = self._registrar(nombre, ruta)
+            nuevas.append(nombre)
+        return nuevas
+
+    def _registrar(self, nombre: str, ruta: Path) -> RedRegistrada:
+        fija = nombre == self.por_defecto
+        gestor = GestorRed(ruta, precalcular_matrices=fija and self.precalcular_matrices,
+                           precalcular_jerarquia=fija and self.precalcular_jerarquia)
+        entrada = RedRegistrada(
+            nombre=nombre,
+            gestor=gestor,
+            cache=CacheRutas(capacidad=self.capacidad_cache, ttl_segundos=self.ttl_cache_segundos),
+            publicacion=PublicacionRed(max_versiones=self.max_versiones_cambios),
+            fija=fija,
+        )
+        # Una recarga de datos vacía el caché; un cambio de cierres solo
+        # descarta las rutas afectadas. El mapa se serializa al publicarse.
+        gestor.suscribir(entrada.cache.actualizar)
+        gestor.suscribir(entrada.publicacion.actualizar)
+        return entrada
+
+    @property
+    def nombres(self) -> List[str]:
+        """Nombres de las redes registradas, en orden alfabético."""
+        with self._lock:
+            return sorted(self._redes)
+
+    def entrada(self, nombre: Optional[str] = None) -> RedRegistrada:
+        """Red registrada con `nombre` (la por defecto si es None), sin cargarla.
+
+        Raises:
+            KeyError: Si no hay ninguna red con ese nombre
+        """
+        nombre = nombre or self.por_defecto
+        with self._lock:
+            entrada = self._redes.get(nombre)
+        if entrada is None:
+            raise KeyError(f"Red '{nombre}' no encontrada")
+        return entrada
+
+    def obtener(self, nombre: Optional[str] = None) -> RedSnapshot:
+        """Instantánea vigente de una red; la carga si no lo está.
+
+        La carga bloquea: desde el bucle de eventos debe llamarse en un hilo
+        si `entrada(nombre).cargada` es falso.
+
+        Raises:
+            KeyError: Si no hay ninguna red con ese nombre
+            ValueError: Si el archivo de la red no es válido
+        """
+        entrada = self.entrada(nombre)
+        entrada.ultimo_uso = time.monotonic()
+        red = entrada.gestor.vigente
+        if red is not None:
+            return red
+        with entrada._carga:
+            red = entrada.gestor.vigente
+            if red is None:
+                inicio = time.perf_counter()
+                red = entrada.gestor.recargar()
+                entrada.cargas += 1
+                logger.info("Red '%s' cargada en %.3f s (%.1f MiB)", entrada.nombre,
+                            time.perf_counter() - inicio, red.nbytes / 2**20)
+        self.ajustar_memoria(conservar=entrada.nombre)
+        return red
+
+    def memoria(self) -> int:
+        """Memoria de las redes cargadas, en bytes."""
+        with self._lock:
+            entradas = list(self._redes.values())
+        return sum(entrada.nbytes for entrada in entradas)
+
+    def ajustar_memoria(self, conservar: Optional[str] = None) -> List[str]:
+        """Descarga redes, de la menos a la más usada recientemente, hasta caber en el presupuesto.
+
+        Args:
+            conservar: Red que no se descarga aunque sea la menos usada (la
+                que se acaba de pedir)
+
+        Returns:
+            Nombres de las redes descargadas
+        """
+        if self.memoria_max_bytes is None:
+            return []
+        with self._lock:
+            cargadas = [e for e in self._redes.values() if e.cargada]
+        total = sum(e.nbytes for e in cargadas)
+        descargadas = []
+        for entrada in sorted(cargadas, key=lambda e: e.ultimo_uso):
+            if total <= self.memoria_max_bytes:
+                break
+            if entrada.fija or entrada.nombre == conservar:
+                continue
+            total -= entrada.nbytes
+            self.descargar(entrada.nombre)
+            descargadas.append(entrada.nombre)
+        if total > self.memoria_max_bytes:
+            logger.warning("Las redes en uso ocupan %.1f MiB; el presupuesto es %.1f MiB",
+                           total / 2**20, self.memoria_max_bytes / 2**20)
+        return descargadas
+
+    def descargar(self, nombre: str) -> None:
+        """Suelta la instantánea de una red; se volverá a cargar en su siguiente uso.
+
+        Raises:
+            KeyError: Si no hay ninguna red con ese nombre
+            ValueError: Si es la red por defecto
+        """
+        entrada = self.entrada(nombre)
+        if entrada.fija:
+            raise ValueError(f"La red '{nombre}' no se puede descargar")
+        with entrada._carga:
+            entrada.gestor.descargar()
+            entrada.cache.invalidar()
+        self.descargas += 1
+        logger.info("Red '%s' descargada", nombre)
+
+    def estadisticas(self) -> Dict[str, object]:
+        """Estado de cada red y uso de memoria."""
+        with self._lock:
+            entradas = [self._redes[nombre] for nombre in sorted(self._redes)]
+        ahora = time.monotonic()
+        return {
+            "por_defecto": self.por_defecto,
+            "memoria_bytes": sum(e.nbytes for e in entradas),
+            "memoria_max_bytes": self.memoria_max_bytes,
+            "descargas": self.descargas,
+            "redes": [
+                {
+                    "nombre": e.nombre,
+                    "cargada": e.cargada,
+                    "fija": e.fija,
+                    "memoria_bytes": e.nbytes,
+                    "cargas": e.cargas,
+                    "segundos_sin_uso": ahora - e.ultimo_uso if e.ultimo_uso else None,
+                }
+                for e in entradas
+            ],
+        }
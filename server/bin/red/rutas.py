@@ -0,0 +1,242 @@
+"""Resolución de consultas de ruta sobre una instantánea de la red.
+
+Reúne la elección del motor de búsqueda y la conversión del resultado al
+payload que devuelve la API, para que los distintos endpoints (y el caché)
+compartan exactamente el mismo camino.
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from models.resultado_ruta import ResultadoRuta
+from models.schemas import ModoBusqueda, ResultadoRutaParsed, TipoHeuristica
+from bin.algoritmo.a_estrella_compilado import a_estrella_compilado, validar_consulta, sin_ruta
+from bin.algoritmo.a_estrella_bidireccional import a_estrella_bidireccional
+from bin.algoritmo.dijkstra import arbol_dijkstra, ruta_desde_arbol
+from bin.algoritmo.tablas_costo import Regimen
+from bin.algoritmo.todos_los_pares import ruta_desde_matrices
+from bin.algoritmo.jerarquia_contraccion import ruta_desde_jerarquia
+from bin.algoritmo.tiempo_dependiente import a_estrella_dependiente
+from bin.algoritmo.traza import Traza
+from bin.red.snapshot import RedSnapshot, Tramo
+from bin.red.cache_rutas import DependenciasRuta
+
+# Modos que responden sin la heurística de A*; si no tienen sus artefactos
+# (p. ej. con cierres) buscan en vivo siempre con ALT, que es exacta, sin
+# importar la heurística pedida
+MODOS_SIN_HEURISTICA = frozenset({ModoBusqueda.TABLA, ModoBusqueda.JERARQUIA})
+
+
+def calcular_ruta(
+        red: RedSnapshot,
+        estacion_origen: str,
+        estacion_destino: str,
+        regimen: Regimen,
+        modo: ModoBusqueda = ModoBusqueda.A_ESTRELLA,
+        heuristica: TipoHeuristica = TipoHeuristica.HAVERSINE,
+        salida: Optional[datetime] = None,
+        traza: Optional[Traza] = None
+    ) -> ResultadoRuta:
+    """Calcula una ruta con el motor indicado.
+
+    Args:
+        red: Instantánea de la red
+        estacion_origen: Nombre de la estación de inicio
+        estacion_destino: Nombre de la estación objetivo
+        regimen: Régimen de costo de la consulta
+        modo: Motor de búsqueda
+        heuristica: Heurística de A* (no aplica a los modos tabla y jerarquia)
+        salida: Fecha y hora de salida; obligatoria en el modo dependiente del
+            tiempo, que toma de `regimen` solo la lluvia
+        traza: Si se indica, recibe el tiempo total y los nodos expandidos; el
+            modo a_estrella la llena además con el detalle de la búsqueda
+
+    Returns:
+        ResultadoRuta con la ruta óptima o mensaje de error
+
+    Raises:
+        ValueError: Si el modo es dependiente del tiempo y no se indica `salida`
+    """
+    if traza is None:
+        return _calcular_ruta(red, estacion_origen, estacion_destino, regimen, modo, heuristica, salida)
+    inicio = time.perf_counter()
+    resultado = _calcular_ruta(red, estacion_origen, estacion_destino, regimen, modo, heuristica, salida, traza)
+    traza.segundos_total = time.perf_counter() - inicio
+    traza.expandidos = resultado.nodos_expandidos
+    return resultado
+
+
+def _calcular_ruta(
+        red: RedSnapshot,
+        estacion_origen: str,
+        estacion_destino: str,
+        regimen: Regimen,
+        modo: ModoBusqueda,
+        heuristica: TipoHeuristica,
+        salida: Optional[datetime],
+        traza: Optional[Traza] = None
+    ) -> ResultadoRuta:
+    """Despacho de `calcular_ruta` al motor de `modo`."""
+    matrices = red.matrices if modo == ModoBusqueda.TABLA else None
+    jerarquia = red.jerarquia if modo == ModoBusqueda.JERARQUIA else None
+
+    if jerarquia is not None:
+        return ruta_desde_jerarquia(
+            grafo=red.grafo,
+            tablas=red.tablas,
+            jerarquia=jerarquia,
+            estacion_origen=estacion_origen,
+            estacion_destino=estacion_destino,
+            regimen=regimen
+        )
+
+    if matrices is not None:
+        return ruta_desde_matrices(
+            grafo=red.grafo,
+            tablas=red.tablas,
+            matrices=matrices,
+            estacion_origen=estacion_origen,
+            estacion_destino=estacion_destino,
+            regimen=regimen
+        )
+
+    usar_alt = heuristica == TipoHeuristica.ALT or modo in MODOS_SIN_HEURISTICA
+    landmarks = red.landmarks if usar_alt else None
+    if modo == ModoBusqueda.TIEMPO_DEPENDIENTE:
+        if salida is None:
+            raise ValueError("El modo dependiente del tiempo requiere la hora de salida")
+        return a_estrella_dependiente(
+            grafo=red.grafo,
+            tablas=red.tablas,
+            estacion_origen=estacion_origen,
+            estacion_destino=estacion_destino,
+            salida=salida,
+            lluvia=regimen.lluvia,
+            landmarks=landmarks
+        )
+
+    if modo == ModoBusqueda.BIDIRECCIONAL:
+        return a_estrella_bidireccional(
+            grafo=red.grafo,
+            tablas=red.tablas,
+            estacion_origen=estacion_origen,
+            estacion_destino=estacion_destino,
+            regimen=regimen,
+            landmarks=landmarks
+        )
+
+    # Sin matrices ni jerarquía (con cierres, o en redes grandes sin ellas
+    # precalculadas) se busca en vivo; los modos precalculados, con ALT
+    return a_estrella_compilado(
+        grafo=red.grafo,
+        tablas=red.tablas,
+        estacion_origen=estacion_origen,
+        estacion_destino=estacion_destino,
+        regimen=regimen,
+        landmarks=landmarks,
+        traza=traza
+    )
+
+
+def modelo_ruta(resultado: ResultadoRuta) -> ResultadoRutaParsed:
+    """Convierte un resultado exitoso en el modelo `ResultadoRutaParsed` de la API."""
+    return ResultadoRutaParsed(
+        estaciones=resultado.estaciones,
+        pasos=resultado.pasos,
+        costo_total_minutos=resultado.costo_total_minutos,
+        distancia_total_km=resultado.distancia_total_km,
+        lineas_utilizadas=resultado.lineas_utilizadas,
+        numero_transbordos=resultado.numero_transbordos,
+        nodos_expandidos=resultado.nodos_expandidos,
+        exposicion_afluencia=resultado.exposicion_afluencia
+    )
+
+
+def payload_ruta(resultado: ResultadoRuta) -> Dict[str, Any]:
+    """Convierte un resultado exitoso en el payload `ResultadoRutaParsed` de la API.
+
+    Produce lo mismo que `modelo_ruta(resultado).model_dump(mode="json")`,
+    con las mismas claves en el mismo orden, pero arma el diccionario
+    directamente en lugar de construir y validar el modelo.
+    """
+    return {
+        "estaciones": list(resultado.estaciones),
+        "estaciones_originales": [],
+        "pasos": [
+            {
+                "estacion_origen": paso.estacion_origen,
+                "nombre_origen": paso.nombre_origen,
+                "estacion_destino": paso.estacion_destino,
+                "nombre_destino": paso.nombre_destino,
+                "linea": paso.linea.value,
+                "distancia_km": paso.distancia_km,
+                "costo_segundos": paso.costo_segundos,
+                "es_transbordo": paso.es_transbordo,
+                "posicion_origen": paso.posicion_origen,
+            }
+            for paso in resultado.pasos
+        ],
+        "costo_total_minutos": resultado.costo_total_minutos,
+        "distancia_total_km": resultado.distancia_total_km,
+        "lineas_utilizadas": [
+            {"linea": usada.linea.value, "orden": usada.orden} for usada in resultado.lineas_utilizadas
+        ],
+        "numero_transbordos": resultado.numero_transbordos,
+        "nodos_expandidos": resultado.nodos_expandidos,
+        "exposicion_afluencia": resultado.exposicion_afluencia,
+        "traza": None,
+    }
+
+
+def dependencias_ruta(red: RedSnapshot, resultado: ResultadoRuta) -> DependenciasRuta:
+    """Estaciones y tramos que recorre `resultado` y cierres con que se calculó en `red`."""
+    return DependenciasRuta(
+        estaciones=frozenset(resultado.estaciones),
+        tramos=frozenset(
+            Tramo.de(paso.estacion_origen, paso.estacion_destino, paso.linea)
+            for paso in resultado.pasos
+        ),
+        cerradas=red.cerradas,
+        tramos_cerrados=red.tramos_cerrados
+    )
+
+
+def calcular_rutas_lote(
+        red: RedSnapshot,
+        pares: Sequence[Tuple[str, str]],
+        regimen: Regimen
+    ) -> List[ResultadoRuta]:
+    """Calcula las rutas de muchos pares origen/destino.
+
+    Los pares se agrupan por origen y cada origen se resuelve con un solo
+    árbol de Dijkstra que se detiene al alcanzar todos sus destinos.
+
+    Args:
+        red: Instantánea de la red
+        pares: Pares (estacion_origen, estacion_destino)
+        regimen: Régimen de costo común a todo el lote
+
+    Returns:
+        Un ResultadoRuta por par, en el mismo orden que `pares`
+    """
+    grafo = red.grafo
+    costos = red.tablas.de(regimen)
+    resultados: List[Optional[ResultadoRuta]] = [None] * len(pares)
+    por_origen: Dict[int, List[int]] = {}
+
+    for i, (origen, destino) in enumerate(pares):
+        invalida = validar_consulta(grafo, origen, destino)
+        if invalida is not None:
+            resultados[i] = invalida
+        else:
+            por_origen.setdefault(grafo.indice[origen], []).append(i)
+
+    for origen, indices in por_origen.items():
+        destinos = {grafo.indice[pares[i][1]] for i in indices}
+        arbol = arbol_dijkstra(grafo, costos, origen, destinos=destinos)
+        for i in indices:
+            resultado = ruta_desde_arbol(grafo, arbol, grafo.indice[pares[i][1]], costos)
+            resultados[i] = resultado if resultado is not None else sin_ruta(*pares[i])
+
+    return resultados
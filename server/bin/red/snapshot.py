@@ -0,0 +1,394 @@
+"""Instantánea inmutable de la red del Metro.
+
+La red se carga y se valida una sola vez; a partir de ahí todas las consultas
+comparten la misma instantánea (`RedSnapshot`) en lugar de volver a leer
+datos-completos.json en cada petición. Los valores derivados que antes se
+recalculaban por consulta (índice por nombre, afluencia máxima) se calculan
+al construir la instantánea.
+
+Si junto al archivo de datos hay una red compilada al formato binario
+(`bin.red.formato_binario`) que corresponde a su contenido, la instantánea se
+carga de ella sin analizar el JSON; las estaciones como objetos pydantic solo
+se leen si algo las pide.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from functools import cached_property
+from pathlib import Path
+from types import MappingProxyType
+from typing import FrozenSet, Iterable, Mapping, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from config.config import Config
+from models.estacion_completa import EstacionCompleta, LineaEnum
+from bin.helpers.load_locations import load_estaciones_completas
+from bin.red.formato_binario import RedBinaria, cargar_red_binaria, huella_archivo, ruta_binaria
+from bin.red.indice_nombres import IndiceNombres
+from bin.algoritmo.grafo_compilado import GrafoCompilado, compilar_grafo
+from bin.algoritmo.tablas_costo import TablasCosto, construir_tablas, actualizar_tablas
+from bin.algoritmo.todos_los_pares import MatricesRutas, construir_matrices
+from bin.algoritmo.landmarks import Landmarks, construir_landmarks
+from bin.algoritmo.jerarquia_contraccion import (
+    JerarquiaContraccion, construir_jerarquia, cargar_jerarquia, ruta_jerarquia
+)
+
+
+class Tramo(NamedTuple):
+    """Tramo de una línea entre dos estaciones contiguas (en ambos sentidos).
+
+    Usar `Tramo.de` para construirlo: las estaciones quedan en orden
+    alfabético, de modo que (a, b) y (b, a) son el mismo tramo.
+    """
+    estacion_a: str
+    estacion_b: str
+    linea: LineaEnum
+
+    @classmethod
+    def de(cls, estacion_a: str, estacion_b: str, linea: LineaEnum) -> "Tramo":
+        if estacion_b < estacion_a:
+            estacion_a, estacion_b = estacion_b, estacion_a
+        return cls(estacion_a, estacion_b, LineaEnum(linea))
+
+
+@dataclass(frozen=True)
+class RedSnapshot:
+    """Estado inmutable de la red usado para resolver consultas.
+
+    Los cierres vigentes son `cerradas` y `tramos_cerrados`; el campo
+    `abierta` de las estaciones solo refleja el archivo de datos.
+
+    Attributes:
+        version: Número de versión monotónico asignado por el gestor
+        afluencia_max: Afluencia máxima usada para normalizar costos
+        cerradas: Nombres de las estaciones cerradas
+        tramos_cerrados: Tramos de línea cerrados
+        version_datos: Versión de la carga del archivo de datos; los cambios
+            de cierres generan una versión nueva pero conservan ésta
+        origen: Ruta del archivo del que se cargó la red (si aplica)
+        creada: Momento en que se construyó la instantánea
+    """
+    version: int
+    afluencia_max: int
+    cerradas: FrozenSet[str] = frozenset()
+    tramos_cerrados: FrozenSet[Tramo] = frozenset()
+    version_datos: int = 0
+    origen: Optional[Path] = None
+    creada: datetime = field(default_factory=datetime.now)
+
+    @property
+    def numero_estaciones(self) -> int:
+        """Retorna el número de estaciones de la red."""
+        return self.grafo.numero_estaciones
+
+    @cached_property
+    def estaciones(self) -> Tuple[EstacionCompleta, ...]:
+        """Estaciones de la red, en el orden del archivo de datos.
+
+        Las consultas solo usan el grafo; en una instantánea cargada del
+        formato binario las estaciones se leen de `origen` la primera vez que
+        se piden.
+
+        Raises:
+            RuntimeError: Si no hay archivo de origen o cambió desde que se
+                cargó la red
+        """
+        if self.origen is None:
+            raise RuntimeError("La instantánea no tiene estaciones ni archivo de origen")
+        estaciones = tuple(load_estaciones_completas(self.origen))
+        if tuple(e.name for e in estaciones) != self.grafo.nombres:
+            raise RuntimeError(f"{self.origen} cambió desde que se cargó la red")
+        return estaciones
+
+    @cached_property
+    def estaciones_dict(self) -> Mapping[str, EstacionCompleta]:
+        """Índice de solo lectura nombre -> estación."""
+        return MappingProxyType({e.name: e for e in self.estaciones})
+
+    @cached_property
+    def grafo(self) -> GrafoCompilado:
+        """Grafo compilado de la red; se construye en el primer uso."""
+        grafo = compilar_grafo(self.estaciones)
+        abierta = self._abiertas(grafo)
+        if not np.array_equal(abierta, grafo.abierta):
+            grafo = grafo.con_abiertas(abierta)
+        return grafo
+
+    @cached_property
+    def indice_nombres(self) -> IndiceNombres:
+        """Índice de búsqueda por nombre de las estaciones."""
+        return IndiceNombres(self.grafo.nombres, self.grafo.nombres_originales)
+
+    def _abiertas(self, grafo: GrafoCompilado) -> np.ndarray:
+        return np.asarray([nombre not in self.cerradas for nombre in grafo.nombres], dtype=np.bool_)
+
+    @cached_property
+    def aristas_cerradas(self) -> np.ndarray:
+        """Máscara de las aristas del grafo que los cierres vigentes descartan."""
+        grafo = self.grafo
+        return grafo.mascara_cierres(
+            (grafo.indice[t.estacion_a], grafo.indice[t.estacion_b], grafo.codigo_linea(t.linea))
+            for t in self.tramos_cerrados
+        )
+
+    @property
+    def tablas(self) -> TablasCosto:
+        """Tablas de costo por régimen del grafo de esta instantánea.
+
+        Se calculan una vez por instantánea y solo se recalculan si cambian
+        las constantes del modelo de costo. Las aristas cerradas cuestan
+        infinito.
+        """
+        tablas = self.__dict__.get("_tablas")
+        if tablas is None or not tablas.vigente():
+            tablas = construir_tablas(self.grafo, self.aristas_cerradas)
+            object.__setattr__(self, "_tablas", tablas)
+        return tablas
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria de los artefactos ya construidos: grafo, tablas, landmarks, matrices y jerarquía.
+
+        Los artefactos compartidos con otra instantánea (ver `con_cierres`)
+        se cuentan en cada una.
+        """
+        artefactos = (self.__dict__.get(nombre) for nombre in
+                      ("grafo", "_tablas", "_landmarks", "_matrices", "_jerarquia"))
+        return sum(artefacto.nbytes for artefacto in artefactos if artefacto is not None)
+
+    @property
+    def tiene_cierres(self) -> bool:
+        """Indica si hay alguna estación o tramo cerrado."""
+        return bool(self.cerradas or self.tramos_cerrados)
+
+    @property
+    def matrices(self) -> Optional[MatricesRutas]:
+        """Matrices de rutas de todos los pares, o None si hay cierres o la red es muy grande.
+
+        Los cierres son transitorios, así que con estaciones o tramos
+        cerrados no se precalcula nada y las consultas usan la búsqueda en vivo.
+        Tampoco se calculan si el grafo tiene más de
+        `Config.MAX_ESTADOS_MATRICES` estados: su memoria crece con el
+        cuadrado de los estados y su cálculo con el cubo.
+        """
+        if self.tiene_cierres or self.grafo.numero_estados > Config.MAX_ESTADOS_MATRICES:
+            return None
+        tablas = self.tablas
+        matrices = self.__dict__.get("_matrices")
+        if matrices is None or matrices.huella != tablas.huella:
+            matrices = construir_matrices(self.grafo, tablas)
+            object.__setattr__(self, "_matrices", matrices)
+        return matrices
+
+    @property
+    def landmarks(self) -> Landmarks:
+        """Landmarks de la heurística ALT para esta instantánea.
+
+        Se calculan sobre la red sin cierres: cerrar algo solo encarece los
+        caminos, así que las cotas siguen siendo admisibles con cualquier
+        combinación de cierres y la misma instancia se comparte entre las
+        instantáneas derivadas con `con_cierres`.
+        """
+        tablas = self.tablas
+        landmarks = self.__dict__.get("_landmarks")
+        if landmarks is None or landmarks.huella != tablas.huella:
+            sin_cierres = tablas if not self.aristas_cerradas.any() else construir_tablas(
+                self.grafo, np.zeros(self.grafo.numero_aristas, dtype=np.bool_))
+            landmarks = construir_landmarks(self.grafo, sin_cierres)
+            object.__setattr__(self, "_landmarks", landmarks)
+        return landmarks
+
+    def con_cierres(self, version: int, cerradas: Iterable[str],
+                    tramos_cerrados: Iterable[Tramo]) -> "RedSnapshot":
+        """Instantánea derivada con otro conjunto de cierres.
+
+        Comparte las estaciones, los arreglos del grafo, el índice de nombres
+        y los landmarks con esta instantánea; las tablas de costo se copian y
+        solo se recalculan las aristas cuyo cierre cambió. Las matrices y la jerarquía no se
+        copian porque con cierres las consultas usan la búsqueda en vivo.
+
+        Args:
+            version: Versión de la nueva instantánea
+            cerradas: Nombres de todas las estaciones cerradas
+            tramos_cerrados: Todos los tramos cerrados
+
+        Returns:
+            RedSnapshot nueva con la misma `version_datos`
+
+        Raises:
+            ValueError: Si una estación no existe o un tramo no une dos
+                estaciones contiguas en esa línea
+        """
+        cerradas = frozenset(cerradas)
+        tramos_cerrados = frozenset(tramos_cerrados)
+        grafo = self.grafo
+
+        for nombre in cerradas:
+            if nombre not in grafo.indice:
+                raise ValueError(f"Estación '{nombre}' no encontrada")
+        for tramo in tramos_cerrados:
+            for nombre in (tramo.estacion_a, tramo.estacion_b):
+                if nombre not in grafo.indice:
+                    raise ValueError(f"Estación '{nombre}' no encontrada")
+            aristas = grafo.aristas_de_tramo(
+                grafo.indice[tramo.estacion_a], grafo.indice[tramo.estacion_b],
+                grafo.codigo_linea(tramo.linea))
+            if not len(aristas):
+                raise ValueError(
+                    f"No hay tramo de la línea {tramo.linea.value} entre "
+                    f"'{tramo.estacion_a}' y '{tramo.estacion_b}'"
+                )
+
+        nueva = replace(self, version=version, cerradas=cerradas,
+                        tramos_cerrados=tramos_cerrados, creada=datetime.now())
+        for atributo in ("estaciones", "estaciones_dict", "indice_nombres"):
+            if atributo in self.__dict__:
+                object.__setattr__(nueva, atributo, self.__dict__[atributo])
+        if cerradas != self.cerradas:
+            grafo = grafo.con_abiertas(nueva._abiertas(grafo))
+        object.__setattr__(nueva, "grafo", grafo)
+
+        tablas = self.__dict__.get("_tablas")
+        if tablas is not None:
+            object.__setattr__(nueva, "_tablas", actualizar_tablas(
+                tablas, grafo, self.aristas_cerradas, nueva.aristas_cerradas))
+        landmarks = self.__dict__.get("_landmarks")
+        if landmarks is not None:
+            object.__setattr__(nueva, "_landmarks", landmarks)
+        return nueva
+
+    @property
+    def jerarquia(self) -> Optional[JerarquiaContraccion]:
+        """Jerarquía de contracción, o None si hay cierres o no está disponible.
+
+        Se lee del archivo generado por `bin.red.preprocesar` junto a los datos
+        si existe y corresponde a las tablas actuales; si no, se construye en
+        memoria solo si el grafo tiene hasta `Config.MAX_ESTADOS_JERARQUIA`
+        estados (o si ya se construyó con `preparar`).
+        """
+        return self._obtener_jerarquia(construir=self.grafo.numero_estados <= Config.MAX_ESTADOS_JERARQUIA)
+
+    def _obtener_jerarquia(self, construir: bool) -> Optional[JerarquiaContraccion]:
+        if self.tiene_cierres:
+            return None
+        tablas = self.tablas
+        jerarquia = self.__dict__.get("_jerarquia")
+        if jerarquia is None or jerarquia.firma != tablas.firma:
+            jerarquia = None
+            if self.origen is not None:
+                jerarquia = cargar_jerarquia(ruta_jerarquia(self.origen), tablas.firma)
+            if jerarquia is None:
+                if not construir:
+                    return None
+                jerarquia = construir_jerarquia(self.grafo, tablas)
+            object.__setattr__(self, "_jerarquia", jerarquia)
+        return jerarquia
+
+    def preparar(self, matrices: bool = False, jerarquia: bool = False) -> "RedSnapshot":
+        """Construye por adelantado los artefactos derivados de la red.
+
+        Args:
+            matrices: Si también se precalculan las matrices de todos los pares
+            jerarquia: Si también se carga (o construye, sin importar el tamaño
+                de la red) la jerarquía de contracción
+
+        Returns:
+            La misma instantánea, lista para publicarse
+        """
+        self.tablas
+        self.landmarks
+        self.indice_nombres
+        if matrices:
+            self.matrices
+        if jerarquia:
+            self._obtener_jerarquia(construir=True)
+        return self
+
+
+def construir_snapshot(
+        estaciones: Iterable[EstacionCompleta],
+        version: int = 0,
+        origen: Optional[Path] = None
+    ) -> RedSnapshot:
+    """Construye una instantánea a partir de una colección de estaciones.
+
+    Args:
+        estaciones: Estaciones ya validadas
+        version: Versión a asignar a la instantánea
+        origen: Archivo del que provienen los datos
+
+    Returns:
+        RedSnapshot con el índice por nombre y las constantes derivadas
+
+    Raises:
+        ValueError: Si no hay estaciones o ninguna tiene afluencia registrada
+    """
+    estaciones = tuple(estaciones)
+    if not estaciones:
+        raise ValueError("La red no contiene estaciones")
+
+    afluencia_max = max(
+        (afluencia.promedio
+         for estacion in estaciones
+         for afluencia in estacion.afluencia_promedio),
+        default=0
+    )
+    if afluencia_max <= 0:
+        raise ValueError("La red no tiene afluencia registrada para normalizar costos")
+
+    snapshot = RedSnapshot(
+        version=version,
+        afluencia_max=afluencia_max,
+        cerradas=frozenset(e.name for e in estaciones if not e.abierta),
+        version_datos=version,
+        origen=origen
+    )
+    object.__setattr__(snapshot, "estaciones", estaciones)
+    return snapshot
+
+
+def snapshot_de_binaria(red: RedBinaria, version: int = 0,
+                        origen: Optional[Path] = None) -> RedSnapshot:
+    """Construye una instantánea a partir de una red compilada al formato binario.
+
+    Args:
+        red: Red cargada con `cargar_red_binaria`
+        version: Versión a asignar a la instantánea
+        origen: Archivo de datos del que se compiló
+
+    Returns:
+        RedSnapshot cuyo grafo comparte los arreglos mapeados en memoria
+    """
+    grafo = red.grafo
+    snapshot = RedSnapshot(
+        version=version,
+        afluencia_max=red.afluencia_max,
+        cerradas=frozenset(nombre for nombre, abierta in zip(grafo.nombres, grafo.abierta) if not abierta),
+        version_datos=version,
+        origen=origen
+    )
+    object.__setattr__(snapshot, "grafo", grafo)
+    return snapshot
+
+
+def cargar_snapshot(path: Union[str, Path], version: int = 0) -> RedSnapshot:
+    """Carga datos-completos.json y construye su instantánea.
+
+    Usa la red compilada al formato binario si existe y se compiló de este
+    mismo contenido; si no, analiza el JSON.
+
+    Args:
+        path: Ruta al archivo de datos
+        version: Versión a asignar a la instantánea
+
+    Returns:
+        RedSnapshot lista para compartirse entre peticiones
+    """
+    p = Path(path)
+    binaria = cargar_red_binaria(ruta_binaria(p), huella_archivo(p))
+    if binaria is not None:
+        return snapshot_de_binaria(binaria, version=version, origen=p)
+    return construir_snapshot(load_estaciones_completas(p), version=version, origen=p)
@@ -1,7 +1,72 @@
+import os
 from pathlib import Path
 
 class Config:
     BASE_DIR = Path(__file__).parent.parent
     DATA_DIR = BASE_DIR / "bin" / "data"
     
-    DATOS_COMPLETOS = DATA_DIR / "datos-completos.json"
\ No newline at end of file
+    DATOS_COMPLETOS = DATA_DIR / "datos-completos.json"
+
+    # Redes: cada archivo .json bajo DATA_DIR con el formato de
+    # DATOS_COMPLETOS es una red que las consultas eligen con el parámetro
+    # `red` (ruta relativa sin extensión). Se buscan al arrancar y se cargan
+    # en su primer uso y, pasado el presupuesto de memoria (None = sin
+    # límite), se descargan las menos usadas; la red por defecto no se
+    # descarga. Cada proceso de búsqueda conserva REDES_POR_PROCESO redes
+    # además de la por defecto, con el mismo presupuesto de memoria
+    RED_POR_DEFECTO = DATOS_COMPLETOS.stem
+    MEMORIA_REDES_MB = 1024
+    REDES_POR_PROCESO = 2
+
+    # Precalcular al arrancar las matrices de rutas de todos los pares (modo
+    # "tabla"). Ocupan 6 × 20 bytes × estados² y se calculan en O(estados³)
+    # por régimen; en redes con más estados el modo tabla busca en vivo
+    PRECALCULAR_MATRICES = True
+    MAX_ESTADOS_MATRICES = 600
+
+    # Cargar al arrancar la jerarquía de contracción (modo "jerarquia"); se
+    # genera con `python -m bin.red.preprocesar` junto a DATOS_COMPLETOS.
+    # Las redes que no la tienen precalculada ni en disco la construyen en su
+    # primera consulta solo hasta MAX_ESTADOS_JERARQUIA estados (~1 s con
+    # 1100, ~45 s con 6600); en las más grandes el modo busca con A*
+    PRECALCULAR_JERARQUIA = True
+    MAX_ESTADOS_JERARQUIA = 2000
+
+    # Caché de rutas serializadas
+    CACHE_RUTAS_CAPACIDAD = 4096
+    CACHE_RUTAS_TTL_SEGUNDOS = 3600
+
+    # Máximo de pares origen/destino por petición a /find-path/batch
+    MAX_PARES_LOTE = 1000
+
+    # Heurística de A* por defecto: "haversine" o "alt" (landmarks)
+    HEURISTICA = "haversine"
+
+    # Rutas alternativas (/find-path/alternativas): máximo de rutas por
+    # consulta y tiempo de cómputo por consulta
+    MAX_RUTAS_ALTERNATIVAS = 5
+    PRESUPUESTO_ALTERNATIVAS_MS = 100
+
+    # Rutas Pareto (/find-path/pareto): máximo de etiquetas por estado y
+    # tiempo de cómputo por consulta
+    MAX_ETIQUETAS_PARETO = 8
+    PRESUPUESTO_PARETO_MS = 100
+
+    # Búsquedas de /find-path/: procesos del pool (0 = hilos del servidor) y
+    # búsquedas distintas en curso antes de responder 503
+    PROCESOS_BUSQUEDA = 2
+    MAX_BUSQUEDAS_PENDIENTES = 64
+
+    # Búsqueda de estaciones por nombre (/stations/search): máximo de
+    # sugerencias por consulta, y si las consultas de rutas e isócronas
+    # sustituyen un nombre que no existe por la única estación que se le parece
+    MAX_SUGERENCIAS_ESTACIONES = 20
+    RESOLVER_NOMBRES_APROXIMADOS = True
+
+    # Mapa de la red (/network): versiones con cambios de estado que se
+    # conservan para /network/cambios
+    MAX_VERSIONES_CAMBIOS_RED = 1024
+
+    # Token que exigen los cambios de /admin (cierres) en el encabezado
+    # X-Admin-Token; sin token configurado esos cambios quedan deshabilitados
+    ADMIN_TOKEN = os.environ.get("METRO_ADMIN_TOKEN") or None
@@ -1,8 +1,53 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from api.v1.api import api_router
+from bin.red.ejecutor import EjecutorBusquedas
+from bin.red.registro import RegistroRedes
+from api.metricas import MiddlewareMetricas, RegistroMetricas
+from config.config import Config
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Cada red se carga una sola vez y se comparte entre todas las peticiones;
+    # la por defecto se carga al arrancar y las demás en su primer uso
+    memoria_max_bytes = None if Config.MEMORIA_REDES_MB is None else Config.MEMORIA_REDES_MB * 2**20
+    app.state.redes = RegistroRedes(
+        Config.DATA_DIR, Config.RED_POR_DEFECTO,
+        memoria_max_bytes=memoria_max_bytes,
+        precalcular_matrices=Config.PRECALCULAR_MATRICES,
+        precalcular_jerarquia=Config.PRECALCULAR_JERARQUIA,
+        capacidad_cache=Config.CACHE_RUTAS_CAPACIDAD,
+        ttl_cache_segundos=Config.CACHE_RUTAS_TTL_SEGUNDOS,
+        max_versiones_cambios=Config.MAX_VERSIONES_CAMBIOS_RED)
+    inicio = time.perf_counter()
+    red = app.state.redes.obtener()
+    app.state.metricas.observar_etapa("carga_red", time.perf_counter() - inicio)
+    # Las búsquedas de /find-path/ se ejecutan fuera del bucle de eventos
+    app.state.ejecutor = EjecutorBusquedas(
+        procesos=Config.PROCESOS_BUSQUEDA,
+        max_pendientes=Config.MAX_BUSQUEDAS_PENDIENTES,
+        precalcular_matrices=Config.PRECALCULAR_MATRICES,
+        precalcular_jerarquia=Config.PRECALCULAR_JERARQUIA,
+        max_redes=Config.REDES_POR_PROCESO,
+        memoria_max_bytes=memoria_max_bytes)
+    await app.state.ejecutor.iniciar(red)
+    try:
+        yield
+    finally:
+        app.state.ejecutor.cerrar()
 
-app = FastAPI(title="Metro CDMX")
+
+app = FastAPI(title="Metro CDMX", lifespan=lifespan)
+
+# Existe antes del lifespan porque el middleware lo necesita al construirse
+app.state.metricas = RegistroMetricas()
+app.add_middleware(MiddlewareMetricas, registro=app.state.metricas)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,4 +65,11 @@ app.include_router(api_router, prefix="/api/v1")
 @app.get("/")
 def status():
     return {"message": "API Server is running"}
-    
\ No newline at end of file
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request) -> PlainTextResponse:
+    """Métricas en formato de texto de Prometheus."""
+    return PlainTextResponse(request.app.state.metricas.exponer(),
+                             media_type="text/plain; version=0.0.4; charset=utf-8")
+    
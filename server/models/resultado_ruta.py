@@ -4,7 +4,7 @@ Define las estructuras de datos que representan una ruta completa con
 información detallada de cada paso y costos asociados.
 """
 
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from models.estacion_completa import LineaEnum
 
@@ -50,6 +50,9 @@ class ResultadoRuta(BaseModel):
         lineas_utilizadas: Lista de líneas utilizadas en orden
         exito: Indica si se encontró una ruta válida
         mensaje: Mensaje descriptivo sobre el resultado
+        nodos_expandidos: Estados expandidos por la búsqueda
+        exposicion_afluencia: Suma de la afluencia normalizada de las
+            estaciones recorridas (solo en la búsqueda multicriterio)
     """
     estaciones: List[str] = Field(default_factory=list)
     nombres_originales: List[str] = Field(default_factory=list)
@@ -60,6 +63,8 @@ class ResultadoRuta(BaseModel):
     lineas_utilizadas: List[LineasUsadas] = Field(default_factory=list)
     exito: bool = False
     mensaje: str = ""
+    nodos_expandidos: int = 0
+    exposicion_afluencia: Optional[float] = None
     
     @property
     def costo_total_minutos(self) -> float:
@@ -1,9 +1,24 @@
 from pydantic import BaseModel, Field
 
-from typing import List, Optional
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional
 from models.resultado_ruta import ResultadoRuta, PasoRuta, LineasUsadas
 from models.estacion_completa import LineaEnum
 
+class ModoBusqueda(str, Enum):
+    """Motor usado para resolver una consulta de ruta."""
+    A_ESTRELLA = "a_estrella"
+    TABLA = "tabla"  # Matrices de todos los pares precalculadas
+    BIDIRECCIONAL = "bidireccional"  # A* desde el origen y desde el destino a la vez
+    JERARQUIA = "jerarquia"  # Jerarquía de contracción precalculada
+    TIEMPO_DEPENDIENTE = "tiempo_dependiente"  # Franja horaria evaluada al llegar a cada arista
+
+class TipoHeuristica(str, Enum):
+    """Heurística de A*."""
+    HAVERSINE = "haversine"  # Línea recta entre coordenadas / velocidad
+    ALT = "alt"  # Landmarks y desigualdad del triángulo
+
 class ResultadoRutaParsed(BaseModel):
     estaciones: List[str] = Field(default_factory=list)
     estaciones_originales: List[str] = Field(default_factory=list)
@@ -12,8 +27,129 @@ class ResultadoRutaParsed(BaseModel):
     distancia_total_km: float = 0.0
     lineas_utilizadas: List[LineasUsadas] = Field(default_factory=list)
     numero_transbordos: int = 0
+    nodos_expandidos: int = 0
+    exposicion_afluencia: Optional[float] = None  # Solo en /find-path/pareto
+    traza: Optional[Dict[str, float]] = None  # Solo si se pidió con traza=true
 
 class ServerResponse(BaseModel):
     code: int
     data: Optional[dict] = None # ResultadoRutaParsed
     error: Optional[str] = None
+
+class ParEstaciones(BaseModel):
+    estacion_origen: str
+    estacion_destino: str
+
+class SolicitudLote(BaseModel):
+    """Muchos pares origen/destino con un mismo día de viaje y clima."""
+    pares: List[ParEstaciones]
+    dia_viaje: datetime
+    lluvia: bool = False
+
+class ResultadoPar(BaseModel):
+    """Resultado de un par dentro de un lote; sigue la convención code/data/error."""
+    estacion_origen: str
+    estacion_destino: str
+    code: int
+    data: Optional[dict] = None # ResultadoRutaParsed
+    error: Optional[str] = None
+
+class TiempoEstacion(BaseModel):
+    """Costo mínimo para llegar a una estación desde el origen de una isócrona."""
+    estacion: str
+    nombre: str
+    linea: LineaEnum  # Línea por la que se llega
+    tiempo_minutos: float
+    distancia_km: float
+    numero_transbordos: int
+
+class ResultadoIsocrona(BaseModel):
+    estacion_origen: str
+    max_minutos: Optional[float] = None
+    estaciones: List[TiempoEstacion] = Field(default_factory=list)
+
+class ResultadoAlternativas(BaseModel):
+    """Rutas alternativas en orden de costo; la primera es la óptima."""
+    estacion_origen: str
+    estacion_destino: str
+    rutas: List[ResultadoRutaParsed] = Field(default_factory=list)
+    completa: bool = True  # False si se agotó el presupuesto de tiempo
+
+class ResultadoPareto(BaseModel):
+    """Rutas que no son peores que otra en tiempo, transbordos y exposición a la vez."""
+    estacion_origen: str
+    estacion_destino: str
+    rutas: List[ResultadoRutaParsed] = Field(default_factory=list)  # En orden de tiempo
+    completa: bool = True  # False si las cotas de etiquetas o de tiempo recortaron la búsqueda
+
+class TramoLinea(BaseModel):
+    """Tramo de una línea entre dos estaciones contiguas (cerrado en ambos sentidos)."""
+    estacion_a: str
+    estacion_b: str
+    linea: LineaEnum
+
+class EstadoCierres(BaseModel):
+    """Estaciones y tramos cerrados en la instantánea vigente."""
+    version: int
+    estaciones_cerradas: List[str] = Field(default_factory=list)
+    tramos_cerrados: List[TramoLinea] = Field(default_factory=list)
+
+class CoincidenciaEstacion(BaseModel):
+    """Estación sugerida por /stations/search."""
+    estacion: str
+    nombre: str
+    tipo: str  # "exacta", "prefijo", "palabra" o "aproximada"
+    similitud: float
+    abierta: bool
+
+class ResultadoBusquedaEstaciones(BaseModel):
+    consulta: str
+    coincidencias: List[CoincidenciaEstacion] = Field(default_factory=list)
+
+class UbicacionLinea(BaseModel):
+    linea: LineaEnum
+    latitud: float
+    longitud: float
+
+class EstacionRed(BaseModel):
+    estacion: str
+    nombre: str
+    lineas: List[LineaEnum] = Field(default_factory=list)
+    latitud: float  # Primera ubicación de la estación
+    longitud: float
+    ubicaciones: List[UbicacionLinea] = Field(default_factory=list)
+    abierta: bool = True
+
+class ConexionRed(BaseModel):
+    """Tramo de una línea entre dos estaciones contiguas (en ambos sentidos)."""
+    estacion_a: str
+    estacion_b: str
+    linea: LineaEnum
+    distancia_km: float
+    abierta: bool = True
+
+class MapaRedParsed(BaseModel):
+    version: int
+    version_datos: int
+    estaciones: List[EstacionRed] = Field(default_factory=list)
+    conexiones: List[ConexionRed] = Field(default_factory=list)
+
+class CambioEstacion(BaseModel):
+    version: int  # Versión en la que ocurrió el cambio
+    estacion: str
+    abierta: bool
+
+class CambioTramo(BaseModel):
+    version: int
+    estacion_a: str
+    estacion_b: str
+    linea: LineaEnum
+    abierta: bool
+
+class CambiosRed(BaseModel):
+    """Cambios de estado entre la versión `desde` y la vigente, en orden de versión."""
+    desde: int
+    version: int
+    etag: str  # ETag del mapa de `version`, para la siguiente petición condicional
+    estaciones: List[CambioEstacion] = Field(default_factory=list)
+    tramos: List[CambioTramo] = Field(default_factory=list)
@@ -0,0 +1,84 @@
+"""Fixtures compartidas: la red de datos-completos.json, redes sintéticas
+pequeñas, una muestra fija de pares para comparar contra Dijkstra y un
+cliente de la API."""
+
+import math
+import random
+from typing import Callable, List, Tuple
+
+import pytest
+
+from config.config import Config
+from benchmarks.red_sintetica import ParametrosRed, escribir_red
+from bin.red import RedSnapshot, cargar_snapshot
+from bin.algoritmo.dijkstra import arbol_dijkstra
+from bin.algoritmo.tablas_costo import Regimen
+
+SEMILLA = 2024
+
+
+def _pares(red: RedSnapshot, n: int, semilla: int = SEMILLA) -> List[Tuple[str, str]]:
+    grafo = red.grafo
+    validas = [
+        nombre for i, nombre in enumerate(grafo.nombres)
+        if grafo.abierta[i] and not math.isnan(grafo.estacion_latitud[i])
+    ]
+    rng = random.Random(semilla)
+    return [tuple(rng.sample(validas, 2)) for _ in range(n)]
+
+
+@pytest.fixture(scope="session")
+def red() -> RedSnapshot:
+    """Red de datos-completos.json (del formato binario si está compilado)."""
+    return cargar_snapshot(Config.DATOS_COMPLETOS)
+
+
+@pytest.fixture(scope="session")
+def pares(red: RedSnapshot) -> List[Tuple[str, str]]:
+    """Muestra fija de pares de estaciones abiertas y con ubicación."""
+    return _pares(red, 40)
+
+
+@pytest.fixture(scope="session")
+def muestra_pares() -> Callable[[RedSnapshot, int], List[Tuple[str, str]]]:
+    """Muestra fija de `n` pares de una red cualquiera."""
+    return _pares
+
+
+@pytest.fixture(scope="session")
+def red_sintetica(tmp_path_factory) -> Callable[..., RedSnapshot]:
+    """Construye (una vez por combinación de parámetros) una red sintética y la carga."""
+    generadas = {}
+
+    def construir(**parametros) -> RedSnapshot:
+        clave = tuple(sorted(parametros.items()))
+        if clave not in generadas:
+            destino = tmp_path_factory.mktemp("redes") / "red.json"
+            escribir_red(ParametrosRed(**parametros), destino)
+            generadas[clave] = cargar_snapshot(destino)
+        return generadas[clave]
+
+    return construir
+
+
+@pytest.fixture(scope="session")
+def costo_minimo() -> Callable[[RedSnapshot, str, str, Regimen], float]:
+    """Costo de referencia de una consulta: Dijkstra sobre las tablas de la instantánea."""
+    def costo(red: RedSnapshot, origen: str, destino: str, regimen: Regimen) -> float:
+        grafo = red.grafo
+        objetivo = grafo.indice[destino]
+        arbol = arbol_dijkstra(grafo, red.tablas.de(regimen), grafo.indice[origen], destinos=[objetivo])
+        return arbol.costo(objetivo)
+
+    return costo
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    """Cliente de la API con la aplicación recién arrancada y búsquedas en hilos."""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    monkeypatch.setattr(Config, "PROCESOS_BUSQUEDA", 0)
+    with TestClient(app) as cliente:
+        yield cliente
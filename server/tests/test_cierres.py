@@ -0,0 +1,151 @@
+"""Cierres de estaciones y tramos en tiempo de ejecución.
+
+Cerrar y volver a abrir deja las tablas de costo como estaban, las rutas con
+cierres evitan lo cerrado, una solicitud rechazada no consume versión y el
+caché de rutas descarta solo las entradas afectadas por cada cambio. Los
+cambios por la API exigen el token de administración.
+"""
+
+import numpy as np
+import pytest
+
+from config.config import Config
+from models.schemas import ModoBusqueda, TipoHeuristica
+from bin.algoritmo.tablas_costo import REGIMENES
+from bin.red import GestorRed
+from bin.red.cache_rutas import CacheRutas, ClaveRuta
+from bin.red.rutas import calcular_ruta, dependencias_ruta, payload_ruta
+from bin.red.snapshot import Tramo
+
+REGIMEN = REGIMENES[0]
+
+
+@pytest.fixture
+def gestor() -> GestorRed:
+    gestor = GestorRed(Config.DATOS_COMPLETOS)
+    gestor.cargar()
+    return gestor
+
+
+def _ruta(red, origen, destino):
+    return calcular_ruta(red, origen, destino, REGIMEN, ModoBusqueda.A_ESTRELLA, TipoHeuristica.ALT)
+
+
+def _ruta_con_intermedias(red, pares):
+    """Primer par cuya ruta pasa por al menos una estación intermedia."""
+    for origen, destino in pares:
+        resultado = _ruta(red, origen, destino)
+        if resultado.exito and len(resultado.estaciones) > 3:
+            return origen, destino, resultado
+    pytest.fail("Ningún par de la muestra tiene estaciones intermedias")
+
+
+def test_cerrar_y_reabrir_estacion(gestor, pares, costo_minimo):
+    original = gestor.actual
+    origen, destino, antes = _ruta_con_intermedias(original, pares)
+    intermedia = antes.estaciones[len(antes.estaciones) // 2]
+
+    cerrada = gestor.actualizar_cierres(cerrar=[intermedia])
+    assert cerrada.version > original.version
+    assert intermedia in cerrada.cerradas
+    despues = _ruta(cerrada, origen, destino)
+    if despues.exito:
+        assert intermedia not in despues.estaciones
+        assert despues.costo_total_segundos >= antes.costo_total_segundos - 1e-6
+        assert despues.costo_total_segundos == pytest.approx(
+            costo_minimo(cerrada, origen, destino, REGIMEN))
+
+    reabierta = gestor.actualizar_cierres(abrir=[intermedia])
+    assert reabierta.version > cerrada.version
+    assert reabierta.cerradas == original.cerradas
+    np.testing.assert_array_equal(reabierta.tablas.costos, original.tablas.costos)
+    assert _ruta(reabierta, origen, destino).costo_total_segundos == pytest.approx(antes.costo_total_segundos)
+
+
+def test_cerrar_y_reabrir_tramo(gestor, pares):
+    original = gestor.actual
+    origen, destino, antes = _ruta_con_intermedias(original, pares)
+    paso = antes.pasos[len(antes.pasos) // 2]
+    tramo = Tramo.de(paso.estacion_origen, paso.estacion_destino, paso.linea)
+
+    cerrada = gestor.actualizar_cierres(cerrar_tramos=[tramo])
+    assert cerrada.tramos_cerrados == original.tramos_cerrados | {tramo}
+    despues = _ruta(cerrada, origen, destino)
+    if despues.exito:
+        assert tramo not in dependencias_ruta(cerrada, despues).tramos
+
+    reabierta = gestor.actualizar_cierres(abrir_tramos=[tramo])
+    assert reabierta.tramos_cerrados == original.tramos_cerrados
+    np.testing.assert_array_equal(reabierta.tablas.costos, original.tablas.costos)
+
+
+def test_solicitud_rechazada_no_consume_version(gestor):
+    original = gestor.actual
+    with pytest.raises(ValueError):
+        gestor.actualizar_cierres(cerrar=["estacion-que-no-existe"])
+    with pytest.raises(ValueError):
+        a, b = original.grafo.nombres[:2]
+        gestor.actualizar_cierres(cerrar_tramos=[Tramo.de(a, b, original.grafo.linea_de(0))])
+    assert gestor.actual is original
+
+    publicada = gestor.actualizar_cierres(cerrar=[original.grafo.nombres[0]])
+    assert publicada.version == original.version + 1
+
+
+def test_cache_descarta_solo_rutas_afectadas(gestor, pares):
+    cache = CacheRutas(capacidad=len(pares))
+    gestor.suscribir(cache.actualizar)
+    red = gestor.actual
+    cache.actualizar(red)
+
+    claves = {}
+    for origen, destino in pares:
+        resultado = _ruta(red, origen, destino)
+        if not resultado.exito:
+            continue
+        clave = ClaveRuta(red.version_datos, origen, destino, REGIMEN,
+                          ModoBusqueda.A_ESTRELLA.value, TipoHeuristica.ALT.value)
+        cache.guardar(clave, payload_ruta(resultado), dependencias_ruta(red, resultado))
+        claves[clave] = set(resultado.estaciones)
+
+    _, _, ruta = _ruta_con_intermedias(red, pares)
+    intermedia = ruta.estaciones[len(ruta.estaciones) // 2]
+    afectadas = {clave for clave, estaciones in claves.items() if intermedia in estaciones}
+    assert afectadas and len(afectadas) < len(claves)
+
+    cerrada = gestor.actualizar_cierres(cerrar=[intermedia])
+    for clave in claves:
+        assert (cache.obtener(clave) is None) == (clave in afectadas)
+
+    # Ruta calculada mientras la estación está cerrada
+    clave = next(iter(afectadas))
+    resultado = _ruta(cerrada, clave.origen, clave.destino)
+    if resultado.exito:
+        cache.guardar(clave, payload_ruta(resultado), dependencias_ruta(cerrada, resultado))
+        assert cache.obtener(clave) is not None
+
+    # Al reabrir se descartan las rutas calculadas con la estación cerrada
+    # (podría haber un camino mejor por ella); las demás se calcularon sin
+    # cierres y siguen valiendo
+    gestor.actualizar_cierres(abrir=[intermedia])
+    for clave in claves:
+        assert (cache.obtener(clave) is None) == (clave in afectadas)
+
+
+def test_api_exige_token_de_administracion(cliente, monkeypatch):
+    nombre = cliente.app.state.redes.obtener().grafo.nombres[0]
+    ruta = f"/api/v1/admin/estaciones/{nombre}/cerrar"
+
+    monkeypatch.setattr(Config, "ADMIN_TOKEN", None)
+    assert cliente.post(ruta, headers={"X-Admin-Token": "x"}).status_code == 403
+
+    monkeypatch.setattr(Config, "ADMIN_TOKEN", "secreto")
+    assert cliente.post(ruta).status_code == 401
+    assert cliente.post(ruta, headers={"X-Admin-Token": "otro"}).status_code == 401
+    assert cliente.get("/api/v1/admin/cierres").json()["data"]["estaciones_cerradas"] == []
+
+    respuesta = cliente.post(ruta, headers={"X-Admin-Token": "secreto"}).json()
+    assert respuesta["code"] == 0 and nombre in respuesta["data"]["estaciones_cerradas"]
+    respuesta = cliente.post(f"/api/v1/admin/estaciones/{nombre}/abrir",
+                             headers={"X-Admin-Token": "secreto"}).json()
+    assert respuesta["code"] == 0 and respuesta["data"]["estaciones_cerradas"] == []
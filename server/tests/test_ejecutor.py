@@ -0,0 +1,93 @@
+"""Ejecutor de búsquedas: un proceso del pool que muere no tumba el servidor, y
+cada proceso mantiene sus redes dentro del presupuesto de memoria."""
+
+import asyncio
+import os
+import signal
+from collections import OrderedDict
+
+import pytest
+
+from config.config import Config
+from models.schemas import ModoBusqueda, TipoHeuristica
+from benchmarks.red_sintetica import ParametrosRed, escribir_red
+from bin.algoritmo.tablas_costo import REGIMENES
+from bin.red import ejecutor as modulo_ejecutor
+from bin.red.ejecutor import ConsultaRuta, EjecutorBusquedas, EjecutorNoDisponible
+
+
+def _consulta(origen, destino, modo=ModoBusqueda.A_ESTRELLA):
+    return ConsultaRuta(origen, destino, REGIMENES[0], modo, TipoHeuristica.ALT)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="Requiere SIGKILL")
+def test_pool_roto_se_reemplaza(red, pares):
+    async def escenario():
+        ejecutor = EjecutorBusquedas(procesos=1)
+        await ejecutor.iniciar(red)
+        try:
+            resultado, _ = await ejecutor.resolver(red, _consulta(*pares[0]))
+            assert resultado.payload is not None
+
+            for proceso in list(ejecutor._pool._processes.values()):
+                os.kill(proceso.pid, signal.SIGKILL)
+            # La consulta en curso (y las idénticas que la esperan) falla sin
+            # propagar BrokenProcessPool. Si el pool ya detectó la muerte al
+            # enviarla, falla solo la primera y la segunda usa el pool nuevo
+            consulta = _consulta(*pares[1])
+            primera, segunda = await asyncio.gather(
+                ejecutor.resolver(red, consulta), ejecutor.resolver(red, consulta), return_exceptions=True)
+            assert isinstance(primera, EjecutorNoDisponible), primera
+            assert isinstance(segunda, EjecutorNoDisponible) or segunda[0].payload is not None, segunda
+            assert ejecutor.reinicios == 1 and ejecutor.pendientes == 0
+
+            resultado, _ = await ejecutor.resolver(red, consulta)
+            assert resultado.payload is not None
+        finally:
+            ejecutor.cerrar()
+
+    asyncio.run(escenario())
+
+
+def test_find_path_responde_503(cliente, pares, monkeypatch):
+    async def roto(red, consulta):
+        raise EjecutorNoDisponible("un proceso del pool terminó")
+
+    monkeypatch.setattr(cliente.app.state.ejecutor, "resolver", roto)
+    origen, destino = pares[0]
+    respuesta = cliente.get("/api/v1/find-path/", params={
+        "estacion_origen": origen, "estacion_destino": destino, "dia_viaje": "2024-01-02T12:00:00"})
+    assert respuesta.status_code == 503
+    assert respuesta.headers["Retry-After"] == "1"
+    assert respuesta.json()["code"] == 1
+
+
+def test_redes_del_proceso_dentro_del_presupuesto(tmp_path, monkeypatch):
+    # Estado global del proceso: se restaura al terminar
+    for nombre in ("_redes_proceso", "_origen_proceso", "_max_redes_proceso", "_memoria_max_proceso"):
+        monkeypatch.setattr(modulo_ejecutor, nombre, getattr(modulo_ejecutor, nombre))
+    monkeypatch.setattr(modulo_ejecutor, "_redes_proceso", OrderedDict())
+    monkeypatch.setattr(modulo_ejecutor, "_preparar_proceso", {})
+    redes = {}
+    for nombre, semilla in (("a", 1), ("b", 2)):
+        redes[nombre] = tmp_path / f"{nombre}.json"
+        escribir_red(ParametrosRed(estaciones=300, lineas=4, semilla=semilla), redes[nombre])
+
+    modulo_ejecutor._inicializar_proceso(Config.DATOS_COMPLETOS, 0, False, False, 5, None)
+    inicial, _ = modulo_ejecutor._redes_proceso[Config.DATOS_COMPLETOS]
+    # Cabe la red inicial y una red pequeña, pero no una con sus matrices de todos los pares
+    monkeypatch.setattr(modulo_ejecutor, "_memoria_max_proceso", inicial.nbytes + 4 * 2**20)
+
+    def consultar(nombre, modo=ModoBusqueda.A_ESTRELLA):
+        origen, destino = "e000001", "e000200"
+        resultado = modulo_ejecutor._resolver_en_proceso(
+            redes[nombre], 0, 0, frozenset(), frozenset(), _consulta(origen, destino, modo))
+        assert resultado.payload is not None, resultado.error
+        return list(modulo_ejecutor._redes_proceso)
+
+    assert consultar("b") == [Config.DATOS_COMPLETOS, redes["b"]]
+    # Las matrices que construye la consulta cuentan: se descarta la otra red
+    assert consultar("a", ModoBusqueda.TABLA) == [Config.DATOS_COMPLETOS, redes["a"]]
+    assert modulo_ejecutor._redes_proceso[redes["a"]][0].nbytes > 4 * 2**20
+    # La red inicial nunca se descarta; la de la consulta en curso tampoco
+    assert consultar("b") == [Config.DATOS_COMPLETOS, redes["b"]]
@@ -0,0 +1,87 @@
+"""Formato binario `.red.bin`: ida y vuelta exacta y detección de archivos ajenos."""
+
+import shutil
+
+import numpy as np
+import pytest
+
+from config.config import Config
+from models.schemas import ModoBusqueda, TipoHeuristica
+from bin.algoritmo.tablas_costo import REGIMENES
+from bin.helpers.load_locations import load_estaciones_completas
+from bin.red.formato_binario import (
+    _ARREGLOS, MAGICO, cargar_red_binaria, guardar_red_binaria, huella_archivo, ruta_binaria
+)
+from bin.red.rutas import calcular_ruta
+from bin.red.snapshot import cargar_snapshot, construir_snapshot
+
+
+@pytest.fixture(scope="module")
+def red_json():
+    """Instantánea analizada del JSON, sin pasar por el formato binario."""
+    return construir_snapshot(load_estaciones_completas(Config.DATOS_COMPLETOS), origen=Config.DATOS_COMPLETOS)
+
+
+def _comparar_grafos(original, cargado):
+    for nombre in _ARREGLOS:
+        arreglo, leido = getattr(original, nombre), getattr(cargado, nombre)
+        assert leido.dtype == arreglo.dtype, nombre
+        np.testing.assert_array_equal(leido, arreglo, err_msg=nombre)
+    assert cargado.nombres == original.nombres
+    assert cargado.nombres_originales == original.nombres_originales
+    assert cargado.advertencias == original.advertencias
+    assert cargado.afluencia_max == original.afluencia_max
+
+
+def test_ida_y_vuelta(red_json, tmp_path):
+    destino = guardar_red_binaria(red_json.grafo, red_json.afluencia_max, "huella", tmp_path / "red.red.bin")
+    binaria = cargar_red_binaria(destino, "huella")
+    assert binaria is not None
+    assert binaria.afluencia_max == red_json.afluencia_max and binaria.huella == "huella"
+    _comparar_grafos(red_json.grafo, binaria.grafo)
+    # Vistas de solo lectura sobre el archivo mapeado
+    assert not binaria.grafo.destinos.flags.writeable
+
+
+def test_ida_y_vuelta_red_sintetica(red_sintetica, tmp_path):
+    red = red_sintetica(estaciones=600, lineas=8, densidad_transbordos=0.2, fraccion_cerradas=0.05, semilla=1)
+    destino = guardar_red_binaria(red.grafo, red.afluencia_max, "h", tmp_path / "sintetica.red.bin")
+    _comparar_grafos(red.grafo, cargar_red_binaria(destino, "h").grafo)
+
+
+def test_archivo_ajeno(red_json, tmp_path):
+    destino = guardar_red_binaria(red_json.grafo, red_json.afluencia_max, "huella", tmp_path / "red.red.bin")
+    assert cargar_red_binaria(destino, "otra huella") is None
+    assert cargar_red_binaria(tmp_path / "no-existe.red.bin", "huella") is None
+
+    contenido = destino.read_bytes()
+    assert contenido.startswith(MAGICO)
+    otro = tmp_path / "otro.red.bin"
+    otro.write_bytes(b"NOESMETR" + contenido[len(MAGICO):])
+    with pytest.raises(ValueError):
+        cargar_red_binaria(otro, "huella")
+    otro.write_bytes(contenido[:len(contenido) // 2])
+    with pytest.raises(ValueError):
+        cargar_red_binaria(otro, "huella")
+
+
+def test_cargar_snapshot_usa_el_binario(red_json, pares, tmp_path):
+    datos = tmp_path / Config.DATOS_COMPLETOS.name
+    shutil.copyfile(Config.DATOS_COMPLETOS, datos)
+    guardar_red_binaria(red_json.grafo, red_json.afluencia_max, huella_archivo(datos), ruta_binaria(datos))
+
+    red = cargar_snapshot(datos)
+    assert not red.grafo.destinos.flags.writeable
+    assert red.cerradas == red_json.cerradas
+    np.testing.assert_array_equal(red.tablas.costos, red_json.tablas.costos)
+    for origen, destino in pares[:10]:
+        for regimen in REGIMENES[::2]:
+            desde_binario = calcular_ruta(red, origen, destino, regimen, ModoBusqueda.A_ESTRELLA, TipoHeuristica.ALT)
+            desde_json = calcular_ruta(red_json, origen, destino, regimen, ModoBusqueda.A_ESTRELLA,
+                                       TipoHeuristica.ALT)
+            assert desde_binario.estaciones == desde_json.estaciones
+            assert desde_binario.costo_total_segundos == desde_json.costo_total_segundos
+
+    # Si el JSON cambia, el binario se ignora
+    datos.write_bytes(datos.read_bytes() + b"\n")
+    assert cargar_snapshot(datos).grafo.destinos.flags.writeable
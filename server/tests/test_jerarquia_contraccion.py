@@ -0,0 +1,52 @@
+"""Jerarquía de contracción: consultas iguales a Dijkstra sobre las tablas de costo."""
+
+import pytest
+
+from bin.algoritmo.jerarquia_contraccion import (
+    cargar_jerarquia, construir_jerarquia, ruta_desde_jerarquia
+)
+from bin.algoritmo.tablas_costo import REGIMENES
+
+
+def _comparar(red, jerarquia, pares, costo_minimo):
+    for origen, destino in pares:
+        for regimen in REGIMENES:
+            resultado = ruta_desde_jerarquia(red.grafo, red.tablas, jerarquia, origen, destino, regimen)
+            assert resultado.exito, (origen, destino, regimen, resultado.mensaje)
+            assert resultado.costo_total_segundos == pytest.approx(
+                costo_minimo(red, origen, destino, regimen), rel=1e-9, abs=1e-6), (origen, destino, regimen)
+            # Los atajos se desempacan en aristas originales contiguas
+            for anterior, paso in zip(resultado.pasos, resultado.pasos[1:]):
+                assert anterior.estacion_destino == paso.estacion_origen
+
+
+@pytest.fixture(scope="module")
+def jerarquia(red):
+    return construir_jerarquia(red.grafo, red.tablas)
+
+
+def test_igual_a_dijkstra(red, pares, costo_minimo, jerarquia):
+    _comparar(red, jerarquia, pares, costo_minimo)
+
+
+@pytest.mark.parametrize("semilla", [1, 2])
+def test_igual_a_dijkstra_en_red_sintetica(red_sintetica, muestra_pares, costo_minimo, semilla):
+    red = red_sintetica(estaciones=600, lineas=8, densidad_transbordos=0.2, semilla=semilla)
+    _comparar(red, construir_jerarquia(red.grafo, red.tablas), muestra_pares(red, 20), costo_minimo)
+
+
+def test_guardar_y_cargar(red, pares, costo_minimo, jerarquia, tmp_path):
+    ruta = jerarquia.guardar(tmp_path / "red.ch.npz")
+    cargada = cargar_jerarquia(ruta, red.tablas.firma)
+    assert cargada is not None
+    for regimen in REGIMENES:
+        original, leida = jerarquia.de(regimen), cargada.de(regimen)
+        assert (original.rango == leida.rango).all()
+        assert (original.costos == leida.costos).all()
+    _comparar(red, cargada, pares[:10], costo_minimo)
+
+
+def test_firma_distinta_no_se_carga(red, jerarquia, tmp_path):
+    ruta = jerarquia.guardar(tmp_path / "red.ch.npz")
+    assert cargar_jerarquia(ruta, "otra-firma") is None
+    assert cargar_jerarquia(tmp_path / "no-existe.ch.npz", red.tablas.firma) is None
@@ -0,0 +1,113 @@
+"""Todos los motores de `calcular_ruta` dan el costo mínimo de Dijkstra.
+
+La heurística ALT es admisible y consistente por construcción, así que con
+ella todos los modos deben dar exactamente el costo de Dijkstra. Haversine no
+lo es en datos-completos.json (en la mayoría de los tramos la distancia
+registrada es menor que la línea recta entre las coordenadas): con ella solo
+se comprueba que la ruta es válida y nunca más barata que la óptima.
+"""
+
+import math
+from datetime import datetime
+
+import pytest
+
+from config.config import Config
+from models.schemas import ModoBusqueda, TipoHeuristica
+from bin.algoritmo.tablas_costo import REGIMENES, regimen_de
+from bin.red.rutas import calcular_ruta
+
+MODOS = [ModoBusqueda.A_ESTRELLA, ModoBusqueda.BIDIRECCIONAL, ModoBusqueda.TABLA, ModoBusqueda.JERARQUIA]
+
+
+def _verificar_ruta(red, resultado, origen, destino):
+    assert resultado.estaciones[0] == origen and resultado.estaciones[-1] == destino
+    assert sum(p.costo_segundos for p in resultado.pasos) == pytest.approx(resultado.costo_total_segundos)
+    for anterior, paso in zip(resultado.pasos, resultado.pasos[1:]):
+        assert anterior.estacion_destino == paso.estacion_origen
+    assert not set(resultado.estaciones[1:-1]) & red.cerradas
+
+
+def _comparar(red, pares, costo_minimo, modo, heuristica=TipoHeuristica.ALT, exacto=True):
+    for origen, destino in pares:
+        for regimen in REGIMENES:
+            esperado = costo_minimo(red, origen, destino, regimen)
+            resultado = calcular_ruta(red, origen, destino, regimen, modo, heuristica)
+            if math.isinf(esperado):
+                assert not resultado.exito, (origen, destino, regimen)
+                continue
+            assert resultado.exito, (origen, destino, regimen, resultado.mensaje)
+            _verificar_ruta(red, resultado, origen, destino)
+            if exacto:
+                assert resultado.costo_total_segundos == pytest.approx(esperado, rel=1e-9, abs=1e-6), \
+                    (origen, destino, regimen)
+            else:
+                assert resultado.costo_total_segundos >= esperado - 1e-6, (origen, destino, regimen)
+
+
+@pytest.mark.parametrize("modo", MODOS)
+def test_costo_igual_a_dijkstra(red, pares, costo_minimo, modo):
+    _comparar(red, pares, costo_minimo, modo)
+
+
+@pytest.mark.parametrize("modo", MODOS)
+def test_costo_igual_a_dijkstra_con_cierres(red, pares, costo_minimo, modo):
+    # Con cierres no hay matrices ni jerarquía: los modos precalculados buscan en vivo
+    extremos = {estacion for par in pares for estacion in par}
+    cerradas = [nombre for nombre in red.grafo.nombres if nombre not in extremos][::15]
+    con_cierres = red.con_cierres(red.version + 1, cerradas, ())
+    assert con_cierres.matrices is None and con_cierres.jerarquia is None
+    _comparar(con_cierres, pares, costo_minimo, modo)
+
+
+@pytest.mark.parametrize("modo", [ModoBusqueda.A_ESTRELLA, ModoBusqueda.BIDIRECCIONAL])
+def test_haversine_da_rutas_validas(red, pares, costo_minimo, modo):
+    _comparar(red, pares, costo_minimo, modo, TipoHeuristica.HAVERSINE, exacto=False)
+
+
+@pytest.mark.parametrize("modo", [ModoBusqueda.A_ESTRELLA, ModoBusqueda.BIDIRECCIONAL, ModoBusqueda.JERARQUIA])
+def test_red_sintetica(red_sintetica, muestra_pares, costo_minimo, modo):
+    red = red_sintetica(estaciones=800, lineas=10, semilla=7)
+    _comparar(red, muestra_pares(red, 15), costo_minimo, modo)
+
+
+def test_tabla_sin_matrices_en_redes_grandes(red_sintetica, muestra_pares, costo_minimo, monkeypatch):
+    red = red_sintetica(estaciones=200, lineas=4, semilla=3)
+    monkeypatch.setattr(Config, "MAX_ESTADOS_MATRICES", red.grafo.numero_estados - 1)
+    assert red.matrices is None
+    _comparar(red, muestra_pares(red, 10), costo_minimo, ModoBusqueda.TABLA)
+
+
+def test_jerarquia_bajo_demanda_solo_en_redes_pequenas(red_sintetica, muestra_pares, costo_minimo, monkeypatch):
+    red = red_sintetica(estaciones=200, lineas=4, semilla=4)
+    monkeypatch.setattr(Config, "MAX_ESTADOS_JERARQUIA", red.grafo.numero_estados - 1)
+    assert red.jerarquia is None
+    _comparar(red, muestra_pares(red, 10), costo_minimo, ModoBusqueda.JERARQUIA)
+    assert "_jerarquia" not in vars(red)
+    # Precalculada al cargar sí se construye, y entonces se usa
+    assert red.preparar(jerarquia=True).jerarquia is not None
+
+
+@pytest.mark.parametrize("modo", [ModoBusqueda.TABLA, ModoBusqueda.JERARQUIA])
+def test_api_con_cierres_busca_con_alt(cliente, pares, costo_minimo, monkeypatch, modo):
+    # Sin artefactos, el modo precalculado busca en vivo: con ALT aunque se pida
+    # haversine, y sin que la heurística pedida cambie la ruta guardada en caché
+    monkeypatch.setattr(Config, "ADMIN_TOKEN", "secreto")
+    cerrar = cliente.post("/api/v1/admin/estaciones/aquiles_serdan/cerrar", headers={"X-Admin-Token": "secreto"})
+    assert cerrar.json()["code"] == 0
+    red = cliente.app.state.redes.obtener()
+    assert "aquiles_serdan" in red.cerradas
+
+    dia_viaje = datetime(2024, 1, 1, 8, 30)
+    regimen = regimen_de(dia_viaje, False)
+    consultas = [("acatitla", "san_juan_de_letran")] + pares[:10]
+    for heuristica in (TipoHeuristica.ALT, TipoHeuristica.HAVERSINE):
+        for origen, destino in consultas:
+            esperado = costo_minimo(red, origen, destino, regimen)
+            respuesta = cliente.get("/api/v1/find-path/", params={
+                "estacion_origen": origen, "estacion_destino": destino, "dia_viaje": dia_viaje.isoformat(),
+                "modo": modo.value, "heuristica": heuristica.value,
+            }).json()
+            assert respuesta["code"] == 0, (origen, destino, respuesta["error"])
+            assert respuesta["data"]["costo_total_minutos"] * 60 == pytest.approx(esperado, rel=1e-9, abs=1e-6), \
+                (origen, destino, heuristica)
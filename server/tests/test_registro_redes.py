@@ -0,0 +1,65 @@
+"""Registro de redes: solo se registran los archivos con la forma de una red.
+
+Las redes se buscan al crear el registro; después solo un administrador
+puede pedir que se busquen las agregadas al directorio.
+"""
+
+import shutil
+
+import pytest
+
+from config.config import Config
+from bin.red.registro import RegistroRedes
+
+
+@pytest.fixture
+def directorio(tmp_path):
+    """Directorio con la red por defecto y archivos JSON que no son redes."""
+    shutil.copyfile(Config.DATOS_COMPLETOS, tmp_path / Config.DATOS_COMPLETOS.name)
+    (tmp_path / "notas.json").write_text('{"version": 1}')
+    (tmp_path / "estaciones.json").write_text('{"pino_suarez": {"lineas": ["1"]}}')
+    (tmp_path / "lista.json").write_text("[1, 2]")
+    (tmp_path / "roto.json").write_text("{")
+    return tmp_path
+
+
+def _agregar_red(directorio, nombre):
+    destino = directorio / f"{nombre}.json"
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(Config.DATOS_COMPLETOS, destino)
+
+
+def test_descubrir_solo_registra_redes(directorio):
+    registro = RegistroRedes(directorio, Config.RED_POR_DEFECTO)
+    assert registro.nombres == [Config.RED_POR_DEFECTO]
+
+    _agregar_red(directorio, "historico/2019")
+    assert registro.descubrir() == ["historico/2019"]
+    assert registro.descubrir() == []
+    assert registro.obtener("historico/2019").grafo.numero_estaciones == registro.obtener().grafo.numero_estaciones
+
+
+def test_red_por_defecto_sin_formato_de_red(directorio):
+    with pytest.raises(ValueError):
+        RegistroRedes(directorio, "notas")
+
+
+def test_api_descubrir_exige_token(directorio, monkeypatch):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    monkeypatch.setattr(Config, "DATA_DIR", directorio)
+    monkeypatch.setattr(Config, "PROCESOS_BUSQUEDA", 0)
+    monkeypatch.setattr(Config, "ADMIN_TOKEN", "secreto")
+    with TestClient(app) as cliente:
+        _agregar_red(directorio, "otra")
+
+        # Listar no busca en el directorio
+        redes = cliente.get("/api/v1/network/redes").json()["data"]["redes"]
+        assert [red["nombre"] for red in redes] == [Config.RED_POR_DEFECTO]
+        assert cliente.post("/api/v1/admin/redes/descubrir").status_code == 401
+
+        respuesta = cliente.post("/api/v1/admin/redes/descubrir", headers={"X-Admin-Token": "secreto"}).json()
+        assert respuesta["code"] == 0 and respuesta["data"]["nuevas"] == ["otra"]
+        redes = cliente.get("/api/v1/network/redes").json()["data"]["redes"]
+        assert [red["nombre"] for red in redes] == sorted([Config.RED_POR_DEFECTO, "otra"])
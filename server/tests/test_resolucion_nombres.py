@@ -0,0 +1,41 @@
+"""Todos los endpoints de rutas e isócronas resuelven nombres aproximados igual."""
+
+from config.config import Config
+
+CONSULTA = {"estacion_origen": "Pino Suárez", "estacion_destino": "Tasqueña", "dia_viaje": "2024-01-02T12:00:00"}
+ORIGEN, DESTINO = "pino_suarez", "tasquena"
+
+
+def _consultar(cliente):
+    """Respuesta de cada endpoint con los nombres de `CONSULTA`."""
+    lote = {"pares": [{"estacion_origen": CONSULTA["estacion_origen"],
+                       "estacion_destino": CONSULTA["estacion_destino"]}],
+            "dia_viaje": CONSULTA["dia_viaje"]}
+    return {
+        "find-path": cliente.get("/api/v1/find-path/", params=CONSULTA).json(),
+        "alternativas": cliente.get("/api/v1/find-path/alternativas", params=CONSULTA).json(),
+        "pareto": cliente.get("/api/v1/find-path/pareto", params=CONSULTA).json(),
+        "batch": cliente.post("/api/v1/find-path/batch", json=lote).json()["data"]["resultados"][0],
+        "isocrona": cliente.get("/api/v1/isocrona/", params=CONSULTA).json(),
+    }
+
+
+def test_nombres_aproximados(cliente):
+    respuestas = _consultar(cliente)
+    for endpoint, respuesta in respuestas.items():
+        assert respuesta["code"] == 0, (endpoint, respuesta["error"])
+
+    estaciones = respuestas["find-path"]["data"]["estaciones"]
+    assert (estaciones[0], estaciones[-1]) == (ORIGEN, DESTINO)
+    for endpoint in ("alternativas", "pareto"):
+        data = respuestas[endpoint]["data"]
+        assert (data["estacion_origen"], data["estacion_destino"]) == (ORIGEN, DESTINO), endpoint
+    par = respuestas["batch"]
+    assert (par["estacion_origen"], par["estacion_destino"]) == (ORIGEN, DESTINO)
+    assert respuestas["isocrona"]["data"]["estacion_origen"] == ORIGEN
+
+
+def test_sin_resolucion(cliente, monkeypatch):
+    monkeypatch.setattr(Config, "RESOLVER_NOMBRES_APROXIMADOS", False)
+    for endpoint, respuesta in _consultar(cliente).items():
+        assert respuesta["code"] == 1, endpoint
@@ -0,0 +1,76 @@
+"""Rutas alternativas (Yen): orden, unicidad y comparación con enumeración exhaustiva."""
+
+import math
+
+import pytest
+
+from bin.algoritmo.rutas_alternativas import rutas_alternativas
+from bin.algoritmo.tablas_costo import REGIMENES
+
+K = 6
+
+
+def _recorrido(ruta):
+    """Estados visitados después del inicial: identifica la ruta (como en Yen)."""
+    return tuple((paso.estacion_destino, paso.linea) for paso in ruta.pasos)
+
+
+def _enumerar(red, costos, origen, destino):
+    """Costo mínimo de cada camino sin estaciones repetidas, por recorrido."""
+    grafo = red.grafo
+    mejores = {}
+
+    def extender(estado, visitadas, costo, recorrido):
+        if grafo.estado_estacion[estado] == destino:
+            mejores[tuple(recorrido)] = min(mejores.get(tuple(recorrido), math.inf), costo)
+            return
+        for arista in range(grafo.offsets[estado], grafo.offsets[estado + 1]):
+            siguiente = int(grafo.destinos[arista])
+            estacion = int(grafo.estado_estacion[siguiente])
+            if estacion in visitadas or math.isinf(costos[arista]):
+                continue
+            visitadas.add(estacion)
+            recorrido.append(siguiente)
+            extender(siguiente, visitadas, costo + costos[arista], recorrido)
+            recorrido.pop()
+            visitadas.discard(estacion)
+
+    for estado in grafo.estados_de(origen):
+        if grafo.con_ubicacion[estado]:
+            extender(estado, {origen}, 0.0, [])
+    return sorted(mejores.values())
+
+
+def test_orden_y_unicidad(red, pares, costo_minimo):
+    for origen, destino in pares[:15]:
+        for regimen in REGIMENES:
+            resultado = rutas_alternativas(red.grafo, red.tablas, origen, destino, regimen, K)
+            rutas = resultado.rutas
+            assert resultado.completa and all(ruta.exito for ruta in rutas), (origen, destino)
+            assert rutas[0].costo_total_segundos == pytest.approx(
+                costo_minimo(red, origen, destino, regimen), rel=1e-9, abs=1e-6)
+            costos = [ruta.costo_total_segundos for ruta in rutas]
+            assert costos == sorted(costos)
+            assert len({_recorrido(ruta) for ruta in rutas}) == len(rutas)
+            for ruta in rutas:
+                assert ruta.estaciones[0] == origen and ruta.estaciones[-1] == destino
+                assert len(set(ruta.estaciones)) == len(ruta.estaciones)
+
+
+def test_igual_a_enumeracion_exhaustiva(red_sintetica, muestra_pares):
+    red = red_sintetica(estaciones=30, lineas=4, densidad_transbordos=0.4, semilla=3)
+    grafo = red.grafo
+    for origen, destino in muestra_pares(red, 20):
+        for regimen in REGIMENES[::3]:
+            esperados = _enumerar(red, red.tablas.de(regimen), grafo.indice[origen], grafo.indice[destino])[:K]
+            resultado = rutas_alternativas(grafo, red.tablas, origen, destino, regimen, K)
+            obtenidos = [ruta.costo_total_segundos for ruta in resultado.rutas if ruta.exito]
+            assert obtenidos == pytest.approx(esperados, rel=1e-9, abs=1e-6), (origen, destino, regimen)
+
+
+def test_limite_de_tiempo_devuelve_las_encontradas(red, pares):
+    origen, destino = pares[0]
+    resultado = rutas_alternativas(red.grafo, red.tablas, origen, destino, REGIMENES[0], 50,
+                                   limite_segundos=0.0)
+    assert not resultado.completa
+    assert resultado.rutas and resultado.rutas[0].exito
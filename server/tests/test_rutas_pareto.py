@@ -0,0 +1,81 @@
+"""Rutas Pareto: frente igual al de una enumeración exhaustiva y respuesta con el presupuesto agotado."""
+
+import math
+
+import pytest
+
+from bin.algoritmo.rutas_pareto import criterios_de_aristas, rutas_pareto
+from bin.algoritmo.tablas_costo import REGIMENES
+
+
+def _frente(vectores):
+    """Vectores no dominados, sin repetir (redondeados para absorber el error de suma)."""
+    unicos = sorted({(round(t, 6), x, round(e, 9)) for t, x, e in vectores})
+    frente = []
+    for v in unicos:
+        if not any(f[0] <= v[0] and f[1] <= v[1] and f[2] <= v[2] for f in frente):
+            frente.append(v)
+    return frente
+
+
+def _enumerar(red, costos, origen, destino):
+    """Criterios de todos los caminos sin estados repetidos hasta la primera llegada al destino."""
+    grafo = red.grafo
+    transbordos, exposicion = criterios_de_aristas(grafo, costos)
+    vectores = []
+
+    def extender(estado, visitados, t, x, e):
+        if grafo.estado_estacion[estado] == destino:
+            vectores.append((t, x, e))
+            return
+        for arista in range(grafo.offsets[estado], grafo.offsets[estado + 1]):
+            siguiente = int(grafo.destinos[arista])
+            if siguiente in visitados or math.isinf(costos[arista]):
+                continue
+            visitados.add(siguiente)
+            extender(siguiente, visitados, t + costos[arista], x + int(transbordos[arista]),
+                     e + exposicion[arista])
+            visitados.discard(siguiente)
+
+    for estado in grafo.estados_de(origen):
+        if grafo.con_ubicacion[estado]:
+            extender(estado, {estado}, 0.0, 0, 0.0)
+    return vectores
+
+
+def _vectores(rutas):
+    return [(r.costo_total_segundos, r.numero_transbordos, r.exposicion_afluencia) for r in rutas]
+
+
+def test_igual_a_enumeracion_exhaustiva(red_sintetica, muestra_pares):
+    red = red_sintetica(estaciones=20, lineas=3, densidad_transbordos=0.4, semilla=3)
+    grafo = red.grafo
+    for origen, destino in muestra_pares(red, 20):
+        for regimen in REGIMENES[::3]:
+            esperado = _frente(_enumerar(red, red.tablas.de(regimen), grafo.indice[origen], grafo.indice[destino]))
+            resultado = rutas_pareto(grafo, red.tablas, origen, destino, regimen, max_etiquetas=10**6)
+            assert resultado.completa
+            assert _frente(_vectores(resultado.rutas)) == esperado, (origen, destino, regimen)
+
+
+def test_frente_sin_rutas_dominadas(red, pares, costo_minimo):
+    for origen, destino in pares[:15]:
+        for regimen in REGIMENES[::2]:
+            resultado = rutas_pareto(red.grafo, red.tablas, origen, destino, regimen, max_etiquetas=64)
+            vectores = _vectores(resultado.rutas)
+            assert len(_frente(vectores)) == len(vectores)
+            assert min(t for t, _, _ in vectores) == pytest.approx(
+                costo_minimo(red, origen, destino, regimen), rel=1e-9, abs=1e-6)
+
+
+@pytest.mark.parametrize("limite", [{"limite_segundos": 0.0}, {"max_etiquetas": 0}])
+def test_presupuesto_agotado_devuelve_la_mas_rapida(red, pares, costo_minimo, limite):
+    regimen = REGIMENES[0]
+    for origen, destino in pares[:10]:
+        resultado = rutas_pareto(red.grafo, red.tablas, origen, destino, regimen, **limite)
+        assert not resultado.completa
+        assert len(resultado.rutas) == 1 and resultado.rutas[0].exito, (origen, destino)
+        ruta = resultado.rutas[0]
+        assert ruta.estaciones[0] == origen and ruta.estaciones[-1] == destino
+        assert ruta.costo_total_segundos == pytest.approx(costo_minimo(red, origen, destino, regimen))
+        assert ruta.exposicion_afluencia > 0
@@ -0,0 +1,93 @@
+"""Modo dependiente del tiempo: igual a una búsqueda de corrección de etiquetas.
+
+La referencia no usa conjunto cerrado ni heurística: relaja aristas con una
+cola FIFO hasta que ninguna llegada mejora, con la misma función de llegada
+(esperar al siguiente cambio de franja si eso llega antes). Las salidas se
+toman justo antes y después de cada cambio de franja de un día de semana, que
+es donde la franja cambia a mitad del viaje.
+"""
+
+import math
+from collections import deque
+from datetime import datetime, timedelta
+
+import pytest
+
+from bin.algoritmo.tablas_costo import Regimen
+from bin.algoritmo.tiempo_dependiente import CALENDARIO, a_estrella_dependiente, segundos_de_semana
+
+LUNES = datetime(2024, 1, 1)
+# Cambios de franja del lunes y martes, con salidas a -10, -2, 0 y +5 minutos
+SALIDAS = [
+    LUNES + timedelta(seconds=inicio + desfase)
+    for inicio in CALENDARIO.inicios[1:8]
+    for desfase in (-600, -120, 0, 300)
+]
+
+
+def _llegada(por_tramo, arista, t):
+    llegada = t + por_tramo[CALENDARIO.tramo(t)][arista]
+    cambio = CALENDARIO.siguiente_cambio(t)
+    while cambio < llegada:
+        llegada = min(llegada, cambio + por_tramo[CALENDARIO.tramo(cambio)][arista])
+        cambio = CALENDARIO.siguiente_cambio(cambio)
+    return llegada
+
+
+def _referencia(red, origen, destino, salida, lluvia):
+    """Tiempo de viaje mínimo por corrección de etiquetas."""
+    grafo = red.grafo
+    por_tramo = [red.tablas.de(Regimen(horario, lluvia)) for horario in CALENDARIO.horarios]
+    t0 = segundos_de_semana(salida)
+    llegada = [math.inf] * grafo.numero_estados
+    pendientes = deque()
+    for estado in grafo.estados_de(grafo.indice[origen]):
+        if grafo.con_ubicacion[estado]:
+            llegada[estado] = t0
+            pendientes.append(estado)
+    while pendientes:
+        u = pendientes.popleft()
+        for arista in range(grafo.offsets[u], grafo.offsets[u + 1]):
+            if math.isinf(por_tramo[0][arista]):
+                continue
+            v = int(grafo.destinos[arista])
+            t = _llegada(por_tramo, arista, llegada[u])
+            if t < llegada[v] - 1e-9:
+                llegada[v] = t
+                pendientes.append(v)
+    return min(llegada[e] for e in grafo.estados_de(grafo.indice[destino])) - t0
+
+
+@pytest.mark.parametrize("lluvia", [False, True])
+def test_igual_a_correccion_de_etiquetas(red, pares, lluvia):
+    for origen, destino in pares[:10]:
+        for salida in SALIDAS:
+            esperado = _referencia(red, origen, destino, salida, lluvia)
+            resultado = a_estrella_dependiente(red.grafo, red.tablas, origen, destino, salida, lluvia,
+                                               landmarks=red.landmarks)
+            assert resultado.exito, (origen, destino, salida)
+            assert resultado.costo_total_segundos == pytest.approx(esperado, rel=1e-9, abs=1e-6), \
+                (origen, destino, salida)
+            assert sum(p.costo_segundos for p in resultado.pasos) == pytest.approx(resultado.costo_total_segundos)
+
+
+def test_haversine_nunca_mas_barato(red, pares):
+    # Haversine no es admisible en esta red: solo se exige una ruta válida
+    for origen, destino in pares[:10]:
+        for salida in SALIDAS[::4]:
+            esperado = _referencia(red, origen, destino, salida, False)
+            resultado = a_estrella_dependiente(red.grafo, red.tablas, origen, destino, salida, False)
+            assert resultado.exito
+            assert resultado.costo_total_segundos >= esperado - 1e-6
+
+
+def test_sin_cambio_de_franja_igual_a_dijkstra(red, pares, costo_minimo):
+    # A media franja el viaje termina antes del siguiente cambio: régimen fijo
+    salida = LUNES + timedelta(hours=12)
+    regimen = Regimen(CALENDARIO.horarios[CALENDARIO.tramo(segundos_de_semana(salida))], False)
+    for origen, destino in pares:
+        resultado = a_estrella_dependiente(red.grafo, red.tablas, origen, destino, salida, False,
+                                           landmarks=red.landmarks)
+        esperado = costo_minimo(red, origen, destino, regimen)
+        assert segundos_de_semana(salida) + esperado < CALENDARIO.siguiente_cambio(segundos_de_semana(salida))
+        assert resultado.costo_total_segundos == pytest.approx(esperado, rel=1e-9, abs=1e-6)